@@ -0,0 +1,44 @@
+"""Benchmarks for binary_db.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import time
+import binary_db
+import jsonc_loader
+import synthetic_data
+import benchmark_utils
+
+
+def bench_single_lookup(count: int) -> dict:
+    """Compare fetching one talent and one level slice from JSONC and from the binary database (try -n 100000)."""
+    talents = synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count)
+    target = talents[count // 2]['name']
+    with benchmark_utils.temp_dir() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'talents.json')
+        db_path = os.path.join(tmp_dir, 'library.hgdb')
+        benchmark_utils.write_jsonc(json_path, talents)
+
+        start = time.perf_counter()
+        binary_db.write_database({'talents': talents}, db_path)
+        build_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parsed = jsonc_loader.load(json_path, use_cache=False)
+        next(talent for talent in parsed if talent['name'] == target)
+        jsonc_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with binary_db.BinaryDatabase(db_path) as database:
+            database.get('talents', target)
+            open_get_secs = time.perf_counter() - start
+            start = time.perf_counter()
+            level_slice = database.by_level('talents', 5)
+            level_secs = time.perf_counter() - start
+
+        return {
+            'build_secs': build_secs,
+            'db_mb': os.path.getsize(db_path) / 2**20,
+            'jsonc_parse_and_find_ms': jsonc_secs * 1000,
+            'db_open_and_get_ms': open_get_secs * 1000,
+            'db_level_slice_ms': level_secs * 1000,
+            'level_slice_size': len(level_slice)
+        }
@@ -0,0 +1,24 @@
+"""Benchmarks for character_generator.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import time
+import synthetic_data
+import benchmark_utils
+import character_generator
+
+_CHARACTER_COUNT = 2000
+"""Number of characters generated per run."""
+
+_LEVEL = 10
+"""Level of the generated characters."""
+
+
+def bench_generate_characters(count: int) -> dict:
+    """Measure characters per second at level 10 for a synthetic catalog of count talents, serial and on a pool."""
+    talents_list = synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count)
+    metrics = {}
+    for jobs in sorted({1, os.cpu_count()}):
+        start = time.perf_counter()
+        character_generator.generate_characters(talents_list, _CHARACTER_COUNT, _LEVEL, jobs=jobs)
+        metrics[f'characters_per_sec_{jobs}_jobs'] = _CHARACTER_COUNT / (time.perf_counter() - start)
+    return metrics
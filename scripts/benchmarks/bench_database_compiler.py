@@ -0,0 +1,51 @@
+"""Benchmarks for database_compiler.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import time
+from unittest import mock
+import database_compiler
+import synthetic_data
+import benchmark_utils
+
+_SCALES = (1, 2, 4)
+"""Multiples of the benchmark count to compile, to show how the cost grows with catalog size."""
+
+
+def bench_compile_talents(count: int) -> dict:
+    """Time rendering talents_list.md with _render_talent_views() at several catalog sizes; per-talent cost should stay flat as the catalog grows."""
+    metrics = {}
+    with benchmark_utils.temp_dir() as tmp_dir, mock.patch('database_compiler.LOGGER'):
+        for scale in _SCALES:
+            talents_list = synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count * scale)
+            start = time.perf_counter()
+            database_compiler._render_talent_views(talents_list, [os.path.join(tmp_dir, 'talents_list.md')], mock.Mock())
+            elapsed = time.perf_counter() - start
+            metrics[f'{count * scale}_talents_secs'] = elapsed
+            metrics[f'{count * scale}_talents_usecs_per_talent'] = elapsed * 1e6 / (count * scale)
+    return metrics
+
+
+def bench_talent_views(count: int) -> dict:
+    """Compare rendering every talent view from one shared set of groupings with giving each view its own."""
+    talents_list = synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count)
+    view_names = sorted(database_compiler._TALENT_VIEWS)
+    with benchmark_utils.temp_dir() as tmp_dir, mock.patch('database_compiler.LOGGER'), mock.patch('talent_graph.LOGGER'):
+        md_paths = [os.path.join(tmp_dir, view_name) for view_name in view_names]
+
+        # Before: every view is its own handler, so each one indexes, sorts and groups the talents again
+        start = time.perf_counter()
+        for md_path in md_paths:
+            database_compiler._render_talent_views(talents_list, [md_path], mock.Mock())
+        separate_secs = time.perf_counter() - start
+
+        # After: one pass builds the groupings every view renders from
+        start = time.perf_counter()
+        database_compiler._render_talent_views(talents_list, md_paths, mock.Mock())
+        shared_secs = time.perf_counter() - start
+
+    return {
+        'views': len(view_names),
+        'separate_views_secs': separate_secs,
+        'shared_views_secs': shared_secs,
+        'speedup': separate_secs / shared_secs
+    }
@@ -0,0 +1,31 @@
+"""Benchmarks for helgrind.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import benchmark_utils
+
+_HELP_BUDGET_MS = 50.0
+"""Most that a cold 'helgrind.py --help' may take, as the median of several runs."""
+
+_SUBCOMMAND_HELP_BUDGET_MS = 280.0
+"""Most that a cold 'helgrind.py validate --help' may take. It imports jsonschema, but must not
+import the sanity checks (and with them numpy) or the library watcher."""
+
+_RUNS = 11
+"""Number of cold starts to take the median of."""
+
+
+def bench_cold_start(count: int) -> dict:
+    """Time cold starts of the unified CLI against a single script, and enforce the --help budgets.
+
+    NOTE: count is unused; start-up time doesn't depend on the size of the library.
+    """
+    metrics = {
+        'interpreter_ms': benchmark_utils.cold_start_ms(['-c', 'pass'], _RUNS),
+        'helgrind_help_ms': benchmark_utils.cold_start_ms(['helgrind.py', '--help'], _RUNS),
+        'validate_help_ms': benchmark_utils.cold_start_ms(['helgrind.py', 'validate', '--help'], _RUNS),
+        'json_validator_help_ms': benchmark_utils.cold_start_ms(['json_validator.py', '--help'], _RUNS),
+        'budget_ms': _HELP_BUDGET_MS,
+        'subcommand_budget_ms': _SUBCOMMAND_HELP_BUDGET_MS
+    }
+    benchmark_utils.enforce_budget('helgrind.py --help cold start (ms)', metrics['helgrind_help_ms'], _HELP_BUDGET_MS)
+    benchmark_utils.enforce_budget('helgrind.py validate --help cold start (ms)', metrics['validate_help_ms'], _SUBCOMMAND_HELP_BUDGET_MS)
+    return metrics
@@ -0,0 +1,44 @@
+"""Benchmarks for json_validator.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import time
+from unittest import mock
+import jsonschema
+import jsonc_loader
+import json_validator
+import schema_registry
+import synthetic_data
+import benchmark_utils
+
+
+def bench_validate_json_file(count: int) -> dict:
+    """Compare objects/second of per-object jsonschema.validate() with one cached validator per file."""
+    talents = synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count)
+    schema_path = benchmark_utils.talent_schema_path()
+    with open(schema_path, 'r') as schema_fp:
+        schema_text = schema_fp.read()
+
+    with benchmark_utils.temp_dir() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'talents.json')
+        benchmark_utils.write_jsonc(json_path, talents)
+
+        # Before: a new validator is built (and the schema re-checked) for every object
+        my_schema = jsonc_loader.loads(schema_text)
+        start = time.perf_counter()
+        for my_obj in talents:
+            jsonschema.validate(my_obj, my_schema)
+        per_object_secs = time.perf_counter() - start
+
+        # After: the whole file goes through one compiled validator
+        schema_registry.clear()
+        with mock.patch('json_validator.LOGGER'):
+            start = time.perf_counter()
+            if not json_validator._validate_json_file(json_path, schema_path):
+                raise json_validator.ValidatorException('Synthetic talents failed validation!')
+            cached_secs = time.perf_counter() - start
+
+    return {
+        'per_object_validate_objs_per_sec': count / per_object_secs,
+        'cached_validator_objs_per_sec': count / cached_secs,
+        'speedup': per_object_secs / cached_secs
+    }
@@ -0,0 +1,68 @@
+"""Benchmarks for jsonc_loader.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import json
+import time
+from unittest import mock
+import jsmin
+import jsonc_loader
+import synthetic_data
+import benchmark_utils
+
+_LOAD_SCRIPTS = {
+    'jsmin': 'import sys, json, jsmin\n'
+             'json_list = json.loads(jsmin.jsmin(open(sys.argv[1], "r").read()))\n',
+    'streaming': 'import sys, jsonc_loader\n'
+                 'for my_obj in jsonc_loader.iter_array(sys.argv[1]):\n'
+                 '    pass\n'
+}
+"""Scripts that load the file passed as their first argument, keyed by loading method."""
+
+
+def bench_streaming_peak_rss(count: int) -> dict:
+    """Compare peak RSS and wall time of whole-file jsmin parsing with streaming.
+
+    NOTE: Use a count of ~1000000 for a multi-hundred-MB file.
+    """
+    metrics = {}
+    with benchmark_utils.temp_dir() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'talents.json')
+        synthetic_data.generate_file(benchmark_utils.talent_schema_path(), json_path, count)
+        metrics['file_size_mb'] = os.path.getsize(json_path) / 2**20
+        for method, script in _LOAD_SCRIPTS.items():
+            start = time.perf_counter()
+            metrics[f'{method}_peak_rss_mb'] = benchmark_utils.peak_rss_kib(script, json_path) / 2**10
+            metrics[f'{method}_secs'] = time.perf_counter() - start
+    return metrics
+
+
+def bench_load(count: int) -> dict:
+    """Compare wall time of jsmin, the regex tokenizer and a warm parsed-file cache when loading a whole file."""
+    with benchmark_utils.temp_dir() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'talents.json')
+        synthetic_data.generate_file(benchmark_utils.talent_schema_path(), json_path, count)
+
+        start = time.perf_counter()
+        with open(json_path, 'r') as json_fp:
+            expected = json.loads(jsmin.jsmin(json_fp.read()))
+        jsmin_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        uncached = jsonc_loader.load(json_path, use_cache=False)
+        tokenizer_secs = time.perf_counter() - start
+
+        with mock.patch('utilities.get_cache_dir', mock.Mock(return_value=tmp_dir)):
+            jsonc_loader.load(json_path)  # Cold run fills the cache
+            start = time.perf_counter()
+            cached = jsonc_loader.load(json_path)
+            cached_secs = time.perf_counter() - start
+
+    if not expected == uncached == cached:
+        raise ValueError('Loaders disagree about the contents of the synthetic file!')
+    return {
+        'jsmin_secs': jsmin_secs,
+        'tokenizer_secs': tokenizer_secs,
+        'warm_cache_secs': cached_secs,
+        'tokenizer_speedup': jsmin_secs / tokenizer_secs,
+        'warm_cache_speedup': jsmin_secs / cached_secs
+    }
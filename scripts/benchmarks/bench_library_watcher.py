@@ -0,0 +1,52 @@
+"""Benchmarks for library_watcher.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import sys
+import time
+from unittest import mock
+import library_watcher
+import synthetic_data
+import benchmark_utils
+
+_SAVE_COUNT = 20
+"""Number of saves to time per watcher."""
+
+
+def _save_latency(watcher, json_path: str, talents: list) -> float:
+    """Return the mean seconds from the end of a save of json_path until watcher reports it."""
+    total = 0.0
+    try:
+        for save in range(_SAVE_COUNT):
+            benchmark_utils.write_jsonc(json_path, talents[:len(talents) - save % 2])
+            start = time.perf_counter()
+            watcher.wait(1.0)
+            total += time.perf_counter() - start
+    finally:
+        watcher.close()
+    return total / _SAVE_COUNT
+
+
+def bench_save_latency(count: int) -> dict:
+    """Time how long each watcher takes to notice a save, with count files in the watched dir."""
+    metrics = {}
+    talents = synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), 10)
+    with benchmark_utils.temp_dir() as tmp_dir, mock.patch('utilities.get_cache_dir', mock.Mock(return_value=tmp_dir)):
+        for index in range(count):
+            benchmark_utils.write_jsonc(os.path.join(tmp_dir, f'file_{index}.json'), [])
+        json_path = os.path.join(tmp_dir, 'talents.json')
+        if sys.platform.startswith('linux'):
+            metrics['inotify_ms'] = _save_latency(library_watcher.InotifyWatcher([tmp_dir]), json_path, talents) * 1000
+        metrics['polling_ms'] = _save_latency(library_watcher.PollingWatcher([tmp_dir]), json_path, talents) * 1000
+
+        start = time.perf_counter()
+        file_cache = library_watcher.FileCache()
+        paths = [os.path.join(tmp_dir, f'file_{index}.json') for index in range(count)]
+        for path in paths:
+            file_cache.load(path)
+        cold_secs = time.perf_counter() - start
+        start = time.perf_counter()
+        for path in paths:
+            file_cache.load(path)
+        metrics['file_cache_cold_ms'] = cold_secs * 1000
+        metrics['file_cache_warm_ms'] = (time.perf_counter() - start) * 1000
+    return metrics
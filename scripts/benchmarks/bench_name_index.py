@@ -0,0 +1,44 @@
+"""Benchmarks for name_index.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import time
+import random
+import difflib
+import name_index
+import synthetic_data
+import benchmark_utils
+
+_QUERY_COUNT = 100
+"""Number of misspelled names to look up."""
+
+
+def bench_suggest(count: int) -> dict:
+    """Compare trigram suggestions with a linear difflib scan over count talent names."""
+    names = [talent['name'] for talent in synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count)]
+    rng = random.Random(0)
+    queries = [name.replace('_', ' ').lower()[:-1] + 'x' for name in rng.sample(names, min(_QUERY_COUNT, count))]
+
+    start = time.perf_counter()
+    index = name_index.NameIndex(names)
+    build_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        index.resolve(query)
+    resolve_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        index.suggest(query)
+    suggest_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        difflib.get_close_matches(query, names, n=3, cutoff=0.3)
+    linear_secs = time.perf_counter() - start
+
+    return {
+        'build_secs': build_secs,
+        'resolve_us': resolve_secs / len(queries) * 1e6,
+        'suggest_ms': suggest_secs / len(queries) * 1000,
+        'difflib_scan_ms': linear_secs / len(queries) * 1000
+    }
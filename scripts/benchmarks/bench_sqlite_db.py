@@ -0,0 +1,38 @@
+"""Benchmarks for sqlite_db.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import time
+import sqlite_db
+import synthetic_data
+import benchmark_utils
+
+
+def bench_search(count: int) -> dict:
+    """Time bulk-loading count talents, then a text search and a prerequisite filter (try -n 100000)."""
+    talents = synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count)
+    with benchmark_utils.temp_dir() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'library.sqlite')
+        start = time.perf_counter()
+        sqlite_db.write_database({'talents': talents}, db_path)
+        build_secs = time.perf_counter() - start
+
+        connection = sqlite_db.connect(db_path)
+        try:
+            start = time.perf_counter()
+            text_results = sqlite_db.search(connection, text=f'number **{count // 2}**')
+            text_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+            filter_results = sqlite_db.search(connection, level=5, eligible={'str': 1, 'dex': 2}, limit=count)
+            filter_secs = time.perf_counter() - start
+        finally:
+            connection.close()
+
+    return {
+        'build_secs': build_secs,
+        'rows_per_sec': count / build_secs,
+        'text_search_ms': text_secs * 1000,
+        'text_results': len(text_results),
+        'filter_ms': filter_secs * 1000,
+        'filter_results': len(filter_results)
+    }
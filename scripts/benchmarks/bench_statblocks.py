@@ -0,0 +1,38 @@
+"""Benchmarks for statblocks.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import json
+import time
+from unittest import mock
+import statblocks
+import synthetic_data
+import benchmark_utils
+
+
+def bench_outliers(count: int) -> dict:
+    """Time computing the tables, loading them from cache, and scoring every statblock for count statblocks."""
+    statblock_list = synthetic_data.generate_objects(benchmark_utils.statblock_schema_path(), count)
+    with benchmark_utils.temp_dir() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'statblocks.json')
+        with open(json_path, 'w') as json_fp:
+            json.dump(statblock_list, json_fp)
+        # Keep the benchmark's tables out of the worktree cache
+        with mock.patch('utilities.get_cache_dir', mock.Mock(return_value=tmp_dir)):
+            start = time.perf_counter()
+            statblocks.load_tables(json_path, statblock_list)
+            compute_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+            tables = statblocks.load_tables(json_path, statblock_list)
+            cached_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+            outliers = statblocks.StatblockLibrary(statblock_list, tables).outliers()
+            score_secs = time.perf_counter() - start
+
+    return {
+        'compute_tables_secs': compute_secs,
+        'cached_tables_secs': cached_secs,
+        'score_secs': score_secs,
+        'outliers': len(outliers)
+    }
@@ -0,0 +1,87 @@
+"""Benchmarks of the library pipeline on a synthetic talents.json. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import time
+from unittest import mock
+import jsonc_loader
+import json_validator
+import schema_registry
+import synthetic_data
+import database_compiler
+import benchmark_utils
+
+
+def _synthetic_talents_file(tmp_dir: str, count: int) -> str:
+    """Write count generated talents to talents.json under tmp_dir and return its path."""
+    json_path = os.path.join(tmp_dir, 'talents.json')
+    synthetic_data.generate_file(benchmark_utils.talent_schema_path(), json_path, count)
+    return json_path
+
+
+def bench_generate(count: int) -> dict:
+    """Time generating and writing count talents."""
+    with benchmark_utils.temp_dir() as tmp_dir:
+        start = time.perf_counter()
+        json_path = _synthetic_talents_file(tmp_dir, count)
+        elapsed = time.perf_counter() - start
+        file_kib = os.path.getsize(json_path) / 1024
+    return {
+        'generate_secs': elapsed,
+        'generate_objs_per_sec': count / elapsed,
+        'file_kib': file_kib
+    }
+
+
+def bench_load(count: int) -> dict:
+    """Time the JSONC loading paths on count talents: uncached, cached and streamed."""
+    with benchmark_utils.temp_dir() as tmp_dir, mock.patch('utilities.get_cache_dir', mock.Mock(return_value=tmp_dir)):
+        json_path = _synthetic_talents_file(tmp_dir, count)
+
+        start = time.perf_counter()
+        jsonc_loader.load(json_path, use_cache=False)
+        uncached_secs = time.perf_counter() - start
+
+        jsonc_loader.load(json_path)  # Fill the cache
+        start = time.perf_counter()
+        jsonc_loader.load(json_path)
+        cached_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in jsonc_loader.iter_array(json_path):
+            pass
+        streamed_secs = time.perf_counter() - start
+
+    return {
+        'uncached_load_secs': uncached_secs,
+        'cached_load_secs': cached_secs,
+        'iter_array_secs': streamed_secs
+    }
+
+
+def bench_validate(count: int) -> dict:
+    """Time _validate_json_file on count talents, with a cold validator cache."""
+    with benchmark_utils.temp_dir() as tmp_dir, mock.patch('json_validator.LOGGER'):
+        json_path = _synthetic_talents_file(tmp_dir, count)
+        schema_registry.clear()
+        start = time.perf_counter()
+        if not json_validator._validate_json_file(json_path, benchmark_utils.talent_schema_path()):
+            raise json_validator.ValidatorException('Synthetic talents failed validation!')
+        elapsed = time.perf_counter() - start
+    return {
+        'validate_secs': elapsed,
+        'validate_objs_per_sec': count / elapsed
+    }
+
+
+def bench_compile(count: int) -> dict:
+    """Time rendering every talent view with _render_talent_views() on count talents."""
+    with benchmark_utils.temp_dir() as tmp_dir, mock.patch('database_compiler.LOGGER'), mock.patch('talent_graph.LOGGER'):
+        talents_list = jsonc_loader.load(_synthetic_talents_file(tmp_dir, count), use_cache=False)
+        md_paths = [os.path.join(tmp_dir, view_name) for view_name in sorted(database_compiler._TALENT_VIEWS)]
+        start = time.perf_counter()
+        database_compiler._render_talent_views(talents_list, md_paths, mock.Mock())
+        elapsed = time.perf_counter() - start
+    return {
+        'compile_secs': elapsed,
+        'compile_objs_per_sec': count / elapsed
+    }
@@ -0,0 +1,34 @@
+"""Benchmarks for talent_graph.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import time
+import random
+import talent_db
+import talent_graph
+import synthetic_data
+import benchmark_utils
+
+_QUERY_COUNT = 10000
+"""Number of closure lookups to time."""
+
+
+def bench_prerequisite_graph(count: int) -> dict:
+    """Time building the graph and its closure, then closure lookups, for a synthetic catalog (try -n 50000)."""
+    talents = talent_db.TalentDB(synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count))
+
+    start = time.perf_counter()
+    graph = talent_graph.PrerequisiteGraph(talents)
+    build_secs = time.perf_counter() - start
+
+    rng = random.Random(0)
+    names = [talents.talents[rng.randrange(count)]['name'] for _ in range(_QUERY_COUNT)]
+    start = time.perf_counter()
+    for name in names:
+        graph.prerequisite_mask(name)
+        graph.unlocked_mask(name)
+    query_secs = time.perf_counter() - start
+
+    return {
+        'build_secs': build_secs,
+        'closure_mb': sum(mask.bit_length() for mask in graph._all_prerequisites + graph._all_unlocked) / 8 / 2**20,
+        'lookups_per_sec': 2 * _QUERY_COUNT / query_secs
+    }
@@ -0,0 +1,40 @@
+"""Benchmarks for talent_matrix.py. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import time
+import random
+import talent_db
+import talent_matrix
+import synthetic_data
+import benchmark_utils
+
+_CHARACTER_COUNT = 1000
+"""Number of characters to check against the whole catalog."""
+
+
+def bench_batch_eligibility(count: int) -> dict:
+    """Compare per-dict eligibility checks with one vectorized call for a batch of characters."""
+    talents = talent_db.TalentDB(synthetic_data.generate_objects(benchmark_utils.talent_schema_path(), count))
+    rng = random.Random(0)
+    characters = [{attribute: rng.randint(-1, 4) for attribute in talent_db.ATTRIBUTES} for _ in range(_CHARACTER_COUNT)]
+
+    start = time.perf_counter()
+    for character in characters:
+        for talent in talents:
+            all(character.get(attribute, 0) >= threshold
+                for attribute, threshold in talent['prerequisites'].get('attributes', {}).items())
+    dict_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = talent_matrix.TalentMatrix(talents)
+    compile_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix.eligible(matrix.attribute_vectors(characters))
+    vector_secs = time.perf_counter() - start
+
+    return {
+        'dict_checks_per_sec': count * _CHARACTER_COUNT / dict_secs,
+        'compile_secs': compile_secs,
+        'vector_checks_per_sec': count * _CHARACTER_COUNT / vector_secs,
+        'speedup': dict_secs / vector_secs
+    }
@@ -0,0 +1,68 @@
+"""Shared helpers for the benchmark modules. Benchmarks should not be run directly! Run them using run_benchmark.py."""
+
+import os
+import sys
+import json
+import tempfile
+import time
+import subprocess
+import utilities
+
+class BudgetExceededError(Exception):
+    """Exception class for a metric that is over its budget."""
+
+
+def write_jsonc(path: str, json_list: list) -> None:
+    """Write json_list to path as a JSON array with a line comment before every object."""
+    with open(path, 'w') as json_fp:
+        json_fp.write('[\n')
+        for index, my_obj in enumerate(json_list):
+            separator = ',\n' if index else ''
+            json_fp.write(f'{separator}    // Object {index}\n    {json.dumps(my_obj)}')
+        json_fp.write('\n]\n')
+
+
+def temp_dir() -> tempfile.TemporaryDirectory:
+    """Return a temporary directory for benchmark artifacts; use as a context manager."""
+    return tempfile.TemporaryDirectory(prefix='helgrind_bench_')
+
+
+def talent_schema_path() -> str:
+    """Return the path to talent_schema.json in this worktree."""
+    return os.path.join(utilities.get_root_dir(), 'library', 'schemas', 'talent_schema.json')
+
+
+def statblock_schema_path() -> str:
+    """Return the path to statblock_schema.json in this worktree."""
+    return os.path.join(utilities.get_root_dir(), 'library', 'schemas', 'statblock_schema.json')
+
+
+_PEAK_RSS_FOOTER = '''
+with open('/proc/self/status', 'r') as status_fp:
+    print(next(line.split()[1] for line in status_fp if line.startswith('VmHWM:')))
+'''
+"""Appended to a measured script to print its peak RSS (KiB). VmHWM is used since Linux carries ru_maxrss over across exec."""
+
+
+def peak_rss_kib(script: str, *script_args: str) -> int:
+    """Run script in a fresh interpreter from the scripts dir and return its peak RSS in KiB (Linux only)."""
+    output = subprocess.check_output([sys.executable, '-c', script + _PEAK_RSS_FOOTER, *script_args],
+                                     cwd=os.path.join(utilities.get_root_dir(), 'scripts'), encoding='UTF-8')
+    return int(output.strip().splitlines()[-1])
+
+
+def cold_start_ms(args: list, runs: int) -> float:
+    """Run a fresh interpreter with args from the scripts dir runs times and return the median wall time in ms."""
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=os.path.join(utilities.get_root_dir(), 'scripts'),
+                       stdout=subprocess.DEVNULL, check=True)
+        seconds.append(time.perf_counter() - start)
+    return sorted(seconds)[len(seconds) // 2] * 1000
+
+
+def enforce_budget(metric: str, value: float, budget: float) -> None:
+    """Raise BudgetExceededError if value is over budget."""
+    if value > budget:
+        raise BudgetExceededError(f'{metric} is {value:.1f}, over its budget of {budget}!')
@@ -0,0 +1,270 @@
+"""Memory-mapped binary database of the JSON library, built by database_compiler.
+
+File layout (all integers little-endian):
+    header:     magic, format version, section count, size of the section name table
+    directory:  one (name offset, name length, offset, length) entry per section
+    names:      UTF-8 section names, referenced from the directory, so collection names can be any length
+    sections:
+        strings             UTF-8 string table; strings are referenced by (offset, length)
+        records:<name>      one fixed-width record per object of collection <name>: name and
+                            compact JSON body as string references, plus the object's level
+        names:<name>        (key offset, key length, record) entries sorted by normalized name
+        levels:<name>       record numbers sorted by level, then by name
+        level_dir:<name>    (level, start, count) entries into levels:<name>, sorted by level
+
+Readers map the file and only decode what they touch: opening a database reads the header and
+directory, a name lookup is a binary search over the names section, and a level slice is a
+binary search over the level directory. Nothing is parsed up front, so start-up time doesn't
+grow with the size of the library.
+"""
+
+import os
+import mmap
+import json
+import struct
+import logging
+import itertools
+import talent_db
+import utilities
+from typing import NamedTuple
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_MAGIC = b'HGDB'
+"""Magic bytes at the start of every database file."""
+
+_FORMAT_VERSION = 2
+"""Version of the file layout; readers refuse any other version."""
+
+_HEADER = struct.Struct('<4sIII')
+"""Magic, format version, section count, section name table length in bytes."""
+
+_DIRECTORY_ENTRY = struct.Struct('<IIQQ')
+"""Section name offset and length in the name table, section offset from the start of the file, section length in bytes."""
+
+_RECORD = struct.Struct('<IIIIi')
+"""Name offset, name length, body offset, body length, level."""
+
+_NAME_ENTRY = struct.Struct('<III')
+"""Normalized name offset, normalized name length, record number."""
+
+_INDEX_ENTRY = struct.Struct('<I')
+"""Record number."""
+
+_LEVEL_ENTRY = struct.Struct('<iII')
+"""Level, start position in the levels section, number of records."""
+
+
+class BinaryDatabaseError(Exception):
+    """Exception class for malformed database files."""
+
+
+def database_path() -> str:
+    """Return the path to the database database_compiler generates in this worktree."""
+    return os.path.join(utilities.get_root_dir(), 'generated', 'library.hgdb')
+
+
+class _StringTable:
+    """Deduplicating UTF-8 string table under construction."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets = {}
+
+    def add(self, text: str) -> tuple:
+        """Add text (if it isn't in the table yet) and return its (offset, length)."""
+        if text not in self._offsets:
+            encoded = text.encode('UTF-8')
+            self._offsets[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self._offsets[text]
+
+
+def write_database(collections: dict, db_path: str) -> None:
+    """Write collections to a database file at db_path, replacing it atomically.
+
+    Args:
+        collections: Dict mapping collection name (e.g. 'talents') to its list of objects.
+        db_path: Path of the database file.
+    """
+    strings = _StringTable()
+    sections = []
+    for name in sorted(collections):
+        json_list = [my_obj for my_obj in collections[name] if isinstance(my_obj, dict)]
+        records = bytearray()
+        name_keys = []
+        levels = []
+        for index, my_obj in enumerate(json_list):
+            obj_name = str(my_obj.get('name', ''))
+            level = talent_db.object_level(my_obj)
+            records += _RECORD.pack(*strings.add(obj_name), *strings.add(json.dumps(my_obj, separators=(',', ':'))), level)
+            name_keys.append((talent_db.normalize_name(obj_name).encode('UTF-8'), index))
+            levels.append((level, obj_name, index))
+
+        names = bytearray()
+        for key, index in sorted(name_keys):
+            names += _NAME_ENTRY.pack(*strings.add(key.decode('UTF-8')), index)
+
+        levels.sort()
+        level_index = bytearray()
+        for _, _, index in levels:
+            level_index += _INDEX_ENTRY.pack(index)
+        level_dir = bytearray()
+        start = 0
+        for level, group in itertools.groupby(levels, key=lambda entry: entry[0]):
+            count = sum(1 for _ in group)
+            level_dir += _LEVEL_ENTRY.pack(level, start, count)
+            start += count
+
+        sections += [(f'records:{name}', records), (f'names:{name}', names),
+                     (f'levels:{name}', level_index), (f'level_dir:{name}', level_dir)]
+    sections.insert(0, ('strings', strings.data))
+
+    section_names = bytearray()
+    for section_name, _ in sections:
+        section_names += section_name.encode('UTF-8')
+    offset = _HEADER.size + _DIRECTORY_ENTRY.size * len(sections) + len(section_names)
+    directory = bytearray()
+    name_offset = 0
+    for section_name, data in sections:
+        name_length = len(section_name.encode('UTF-8'))
+        directory += _DIRECTORY_ENTRY.pack(name_offset, name_length, offset, len(data))
+        name_offset += name_length
+        offset += len(data)
+
+    tmp_path = f'{db_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as db_fp:
+        db_fp.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(sections), len(section_names)))
+        db_fp.write(directory)
+        db_fp.write(section_names)
+        for _, data in sections:
+            db_fp.write(data)
+    os.replace(tmp_path, db_path)
+    LOGGER.debug('-- Wrote %d collection(s) to %s (%d bytes)', len(collections), db_path, offset)
+
+
+class Record(NamedTuple):
+    """A record of a collection; body is only decoded on request."""
+    name: str
+    level: int
+    body_offset: int
+    body_length: int
+
+
+class BinaryDatabase:
+    """Read-only view of a database file, memory-mapped and decoded lazily.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, db_path: str=None):
+        """Map the file and read its section directory; defaults to the database in this worktree.
+
+        Raises:
+            BinaryDatabaseError: Error if db_path is not a database file or has another format version.
+        """
+        db_path = db_path if db_path is not None else database_path()
+        self.path = db_path
+        with open(db_path, 'rb') as db_fp:
+            if os.fstat(db_fp.fileno()).st_size < _HEADER.size:
+                raise BinaryDatabaseError(f'{db_path} is too short to be a database!')
+            self._mmap = mmap.mmap(db_fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._sections = {}
+        magic, version, section_count, names_length = _HEADER.unpack_from(self._view, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            self.close()
+            raise BinaryDatabaseError(f'{db_path} is not a version {_FORMAT_VERSION} database!')
+        names_start = _HEADER.size + section_count * _DIRECTORY_ENTRY.size
+        section_names = self._view[names_start:names_start + names_length]
+        for position in range(section_count):
+            name_offset, name_length, offset, length = _DIRECTORY_ENTRY.unpack_from(self._view, _HEADER.size + position * _DIRECTORY_ENTRY.size)
+            self._sections[str(section_names[name_offset:name_offset + name_length], 'UTF-8')] = self._view[offset:offset + length]
+        section_names.release()
+        self._strings = self._sections['strings']
+
+    def __enter__(self) -> 'BinaryDatabase':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._sections = {}
+        self._strings = None
+        self._view.release()
+        self._mmap.close()
+
+    def _string(self, offset: int, length: int) -> str:
+        """Return a string from the string table."""
+        return str(self._strings[offset:offset + length], 'UTF-8')
+
+    def _section(self, kind: str, collection: str) -> memoryview:
+        """Return a section of collection; raise KeyError if the collection isn't in the database."""
+        try:
+            return self._sections[f'{kind}:{collection}']
+        except KeyError:
+            raise KeyError(f'No collection "{collection}" in {self.path}!') from None
+
+    def collections(self) -> list:
+        """Return the sorted names of every collection in the database."""
+        return sorted(name.split(':', 1)[1] for name in self._sections if name.startswith('records:'))
+
+    def count(self, collection: str) -> int:
+        """Return the number of objects in collection."""
+        return len(self._section('records', collection)) // _RECORD.size
+
+    def record(self, collection: str, index: int) -> Record:
+        """Return record number index of collection, without decoding its body."""
+        name_offset, name_length, body_offset, body_length, level = _RECORD.unpack_from(self._section('records', collection), index * _RECORD.size)
+        return Record(self._string(name_offset, name_length), level, body_offset, body_length)
+
+    def body(self, record: Record) -> dict:
+        """Decode the object a record was built from."""
+        return json.loads(self._string(record.body_offset, record.body_length))
+
+    def find(self, collection: str, name: str) -> Record:
+        """Return the record of the object called name (see talent_db.normalize_name()), or None."""
+        names = self._section('names', collection)
+        key = talent_db.normalize_name(name).encode('UTF-8')
+        low, high = 0, len(names) // _NAME_ENTRY.size
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, index = _NAME_ENTRY.unpack_from(names, middle * _NAME_ENTRY.size)
+            candidate = bytes(self._strings[key_offset:key_offset + key_length])
+            if candidate == key:
+                return self.record(collection, index)
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, collection: str, name: str) -> dict:
+        """Return the object called name in collection, or None if there isn't one."""
+        record = self.find(collection, name)
+        return self.body(record) if record is not None else None
+
+    def levels(self, collection: str) -> list:
+        """Return the sorted list of every level used in collection."""
+        level_dir = self._section('level_dir', collection)
+        return [entry[0] for entry in _LEVEL_ENTRY.iter_unpack(level_dir)]
+
+    def by_level(self, collection: str, level: int) -> list:
+        """Return the records of collection at level, sorted by name, without decoding their bodies."""
+        level_dir = self._section('level_dir', collection)
+        low, high = 0, len(level_dir) // _LEVEL_ENTRY.size
+        while low < high:
+            middle = (low + high) // 2
+            entry_level, start, count = _LEVEL_ENTRY.unpack_from(level_dir, middle * _LEVEL_ENTRY.size)
+            if entry_level == level:
+                level_index = self._section('levels', collection)
+                return [self.record(collection, _INDEX_ENTRY.unpack_from(level_index, position * _INDEX_ENTRY.size)[0])
+                        for position in range(start, start + count)]
+            if entry_level < level:
+                low = middle + 1
+            else:
+                high = middle
+        return []
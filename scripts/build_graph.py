@@ -0,0 +1,118 @@
+"""Make-style dependency tracking for generated files, so only stale outputs get rebuilt."""
+
+import os
+import json
+import logging
+import utilities
+from typing import NamedTuple
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_MANIFEST_NAME = 'build_manifest.json'
+"""File name of the build manifest inside the worktree cache dir."""
+
+_MANIFEST_VERSION = 1
+"""Version of the manifest format; manifests with any other version are discarded."""
+
+
+class BuildTarget(NamedTuple):
+    """A generated file and everything it is built from."""
+    output: str  # Absolute path of the generated file
+    inputs: tuple  # Absolute paths of the JSON files it is generated from
+    schemas: tuple  # Absolute paths of the schemas those files are validated with
+    handler: object  # Function that builds output, see database_compiler
+
+
+class BuildGraph:
+    """Records what each generated file was built from and decides whether it is stale.
+
+    A target is stale if it has never been built, if its output is missing or was edited by
+    hand, if the compiler version changed, or if any of its inputs or schemas were added,
+    removed or changed since it was last built.
+    """
+
+    def __init__(self, compiler_version: str, root: str=None, manifest_path: str=None):
+        """Load the build manifest.
+
+        Args:
+            compiler_version: Version of the code that builds targets; a change makes every target stale.
+            root: Root of the worktree; paths in the manifest are stored relative to it.
+            manifest_path: Path to the manifest; defaults to the manifest in the worktree cache dir.
+        """
+        self.root = root if root is not None else utilities.get_root_dir()
+        self.compiler_version = compiler_version
+        self.path = manifest_path if manifest_path is not None else os.path.join(utilities.get_cache_dir(self.root), _MANIFEST_NAME)
+        self.targets = {}
+        self._hashes = {}  # Hash of every file seen during this build, so shared inputs are only hashed once
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r') as manifest_fp:
+                    manifest = json.load(manifest_fp)
+            except (OSError, ValueError) as excpt:
+                LOGGER.warning('Ignoring unreadable build manifest %s: %s', self.path, excpt)
+                return
+            if manifest.get('version') == _MANIFEST_VERSION:
+                self.targets = manifest.get('targets', {})
+
+    def _rel(self, path: str) -> str:
+        """Return path relative to the worktree root, with forward slashes."""
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def _hash(self, path: str, refresh: bool=False) -> str:
+        """Return the hash of the file at path, or None if it doesn't exist."""
+        if refresh or path not in self._hashes:
+            self._hashes[path] = utilities.hash_file(path) if os.path.isfile(path) else None
+        return self._hashes[path]
+
+    def _hash_all(self, paths: tuple) -> dict:
+        """Return a dict mapping each path (relative to root) to its hash."""
+        return {self._rel(path): self._hash(path) for path in paths}
+
+    def stale_reasons(self, target: BuildTarget) -> list:
+        """Explain why target needs to be rebuilt.
+
+        Args:
+            target: Target to check.
+
+        Returns:
+            List of human-readable reasons; empty if the target is up to date.
+        """
+        record = self.targets.get(self._rel(target.output))
+        if record is None:
+            return ['it has never been built']
+        if not os.path.isfile(target.output):
+            return ['the output file is missing']
+
+        reasons = []
+        if record.get('compiler_version') != self.compiler_version:
+            reasons.append('the compiler changed')
+        if record.get('output') != self._hash(target.output):
+            reasons.append('the output file was modified after it was built')
+        for kind in ('inputs', 'schemas'):
+            old_hashes = record.get(kind, {})
+            new_hashes = self._hash_all(getattr(target, kind))
+            for path in sorted(new_hashes.keys() | old_hashes.keys()):
+                if path not in old_hashes:
+                    reasons.append(f'{path} was added to its {kind}')
+                elif path not in new_hashes:
+                    reasons.append(f'{path} was removed from its {kind}')
+                elif old_hashes[path] != new_hashes[path]:
+                    reasons.append(f'{path} changed')
+        return reasons
+
+    def record(self, target: BuildTarget) -> None:
+        """Record that target was just built from the current versions of its inputs and schemas."""
+        self.targets[self._rel(target.output)] = {
+            'compiler_version': self.compiler_version,
+            'output': self._hash(target.output, refresh=True),
+            'inputs': self._hash_all(target.inputs),
+            'schemas': self._hash_all(target.schemas)
+        }
+
+    def save(self) -> None:
+        """Write the manifest to self.path."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as manifest_fp:
+            json.dump({'version': _MANIFEST_VERSION, 'targets': self.targets}, manifest_fp, indent=4)
+        os.replace(tmp_path, self.path)
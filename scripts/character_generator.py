@@ -0,0 +1,393 @@
+"""Script to generate characters of any level in bulk from the talents in the library.
+
+Talent choices are made with bitmasks: talent i is bit i of every mask (see talent_graph), so
+finding the talents a character can take at a level up is a handful of bitwise operations.
+Every character gets its own random generator seeded from the run seed and its index, so
+output is reproducible and doesn't depend on how many processes generated it.
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import random
+import logging
+import argparse
+import concurrent.futures
+import talent_db
+import utilities
+import name_index
+import talent_graph
+import jsonc_loader
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_ROOT = utilities.get_root_dir()
+"""Root dir of the worktree."""
+
+_JSON_DIR = os.path.join(_ROOT, 'library', 'json')
+"""Path to JSON directory in the worktree."""
+
+_STARTING_SCORES = (-1, 2)
+"""Inclusive range that starting attribute scores are rolled in."""
+
+_ATTRIBUTE_INCREASE_LEVELS = 2
+"""A character gets +1 to a random attribute at every level that is a multiple of this."""
+
+_TALENTS_PER_LEVEL = 1
+"""Number of talents a character picks at every level, including level 1."""
+
+_CHUNK_SIZE = 256
+"""Number of characters generated by each worker task."""
+
+
+class CharacterGeneratorError(Exception):
+    """Exception class for character generation errors."""
+
+
+def _random_bit(mask: int, rng: random.Random) -> int:
+    """Return the index of a uniformly chosen set bit of mask, which must not be 0.
+
+    The n-th set bit is found by bisecting on the popcount of the low bits of mask, so a pick
+    costs O(log talents) big-int operations rather than a walk over every set bit.
+    """
+    target = rng.randrange(mask.bit_count())
+    low, high = 0, mask.bit_length() - 1
+    while low < high:
+        middle = (low + high) // 2
+        if (mask & ((2 << middle) - 1)).bit_count() > target:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class TalentPicker:
+    """Talent prerequisites compiled into bitmasks for level up choices.
+
+    Precomputed masks:
+        - talents available at or below each level
+        - talents available to each ancestry
+        - per attribute, the talents blocked by any score, via sorted thresholds and suffix masks
+        - talents whose other_talents can never be met, because they aren't known talents or are
+          on (or downstream of) a prerequisite cycle
+    """
+
+    def __init__(self, talents: talent_db.TalentDB):
+        """Compile the masks for talents.
+
+        Args:
+            talents: Talent catalog to pick from.
+        """
+        self.talents = talents
+        self.graph = talent_graph.PrerequisiteGraph(talents)
+        self.names = [talent.get('name', '') for talent in talents]
+
+        # Built from the rows, not by name lookups, so every talent that shares a name gets its own bit
+        level_bits = {}
+        self._ancestry_masks = {}
+        for index, talent in enumerate(talents):
+            level = talent_db.talent_level(talent)
+            level_bits[level] = level_bits.get(level, 0) | 1 << index
+            ancestry = talent.get('prerequisites', {}).get('ancestry')
+            ancestry_key = talent_db.normalize_name(ancestry) if ancestry is not None else None
+            self._ancestry_masks[ancestry_key] = self._ancestry_masks.get(ancestry_key, 0) | 1 << index
+
+        # Cumulative masks: talents with a level prerequisite at or below each used level
+        self._levels = talents.levels()
+        self._level_masks = []
+        mask = 0
+        for level in self._levels:
+            mask |= level_bits[level]
+            self._level_masks.append(mask)
+
+        # Per attribute, talents sorted by threshold with suffix masks: _blocked[attribute][i] holds
+        # every talent from position i on, i.e. every talent whose threshold is above a score that bisects to i
+        self._thresholds = {}
+        self._blocked = {}
+        for attribute in talent_db.ATTRIBUTES:
+            pairs = sorted((talent['prerequisites']['attributes'][attribute], index)
+                           for index, talent in enumerate(talents)
+                           if attribute in talent.get('prerequisites', {}).get('attributes', {}))
+            suffix_masks = [0] * (len(pairs) + 1)
+            for position in range(len(pairs) - 1, -1, -1):
+                suffix_masks[position] = suffix_masks[position + 1] | 1 << pairs[position][1]
+            self._thresholds[attribute] = [threshold for threshold, _ in pairs]
+            self._blocked[attribute] = suffix_masks
+
+        # By index, not name, so a duplicated name can't mask the wrong talent. Talents on or downstream of
+        # a cycle are left out of the graph's topological order and get an empty closure, so mask them too
+        self._unresolvable = ((1 << len(self.names)) - 1) & ~sum(1 << index for index in self.graph.topological_order)
+        for index, talent in enumerate(talents):
+            if any(talents.index_of(reference) is None for reference in talent.get('prerequisites', {}).get('other_talents', [])):
+                self._unresolvable |= 1 << index
+        self._roots = 0
+        for index, prerequisites in enumerate(self.graph.direct_prerequisites):
+            if not prerequisites:
+                self._roots |= 1 << index
+        self._roots &= ~self._unresolvable
+        self._name_index = None  # Only built if a character has a talent that isn't in the catalog
+
+    def level_mask(self, level: int) -> int:
+        """Return the mask of talents with a level prerequisite of level or lower."""
+        position = bisect.bisect_right(self._levels, level)
+        return self._level_masks[position - 1] if position else 0
+
+    def ancestry_mask(self, ancestry: str) -> int:
+        """Return the mask of talents available to ancestry (None for no ancestry)."""
+        mask = self._ancestry_masks.get(None, 0)
+        if ancestry is not None:
+            mask |= self._ancestry_masks.get(talent_db.normalize_name(ancestry), 0)
+        return mask
+
+    def attribute_mask(self, attributes: dict) -> int:
+        """Return the mask of talents whose attribute prerequisites are all met by attributes."""
+        blocked = 0
+        for attribute in talent_db.ATTRIBUTES:
+            blocked |= self._blocked[attribute][bisect.bisect_right(self._thresholds[attribute], attributes.get(attribute, 0))]
+        return ((1 << len(self.names)) - 1) & ~blocked
+
+    def _unlock(self, index: int, owned_mask: int, unlocked_mask: int) -> int:
+        """Return unlocked_mask plus every talent whose other_talents were all met by taking talent index."""
+        for dependent in self.graph.direct_dependents[index]:
+            if not self.graph.direct_prerequisites[dependent] & ~owned_mask:
+                unlocked_mask |= 1 << dependent
+        return unlocked_mask & ~self._unresolvable
+
+    def unlocked_mask(self, owned_mask: int) -> int:
+        """Return the mask of talents whose other_talents are all in owned_mask."""
+        unlocked_mask = self._roots
+        for index in talent_graph.iter_bits(owned_mask):
+            unlocked_mask = self._unlock(index, owned_mask, unlocked_mask)
+        return unlocked_mask
+
+    def level_up(self, character: dict, level: int, rng: random.Random) -> dict:
+        """Level character up to level, picking attributes and talents at every level on the way.
+
+        Args:
+            character: Character dict with 'level', 'ancestry', 'attributes' and 'talents' keys;
+                updated in place. Talents it already has that aren't in the catalog are kept but
+                don't count towards prerequisites.
+            level: Level to reach.
+            rng: Random generator for the choices.
+
+        Returns:
+            character.
+        """
+        attributes = character['attributes']
+        talents = character['talents']
+        for name in talents:
+            if name not in self.talents:
+                if self._name_index is None:
+                    self._name_index = name_index.NameIndex(self.names)
+                suggestions = self._name_index.suggest(name, limit=1)
+                hint = f' (did you mean "{suggestions[0].name}"?)' if suggestions else ''
+                LOGGER.warning('%s has talent "%s", which is not in the catalog%s', character.get('name'), name, hint)
+        owned_mask = self.graph.mask_of(name for name in talents if name in self.talents)
+        unlocked_mask = self.unlocked_mask(owned_mask)
+        ancestry_mask = self.ancestry_mask(character.get('ancestry'))
+
+        for new_level in range(character['level'] + 1, level + 1):
+            if new_level % _ATTRIBUTE_INCREASE_LEVELS == 0:
+                attributes[rng.choice(talent_db.ATTRIBUTES)] += 1
+            available_mask = unlocked_mask & self.level_mask(new_level) & ancestry_mask & self.attribute_mask(attributes)
+            for _ in range(_TALENTS_PER_LEVEL):
+                eligible_mask = available_mask & ~owned_mask
+                if not eligible_mask:
+                    LOGGER.debug('%s has no talents to pick from at level %d', character.get('name'), new_level)
+                    break
+                index = _random_bit(eligible_mask, rng)
+                owned_mask |= 1 << index
+                unlocked_mask = self._unlock(index, owned_mask, unlocked_mask)
+                talents.append(self.names[index])
+        character['level'] = max(character['level'], level)
+        return character
+
+    def new_character(self, name: str, level: int, rng: random.Random, ancestry: str=None) -> dict:
+        """Roll a new character and level it up to level.
+
+        Args:
+            name: Name of the character.
+            level: Level of the character.
+            rng: Random generator for every choice.
+            ancestry: Ancestry of the character, or None.
+
+        Returns:
+            Character dict.
+        """
+        character = {
+            'name': name,
+            'level': 0,
+            'ancestry': ancestry,
+            'attributes': {attribute: rng.randint(*_STARTING_SCORES) for attribute in talent_db.ATTRIBUTES},
+            'talents': []
+        }
+        return self.level_up(character, level, rng)
+
+
+# ======== Bulk generation ========
+_WORKER_PICKER = None
+"""TalentPicker of a worker process, see _init_worker()."""
+
+
+def _init_worker(talents_list: list) -> None:
+    """Compile the TalentPicker once per worker process."""
+    global _WORKER_PICKER
+    _WORKER_PICKER = TalentPicker(talent_db.TalentDB(talents_list))
+
+
+def _generate_chunk(picker: TalentPicker, start: int, stop: int, level: int, seed: int, ancestries: tuple) -> list:
+    """Generate characters start to stop - 1, each with its own generator seeded from (seed, index)."""
+    characters = []
+    for index in range(start, stop):
+        rng = random.Random(f'{seed}:{index}')
+        ancestry = rng.choice(ancestries) if ancestries else None
+        characters.append(picker.new_character(f'Character_{index}', level, rng, ancestry))
+    return characters
+
+
+def _worker_chunk(start: int, stop: int, level: int, seed: int, ancestries: tuple) -> list:
+    """Generate a chunk of characters in a worker process."""
+    return _generate_chunk(_WORKER_PICKER, start, stop, level, seed, ancestries)
+
+
+def generate_characters(talents_list: list, count: int, level: int, seed: int=0, ancestries: tuple=(), jobs: int=None) -> list:
+    """Generate count characters of level, spread across worker processes.
+
+    Args:
+        talents_list: Parsed contents of talents.json.
+        count: Number of characters.
+        level: Level of every character.
+        seed: Run seed; the same seed always gives the same characters.
+        ancestries: Ancestries to choose from; characters have no ancestry if empty.
+        jobs: Number of worker processes; defaults to the number of CPUs.
+
+    Returns:
+        List of character dicts, in index order.
+    """
+    ancestries = tuple(ancestries)
+    chunks = [(start, min(start + _CHUNK_SIZE, count)) for start in range(0, count, _CHUNK_SIZE)]
+    jobs = min(jobs or os.cpu_count(), len(chunks))
+    if jobs <= 1:
+        # Not worth the cost of starting a pool
+        picker = TalentPicker(talent_db.TalentDB(talents_list))
+        return [character for start, stop in chunks for character in _generate_chunk(picker, start, stop, level, seed, ancestries)]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(talents_list,)) as executor:
+        futures = [executor.submit(_worker_chunk, start, stop, level, seed, ancestries) for start, stop in chunks]
+        return [character for future in futures for character in future.result()]
+# ======== End bulk generation ========
+
+
+def _process_args(argv: list) -> argparse.Namespace:
+    """Parse and process arguments; convert to argparse.Namespace object.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        args: Parsed args with args as properties on the object.
+    """
+    parser = argparse.ArgumentParser(os.path.basename(__file__), description='Generate characters of any level in bulk.')
+    parser.add_argument(
+        '-n',
+        '--count',
+        help='Number of characters to generate (default=1).',
+        dest='count',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '-l',
+        '--level',
+        help='Level of the generated characters (default=1).',
+        dest='level',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        help='Seed for the random choices; the same seed always gives the same characters (default=0).',
+        dest='seed',
+        type=int,
+        default=0
+    )
+    parser.add_argument(
+        '-A',
+        '--ancestry',
+        help='Ancestry of every character. If not specified, ancestries are picked from ancestries.json, if it exists.',
+        dest='ancestry',
+        default=None
+    )
+    parser.add_argument(
+        '-i',
+        '--input_file',
+        help='Talents JSON file to pick talents from (default=talents.json in the library).',
+        dest='talents_path',
+        default=os.path.join(_JSON_DIR, 'talents.json')
+    )
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Write the characters to this JSON file. If not specified, they are only counted.',
+        dest='output_path',
+        default=None
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help='Number of worker processes (default=number of CPUs).',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count()
+    )
+    args = utilities.parser_setup(parser, argv, LOGGER)
+
+    if args.count < 0:
+        raise CharacterGeneratorError(f'Cannot generate {args.count} characters!')
+    if args.level < 1:
+        raise CharacterGeneratorError(f'Characters must be level 1 or higher, not {args.level}!')
+    if not os.path.isfile(args.talents_path):
+        raise FileNotFoundError(f'Talents file {args.talents_path} does not exist!')
+    return args
+
+
+def _load_ancestries() -> list:
+    """Return the names of the ancestries in ancestries.json, or an empty list if there isn't one."""
+    ancestries_path = os.path.join(_JSON_DIR, 'ancestries.json')
+    if not os.path.isfile(ancestries_path):
+        LOGGER.info('%s does not exist; characters will have no ancestry.', ancestries_path)
+        return []
+    return [ancestry['name'] for ancestry in jsonc_loader.load(ancestries_path) if 'name' in ancestry]
+
+
+def main(argv: list) -> list:
+    """Process args and generate characters.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        List of generated characters.
+    """
+    args = _process_args(argv)
+    ancestries = [args.ancestry] if args.ancestry is not None else _load_ancestries()
+
+    start = time.perf_counter()
+    characters = generate_characters(jsonc_loader.load(args.talents_path), args.count, args.level, args.seed, ancestries, args.jobs)
+    seconds = time.perf_counter() - start
+    rate = len(characters) / seconds if seconds else float('inf')
+    print(f'Generated {len(characters)} level {args.level} character(s) in {seconds * 1000:.1f} ms ({rate:,.0f} characters/s).')
+
+    if args.output_path is not None:
+        with open(args.output_path, 'w') as out_fp:
+            json.dump(characters, out_fp, indent=4)
+        print(f'Characters written to {args.output_path}')
+    return characters
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -2,12 +2,21 @@
 
 import os
 import sys
-import json
-import jsmin
+import glob
+import time
 import logging
+import concurrent.futures
 import argparse
+import binary_db
+import talent_db
 import utilities
+import talent_graph
+import build_graph
+import sqlite_db
+import jsonc_loader
 import markdown_utils
+import instrumentation
+import library_watcher
 
 
 LOGGER = logging.getLogger(os.path.basename(__file__))
@@ -16,62 +25,350 @@ LOGGER = logging.getLogger(os.path.basename(__file__))
 _ROOT = utilities.get_root_dir()
 """Root dir of the worktree."""
 
-_JSON_DIR = os.path.join(_ROOT, 'library', 'json')
+_LIBRARY_DIR = os.path.join(_ROOT, 'library')
+"""Path to library directory in the worktree, watched by --watch."""
+
+_JSON_DIR = os.path.join(_LIBRARY_DIR, 'json')
 """Path to JSON directory in the worktree."""
 
-_GEN_MD_DIR = os.path.join(_ROOT, 'generated', 'markdown')
+_SCHEMA_DIR = os.path.join(_LIBRARY_DIR, 'schemas')
+"""Path to schema directory in the worktree."""
+
+_GEN_DIR = os.path.join(_ROOT, 'generated')
+"""Path to generated directory in the worktree."""
+
+_GEN_MD_DIR = os.path.join(_GEN_DIR, 'markdown')
 """Path to generated markdown directory in the worktree."""
 
+_COMPILER_SOURCES = [__file__, markdown_utils.__file__, jsonc_loader.__file__, talent_db.__file__, talent_graph.__file__,
+                     binary_db.__file__, sqlite_db.__file__]
+"""Source files whose contents make up the compiler version; editing any of them makes every generated file stale."""
+
+_STANDARD_LEVELS = range(1, 11)
+"""Levels that always get a section in generated lists, even if empty. Other levels get one only if they are used."""
+
+_WRITE_BUFFER_SIZE = 1 << 16
+"""Size in bytes of the write buffer for generated files."""
+
 
 # ======== Database compilation functions ========
-"""Database compilation handler functions; each function must have the signature 'func_name(input_path, args):'."""
-def _compile_talents(talents_path: str, args: argparse.Namespace):
-    """Generate markdown file for talents.
+_HANDLERS = []
+"""List of build_graph.BuildTargets for every registered handler, see _register_handler().
+
+The inputs of a target may be a function returning them instead of a tuple; _targets() resolves them.
+"""
+
+_BATCH_HANDLERS = set()
+"""Handlers that build every stale target registered with them in one call, e.g. _render_talent_views().
+
+Instead of one output path they take the list of output paths to build, and return a dict
+mapping each one to how long it took in seconds.
+"""
+
+
+def _register_handler(output_name: str, inputs: tuple, schemas: tuple=(), output_dir: str=_GEN_MD_DIR):
+    """Decorator that registers a database compilation handler function.
+
+    Handlers must have the signature 'func_name(*input_data, output_path, args):', where
+    input_data is the parsed contents of each file in inputs, in order. Each input is parsed
+    once per compile and shared by every handler that uses it, and one input may feed any
+    number of handlers. Handlers run in worker processes, so they must be module-level functions.
+
+    Args:
+        output_name: Name of the generated file under output_dir.
+        inputs: Names of the JSON files under _JSON_DIR the output is generated from, or a function
+            returning them, which is called again on every build so that files added since (e.g.
+            during --watch) are picked up.
+        schemas: Names of the schemas under _SCHEMA_DIR those files are validated with.
+        output_dir: Directory of the generated file.
+    """
+    def decorator(handler):
+        _HANDLERS.append(build_graph.BuildTarget(
+            output=os.path.join(output_dir, output_name),
+            inputs=inputs if callable(inputs) else _input_paths(inputs),
+            schemas=tuple(os.path.join(_SCHEMA_DIR, schema_name) for schema_name in schemas),
+            handler=handler
+        ))
+        return handler
+    return decorator
+
+
+def _input_paths(input_names) -> tuple:
+    """Return the paths under _JSON_DIR of input_names."""
+    return tuple(os.path.join(_JSON_DIR, input_name) for input_name in input_names)
+
+
+def _targets() -> list:
+    """Return the registered targets, with any inputs given as a function resolved as of now."""
+    return [target._replace(inputs=_input_paths(target.inputs())) if callable(target.inputs) else target for target in _HANDLERS]
+
+
+def _supported_files() -> list:
+    """Return the sorted paths of every file that is an input of a target."""
+    return sorted({in_file for target in _targets() for in_file in target.inputs})
+
+
+# ======== Talent views ========
+_TALENT_VIEWS = {}
+"""Dict mapping the file name of each talent view to its renderer, see _register_view()."""
+
+
+def _talent_name(talent: dict) -> str:
+    """Return the display name of a talent: its name with underscores as spaces."""
+    return talent.get('name', '').replace('_', ' ')
+
+
+class _TalentGroupings:
+    """Groupings and sort orders of the talent catalog, shared by every talent view.
+
+    Each grouping is built the first time a view asks for it and reused by every view after
+    that, so a compile sorts and groups the talents once however many views it renders, and
+    views that aren't stale don't cost anything.
+    """
+
+    def __init__(self, talents_list: list):
+        """Index talents_list, see talent_db.TalentDB."""
+        with instrumentation.span('index'):
+            self.talents = talent_db.TalentDB(talents_list)
+        self._name_order = None
+        self._by_attribute = None
+        self._by_ancestry = None
+        self._graph = None
+
+    @property
+    def name_order(self) -> list:
+        """Indexes of every talent in self.talents.talents, sorted by name."""
+        if self._name_order is None:
+            talents = self.talents.talents
+            self._name_order = sorted(range(len(talents)), key=lambda index: talents[index].get('name', ''))
+        return self._name_order
+
+    @property
+    def by_attribute(self) -> dict:
+        """Dict mapping each attribute in talent_db.ATTRIBUTES to (threshold, talent) of every talent that
+        requires it, sorted by threshold, then name."""
+        if self._by_attribute is None:
+            self._by_attribute = {attribute: [] for attribute in talent_db.ATTRIBUTES}
+            for index in self.name_order:
+                talent = self.talents.talents[index]
+                for attribute, threshold in talent.get('prerequisites', {}).get('attributes', {}).items():
+                    if attribute in self._by_attribute:
+                        self._by_attribute[attribute].append((threshold, talent))
+            for pairs in self._by_attribute.values():
+                pairs.sort(key=lambda pair: pair[0])  # Stable, so ties stay in name order
+        return self._by_attribute
+
+    @property
+    def by_ancestry(self) -> dict:
+        """Dict mapping each ancestry prerequisite (as first spelled) to its talents sorted by level, then name,
+        in order of the normalized ancestry."""
+        if self._by_ancestry is None:
+            by_ancestry = {}
+            for level in self.talents.levels():
+                for talent in self.talents.by_level(level):
+                    ancestry = talent.get('prerequisites', {}).get('ancestry')
+                    if ancestry is not None:
+                        by_ancestry.setdefault(talent_db.normalize_name(ancestry), (ancestry, []))[1].append(talent)
+            self._by_ancestry = dict(by_ancestry[key] for key in sorted(by_ancestry))
+        return self._by_ancestry
+
+    @property
+    def graph(self) -> talent_graph.PrerequisiteGraph:
+        """Prerequisite graph of the talents."""
+        if self._graph is None:
+            self._graph = talent_graph.PrerequisiteGraph(self.talents)
+        return self._graph
+
+
+def _render_talent_views(talents_list: list, md_paths: list, args: argparse.Namespace) -> dict:
+    """Generate the talent views at md_paths from one set of shared groupings.
 
     Args:
-        talents_path: Path to talents.json.
+        talents_list: Parsed contents of talents.json.
+        md_paths: Paths to the generated views; each file name must be a registered view.
         args: Unused args namespace.
 
+    Returns:
+        Dict mapping each path in md_paths to how long its view took to render in seconds.
+
     Post:
-        library/markdown/generated/talents_list.md is generated.
+        Every file in md_paths is generated.
     """
-    LOGGER.info('Generating markdown for talents...')
-    with open(talents_path, 'r') as json_fp:
-        talents_list = json.loads(jsmin.jsmin(json_fp.read()))
+    LOGGER.info('Generating %d talent view(s)...', len(md_paths))
+    groupings = _TalentGroupings(talents_list)
+    timings = {}
+    for md_path in md_paths:
+        view_name = os.path.basename(md_path)
+        LOGGER.debug('-- Writing %s...', view_name)
+        start = time.perf_counter()
+        with instrumentation.span(view_name), open(md_path, 'w', buffering=_WRITE_BUFFER_SIZE) as md_fp:
+            _TALENT_VIEWS[view_name](groupings, md_fp)
+        timings[md_path] = time.perf_counter() - start
+    return timings
+
+
+def _register_view(view_name: str):
+    """Decorator that registers a talent view, a markdown file generated from talents.json.
+
+    Views must have the signature 'func_name(groupings, md_fp):', where groupings is the
+    _TalentGroupings shared by every view and md_fp is the open output file. Each view is its
+    own build target, so only stale views are rebuilt, but every stale view is rendered by one
+    _render_talent_views() call from one parse and one set of groupings.
 
-    LOGGER.debug('-- Sorting talents list...')
-    talents_list.sort(key=lambda my_dict: my_dict.get('name', ''))
-    talents_list.sort(key=lambda my_dict: my_dict.get('prerequisites', {}).get('level', 0))
-
-    main_heading = markdown_utils.write_heading('Talents', level=1)
+    Args:
+        view_name: Name of the generated file under _GEN_MD_DIR.
+    """
+    def decorator(view):
+        _TALENT_VIEWS[view_name] = view
+        _register_handler(view_name, inputs=('talents.json',), schemas=('talent_schema.json',))(_render_talent_views)
+        _BATCH_HANDLERS.add(_render_talent_views)
+        return view
+    return decorator
+
+
+@_register_view('talents_list.md')
+def _view_talents_by_level(groupings: _TalentGroupings, md_fp) -> None:
+    """Talents listed alphabetically under a heading for each level in _STANDARD_LEVELS, plus any other level that a talent uses."""
+    talents = groupings.talents
     level_heading = markdown_utils.write_heading('Level {} Talents', level=3)
     talent_separator = '  \n'
+    md_fp.write(f'{markdown_utils.write_heading("Talents", level=1)}\nTalents presented alphabetically by level.\n\n')
+    for level in sorted(set(talents.levels()) | set(_STANDARD_LEVELS)):
+        md_fp.write(level_heading.format(str(level)))
+        md_fp.write('\n')
+        md_fp.write(talent_separator.join(_talent_name(talent) for talent in talents.by_level(level)))
+        md_fp.write('\n\n')
+
+
+@_register_view('talents_by_attribute.md')
+def _view_talents_by_attribute(groupings: _TalentGroupings, md_fp) -> None:
+    """Talents with an attribute prerequisite under a heading for each attribute, by the score they need."""
+    md_fp.write(f'{markdown_utils.write_heading("Talents by Attribute", level=1)}\n'
+                'Talents with an attribute prerequisite, by the minimum score they need.\n\n')
+    for attribute, pairs in groupings.by_attribute.items():
+        md_fp.write(markdown_utils.write_heading(f'{attribute.upper()} Talents', level=3))
+        md_fp.write('\n')
+        md_fp.write('  \n'.join(f'{_talent_name(talent)} ({threshold})' for threshold, talent in pairs))
+        md_fp.write('\n\n')
+
+
+@_register_view('talents_by_ancestry.md')
+def _view_talents_by_ancestry(groupings: _TalentGroupings, md_fp) -> None:
+    """Talents with an ancestry prerequisite under a heading for each ancestry, by level."""
+    md_fp.write(f'{markdown_utils.write_heading("Talents by Ancestry", level=1)}\n'
+                'Talents with an ancestry prerequisite, by level.\n\n')
+    if not groupings.by_ancestry:
+        md_fp.write('No talents require an ancestry.\n')
+    for ancestry, talents in groupings.by_ancestry.items():
+        md_fp.write(markdown_utils.write_heading(f'{ancestry} Talents', level=3))
+        md_fp.write('\n')
+        md_fp.write('  \n'.join(f'{_talent_name(talent)} (level {talent_db.talent_level(talent)})' for talent in talents))
+        md_fp.write('\n\n')
+
+
+@_register_view('talent_prerequisite_trees.md')
+def _view_prerequisite_trees(groupings: _TalentGroupings, md_fp) -> None:
+    """Talents nested under the talents they require, starting from talents that require none.
+
+    A talent that requires several others is listed in full under the first one and only named
+    under the rest, so the file grows with the number of prerequisites, not with the number of
+    paths through them.
+    """
+    graph = groupings.graph
+    talents = groupings.talents.talents
+    name_rank = {index: rank for rank, index in enumerate(groupings.name_order)}
+    md_fp.write(f'{markdown_utils.write_heading("Talent Prerequisite Trees", level=1)}\n'
+                'Every talent is listed under the talents it requires. Talents that are listed in full '
+                'further up are marked "(see above)".\n\n')
+    roots = [index for index in groupings.name_order if not graph.direct_prerequisites[index] and graph.direct_dependents[index]]
+    if not roots:
+        md_fp.write('No talent requires another known talent.\n')
+    expanded = set()
+    stack = [(index, 0) for index in reversed(roots)]
+    while stack:
+        index, depth = stack.pop()
+        if index in expanded:
+            md_fp.write(f'{"  " * depth}- {_talent_name(talents[index])} (see above)\n')
+            continue
+        expanded.add(index)
+        md_fp.write(f'{"  " * depth}- {_talent_name(talents[index])}\n')
+        dependents = sorted(graph.direct_dependents[index], key=name_rank.__getitem__, reverse=True)
+        stack.extend((dependent, depth + 1) for dependent in dependents)
+
+    if graph.cycles:
+        md_fp.write(f'\n{markdown_utils.write_heading("Prerequisite Cycles", level=3)}\n')
+        md_fp.write('  \n'.join(' -> '.join(name.replace('_', ' ') for name in cycle) for cycle in graph.cycles))
+        md_fp.write('\n')
+    if graph.unresolved:
+        md_fp.write(f'\n{markdown_utils.write_heading("Unknown Prerequisites", level=3)}\n')
+        md_fp.write('  \n'.join(f'{name.replace("_", " ")}: {", ".join(references)}' for name, references in sorted(graph.unresolved.items())))
+        md_fp.write('\n')
+
+
+@_register_view('talent_cards.md')
+def _view_talent_cards(groupings: _TalentGroupings, md_fp) -> None:
+    """Every talent, alphabetically, with its prerequisites and full description."""
+    talents = groupings.talents.talents
+    md_fp.write(f'{markdown_utils.write_heading("Talent Cards", level=1)}\n'
+                'Every talent with its prerequisites and description, presented alphabetically.\n\n')
+    for index in groupings.name_order:
+        talent = talents[index]
+        prerequisites = talent.get('prerequisites', {})
+        lines = [f'**Level:** {talent_db.talent_level(talent)}']
+        if prerequisites.get('attributes'):
+            lines.append('**Attributes:** ' + ', '.join(f'{attribute.upper()} {score}' for attribute, score in prerequisites['attributes'].items()))
+        if 'ancestry' in prerequisites:
+            lines.append(f'**Ancestry:** {prerequisites["ancestry"]}')
+        if prerequisites.get('other_talents'):
+            lines.append('**Talents:** ' + ', '.join(name.replace('_', ' ') for name in prerequisites['other_talents']))
+        md_fp.write(markdown_utils.write_heading(_talent_name(talent), level=3))
+        md_fp.write('\n')
+        md_fp.write('  \n'.join(lines))
+        md_fp.write(f'\n\n{talent.get("description", "")}\n\n')
+# ======== End talent views ========
+
+
+def _library_files() -> tuple:
+    """Return the sorted names of every JSON file under _JSON_DIR."""
+    return tuple(sorted(os.path.basename(json_path) for json_path in glob.glob(os.path.join(_JSON_DIR, '*.json'))))
+
+
+def _library_collections(library_data: list) -> dict:
+    """Return a dict mapping the name of each file in _library_files(), without extension, to its parsed contents."""
+    return {os.path.splitext(json_name)[0]: json_list for json_name, json_list in zip(_library_files(), library_data)}
+
+
+@_register_handler('library.hgdb', inputs=_library_files, output_dir=_GEN_DIR)
+def _compile_binary_database(*handler_args):
+    """Generate the memory-mapped binary database of the whole library, see binary_db.
 
-    md_string = f'{main_heading}\nTalents presented alphabetically by level.\n\n'
-    for index in range(1, 11):
-        md_string += level_heading.format(str(index))
-        md_string += '\n'
-        name_list = [talent.get('name', '').replace('_', ' ') for talent in talents_list if talent.get('prerequisites', {}).get('level', 0) == index]
-        md_string += talent_separator.join(name_list)
-        md_string += '\n\n'
+    Args:
+        handler_args: Parsed contents of each file in _library_files(), then the path to the
+            generated database, then the unused args namespace.
 
-    LOGGER.debug('-- Writing talents file...')
-    md_path = os.path.join(_GEN_MD_DIR, 'talents_list.md')
-    with open(md_path, 'w') as md_fp:
-        md_fp.write(md_string)
+    Post:
+        The database is generated, with one collection per file named after the file.
+    """
+    *library_data, db_path, _ = handler_args
+    LOGGER.info('Generating binary database...')
+    binary_db.write_database(_library_collections(library_data), db_path)
 
 
-def _bad_key(bad_path: str, unused_args: argparse.Namespace):
-    """Default return function if a bad key is passed to _FILE_FUNC_MAP."""
-    LOGGER.error('Input file %s is not mapped to a handler function! Skipping.', bad_path)
+@_register_handler('library.sqlite', inputs=_library_files, output_dir=_GEN_DIR)
+def _compile_sqlite_database(*handler_args):
+    """Generate the searchable SQLite database of the whole library, see sqlite_db.
 
-_FILE_FUNC_MAP = {
-    os.path.join(_JSON_DIR, 'talents.json'): _compile_talents
-}
-"""Dict mapping input file name to function for parsing it."""
+    Args:
+        handler_args: Parsed contents of each file in _library_files(), then the path to the
+            generated database, then the unused args namespace.
+
+    Post:
+        The database is generated, with one collection per file named after the file.
+    """
+    *library_data, db_path, _ = handler_args
+    LOGGER.info('Generating SQLite database...')
+    sqlite_db.write_database(_library_collections(library_data), db_path)
 
-_SUPPORTED_FILES = list(_FILE_FUNC_MAP.keys())
-"""List of supported files."""
 # ======== End database compilation functions ========
 
 
@@ -99,35 +396,210 @@ def _process_args(argv: list) -> argparse.Namespace:
         dest='input_json',
         default=None
     )
+    parser.add_argument(
+        '-D',
+        '--dry_run',
+        help="Don't build anything, just print which files would be rebuilt and why.",
+        dest='dry_run',
+        action='store_true',
+        default=False
+    )
+    parser.add_argument(
+        '-f',
+        '--force',
+        help='Rebuild generated files even if they are up to date.',
+        dest='force',
+        action='store_true',
+        default=False
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help='Number of worker processes to run handlers on (default=number of CPUs).',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count()
+    )
+    parser.add_argument(
+        '-w',
+        '--watch',
+        help='Keep running after the first build and rebuild whatever a file affects as soon as it is saved.',
+        dest='watch',
+        action='store_true',
+        default=False
+    )
 
     args = utilities.parser_setup(parser, argv, LOGGER)
 
+    supported_files = _supported_files()
     if args.input_json is None:
-        setattr(args, 'input_files', _SUPPORTED_FILES)
+        setattr(args, 'input_files', supported_files)
     else:
-        # Turn file into absolute path to match the paths in _SUPPORTED_FILES
+        # Turn file into absolute path to match the paths in supported_files
         args.input_json = os.path.abspath(args.input_json)
         if not os.path.isfile(args.input_json):
             raise FileNotFoundError(f'Input file {args.input_json} is not a file or does not exist!')
-        elif args.input_json not in _SUPPORTED_FILES:
-            raise DatabaseCompilerError(f'Input file {args.input_json} is not a supported file! Supported files = {_SUPPORTED_FILES}')
+        elif args.input_json not in supported_files:
+            raise DatabaseCompilerError(f'Input file {args.input_json} is not a supported file! Supported files = {supported_files}')
         setattr(args, 'input_files', [args.input_json])
     LOGGER.debug('Input files = %s', args.input_files)
 
     return args
 
 
-def _generate_markdown(args: argparse.Namespace):
-    """Dispatch the correct handler function for each file in args.input_files.
+def _compiler_version() -> str:
+    """Return a version string for the compiler made from the hashes of _COMPILER_SOURCES."""
+    return '-'.join(utilities.hash_file(source)[:12] for source in _COMPILER_SOURCES)
+
+
+def _group_targets(targets: list) -> list:
+    """Split targets into the groups built by one handler call: a group per batch handler and its inputs, else one per target."""
+    groups = []
+    batches = {}
+    for target in targets:
+        if target.handler not in _BATCH_HANDLERS:
+            groups.append([target])
+        elif (target.handler, target.inputs) in batches:
+            batches[target.handler, target.inputs].append(target)
+        else:
+            batches[target.handler, target.inputs] = [target]
+            groups.append(batches[target.handler, target.inputs])
+    return groups
+
+
+def _run_handler(targets: list, input_data: list, args: argparse.Namespace) -> dict:
+    """Run the handler of a group of targets (see _group_targets()) on already-parsed input data.
+
+    Returns:
+        Dict mapping the output of each target to how long it took to build in seconds.
+    """
+    handler = targets[0].handler
+    for target in targets:
+        os.makedirs(os.path.dirname(target.output), exist_ok=True)
+    if handler in _BATCH_HANDLERS:
+        return handler(*input_data, [target.output for target in targets], args)
+    start = time.perf_counter()
+    with instrumentation.span(os.path.basename(targets[0].output)):
+        handler(*input_data, targets[0].output, args)
+    return {targets[0].output: time.perf_counter() - start}
+
+
+def _generate_markdown(args: argparse.Namespace, load=None) -> dict:
+    """Rebuild every stale target that depends on a file in args.input_files.
+
+    Targets whose inputs, schemas, output and compiler version all match the build manifest
+    are left untouched, so their mtimes don't change. The inputs of the stale targets are each
+    parsed once, then the handlers run concurrently on a process pool, with every stale target
+    of a batch handler (e.g. every talent view) built together by one call.
+
+    Args:
+        args: Parsed args.
+        load: Function that parses an input file; defaults to jsonc_loader.load().
+
+    Returns:
+        Dict mapping the output path of each target that was rebuilt to its handler's run time in seconds.
 
     Raises:
-        FileNotFoundError: Error if expected input file (i.e. a file in _SUPPORTED_FILES) could not be found.
+        FileNotFoundError: Error if expected input file (i.e. a file in _supported_files()) could not be found.
     """
-    os.makedirs(_GEN_MD_DIR, exist_ok=True)
     for in_file in args.input_files:
         if not os.path.isfile(in_file):
             raise FileNotFoundError(f'Supported file {in_file} does not exist, did you delete it?')
-        _FILE_FUNC_MAP.get(in_file, _bad_key)(in_file, args)  # Execute function mapped to this file
+
+    with instrumentation.span('check_stale'):
+        graph = build_graph.BuildGraph(_compiler_version(), root=_ROOT)
+        stale_targets = []
+        for target in [target for target in _targets() if set(target.inputs) & set(args.input_files)]:
+            output_name = os.path.relpath(target.output, _ROOT)
+            reasons = ['--force was used'] if args.force else graph.stale_reasons(target)
+            if not reasons:
+                LOGGER.info('%s is up to date.', output_name)
+            elif args.dry_run:
+                print(f'Would rebuild {output_name} because ' + '; '.join(reasons))
+            else:
+                LOGGER.info('Rebuilding %s because %s', output_name, '; '.join(reasons))
+                stale_targets.append(target)
+    if not stale_targets:
+        return {}
+
+    # Parse each input once, no matter how many handlers use it
+    load = load if load is not None else jsonc_loader.load
+    parsed_inputs = {}
+    with instrumentation.span('load_inputs'):
+        for target in stale_targets:
+            for in_file in target.inputs:
+                if in_file not in parsed_inputs:
+                    LOGGER.debug('-- Parsing %s', in_file)
+                    parsed_inputs[in_file] = load(in_file)
+    groups = _group_targets(stale_targets)
+    handler_inputs = [[parsed_inputs[in_file] for in_file in group[0].inputs] for group in groups]
+
+    jobs = min(args.jobs or os.cpu_count(), len(groups))
+    with instrumentation.span('render'):
+        if jobs <= 1:
+            # Not worth the cost of starting a pool
+            group_timings = [_run_handler(group, input_data, args) for group, input_data in zip(groups, handler_inputs)]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+                group_timings = list(executor.map(_run_handler, groups, handler_inputs, [args] * len(groups)))
+
+    with instrumentation.span('save_manifest'):
+        for target in stale_targets:
+            graph.record(target)
+        graph.save()
+    return {output: seconds for timings in group_timings for output, seconds in timings.items()}
+
+
+def _print_timings(timings: dict) -> None:
+    """Print the run time of each handler, slowest first."""
+    for output, seconds in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        print(f'{os.path.relpath(output, _ROOT)}: {seconds * 1000:.1f} ms')
+
+
+def _affected_inputs(changed_paths: list) -> list:
+    """Return the sorted supported files that changed_paths affect.
+
+    A changed supported file affects itself; a changed schema affects the inputs of every
+    target that lists it, and a removed library file affects the inputs of every target whose
+    inputs are recomputed on each build. Files that no longer exist are left out.
+    """
+    changed_paths = set(changed_paths)
+    removed = any(os.path.dirname(path) == _JSON_DIR and not os.path.exists(path) for path in changed_paths)
+    affected = changed_paths & set(_supported_files())
+    for registered, target in zip(_HANDLERS, _targets()):
+        if changed_paths & set(target.schemas) or (removed and callable(registered.inputs)):
+            affected.update(target.inputs)
+    return sorted(in_file for in_file in affected if os.path.isfile(in_file))
+
+
+def _watch(args: argparse.Namespace) -> None:
+    """Rebuild the targets affected by each save, until interrupted with Ctrl+C.
+
+    Parsed inputs stay in memory between rebuilds, so only the saved files are parsed again.
+    Handlers run in this process, since starting a pool for every save would take longer than
+    the handlers themselves.
+    """
+    file_cache = library_watcher.FileCache()
+    watch_args = argparse.Namespace(**vars(args))
+    watch_args.jobs = 1
+    watch_args.force = False
+
+    def on_change(changed_paths: list) -> None:
+        watch_args.input_files = _affected_inputs(changed_paths)
+        if not watch_args.input_files:
+            return
+        start = time.perf_counter()
+        try:
+            timings = _generate_markdown(watch_args, file_cache.load)
+        except (OSError, ValueError, jsonc_loader.JsoncError) as excpt:
+            # Mid-edit, renamed and deleted files are common in watch mode; report them and carry on
+            LOGGER.warning('Unable to rebuild: %s', excpt)
+            return
+        _print_timings(timings)
+        print(f'Rebuilt {len(timings)} file(s) in {(time.perf_counter() - start) * 1000:.1f} ms.')
+
+    print(f'Watching {_LIBRARY_DIR} for changes; press Ctrl+C to stop.')
+    library_watcher.watch([_LIBRARY_DIR], on_change)
 
 
 def main(argv: list) -> None:
@@ -137,7 +609,10 @@ def main(argv: list) -> None:
         argv: List of input arguments.
     """
     args = _process_args(argv)
-    _generate_markdown(args)
+    timings = _generate_markdown(args)
+    _print_timings(timings)
+    if args.watch:
+        _watch(args)
 
 
 if __name__ == '__main__':
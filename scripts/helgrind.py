@@ -0,0 +1,84 @@
+"""Single entry point for every helgrind script: 'helgrind.py <command> [args...]'.
+
+Each command is the main() of an existing script, which parses the rest of the arguments with
+its own _process_args(), so 'helgrind.py validate --help' is the help of json_validator.py.
+Script modules (and with them jsonschema, numpy and the rest) are only imported once a command
+is chosen, and this module imports nothing beyond the standard library modules argparse needs,
+so 'helgrind.py --help' starts in a fraction of the time of any single script; see
+benchmarks/bench_helgrind.py for its budget.
+"""
+
+import sys
+import argparse
+import importlib
+from typing import NamedTuple
+
+
+class Command(NamedTuple):
+    """A command and the script module that implements it."""
+    module: str
+    summary: str
+
+
+COMMANDS = {
+    'validate': Command('json_validator', 'Validate JSON files against their schemas and sanity check the library.'),
+    'compile': Command('database_compiler', 'Compile the library into markdown and databases.'),
+    'query': Command('query_database', 'Search the compiled library.'),
+    'generate': Command('character_generator', 'Generate random characters.'),
+    'statblocks': Command('statblocks', 'Suggest fixes for NPC statblocks with unusual stats.'),
+    'test': Command('run_test', 'Run the unittests.'),
+    'bench': Command('run_benchmark', 'Run the performance benchmarks.'),
+    'synth': Command('synthetic_data', 'Generate synthetic library files from the schemas.'),
+    'push': Command('push_to_remote', 'Check the worktree and run the tests, then push.'),
+    'setup': Command('setup', 'Ensure the environment is set up for this project.')
+}
+"""Dict mapping command name to the Command that implements it, in the order they are listed in --help."""
+
+
+def _process_args(argv: list) -> argparse.Namespace:
+    """Parse the command name; everything after it is left for the command's own parser.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        args: Parsed args with the command and its arguments as properties on the object.
+    """
+    width = max(len(name) for name in COMMANDS)
+    command_list = '\n'.join(f'  {name.ljust(width)}  {command.summary}' for name, command in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        'helgrind.py',
+        description='Run a helgrind script. Use "helgrind.py <command> --help" for the options of a command.',
+        epilog=f'commands:\n{command_list}',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        'command',
+        help='Command to run.',
+        choices=COMMANDS,
+        metavar='command'
+    )
+    parser.add_argument(
+        'command_args',
+        help='Arguments of the command.',
+        nargs=argparse.REMAINDER
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list):
+    """Run the command named by the first argument with the rest of the arguments.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        Whatever the command's main() returns.
+    """
+    args = _process_args(argv)
+    module = importlib.import_module(COMMANDS[args.command].module)
+    return module.main(args.command_args)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
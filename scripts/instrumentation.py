@@ -0,0 +1,182 @@
+"""Phase timing and profiling for every script, switched on by the options utilities.parser_setup() adds.
+
+    --timings           print a tree of the phase spans the run went through, e.g.
+                        load > strip_comments, with the count and total time of each
+    --metrics_json PATH write the spans, wall time and peak RSS as JSON, for tracking runs over time
+    --profile [PATH]    run the script under cProfile, dump the stats to PATH (default
+                        profiles/<script>.prof in the worktree cache dir) and print the top entries
+
+Code marks a phase with 'with instrumentation.span(name):'. Spans nest, and the same nested
+path is aggregated across calls. With none of the options given no recorder exists and a span
+costs one check, so spans belong around phases, not around every object.
+
+NOTE: Spans are only recorded in the process that parsed the options; work done in worker
+processes shows up as the span around the pool. Use -j 1 to see inside it.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import argparse
+import contextlib
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_PROFILE_TOP = 25
+"""Number of entries of the profile to print, by cumulative time."""
+
+_RECORDER = None
+"""SpanRecorder of this process once start() was called, else None."""
+
+
+class SpanRecorder:
+    """Aggregates the count and total run time of every nested path of spans."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = {}  # Tuple of span names (outermost first) to [count, seconds], in the order they were first opened
+        self._stack = []
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        """Time the body of the with statement as the span name, nested under any open spans."""
+        self._stack.append(name)
+        record = self.spans.setdefault(tuple(self._stack), [0, 0.0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record[0] += 1
+            record[1] += time.perf_counter() - start
+            self._stack.pop()
+
+    def wall_seconds(self) -> float:
+        """Return the seconds since the recorder was created."""
+        return time.perf_counter() - self.start
+
+    def format_tree(self) -> str:
+        """Return the spans as an indented tree, one span per line, with its total time, share of the wall time and count."""
+        wall_seconds = self.wall_seconds()
+        width = max((2 * (len(path) - 1) + len(path[-1]) for path in self.spans), default=0)
+        lines = [f'Timings (wall {wall_seconds * 1000:.1f} ms):']
+        for path, (count, seconds) in self.spans.items():
+            label = '  ' * (len(path) - 1) + path[-1]
+            share = seconds / wall_seconds if wall_seconds else 0.0
+            lines.append(f'  {label.ljust(width)}  {seconds * 1000:10.1f} ms  {share:6.1%}  x{count}')
+        return '\n'.join(lines)
+
+    def metrics(self) -> dict:
+        """Return the spans and totals as a JSON-serializable dict; span paths are joined with '/'."""
+        return {
+            'wall_secs': self.wall_seconds(),
+            'spans': {'/'.join(path): {'count': count, 'secs': seconds} for path, (count, seconds) in self.spans.items()}
+        }
+
+
+def span(name: str):
+    """Return a context manager that times its body as the span name; does nothing unless a recorder is active."""
+    if _RECORDER is None:
+        return contextlib.nullcontext()
+    return _RECORDER.span(name)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the instrumentation options to parser, in their own group."""
+    group = parser.add_argument_group('instrumentation')
+    group.add_argument(
+        '--timings',
+        help='Print how long each phase of the run took.',
+        action='store_true',
+        dest='timings',
+        default=False
+    )
+    group.add_argument(
+        '--metrics_json',
+        '--metrics-json',
+        help='Write phase timings, wall time and peak RSS to this JSON file.',
+        dest='metrics_json',
+        default=None,
+        metavar='PATH'
+    )
+    group.add_argument(
+        '--profile',
+        help='Run under cProfile and dump the stats to PATH (default=profiles/<script>.prof in the worktree cache dir).',
+        dest='profile',
+        nargs='?',
+        const='',
+        default=None,
+        metavar='PATH'
+    )
+
+
+def _peak_rss_kib() -> int:
+    """Return the peak RSS of this process in KiB, or 0 where it can't be read."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss // 1024 if sys.platform == 'darwin' else peak_rss
+
+
+def _write_metrics(metrics_path: str, script: str, recorder: SpanRecorder) -> None:
+    """Write the metrics of recorder to metrics_path, replacing it atomically."""
+    metrics = {'script': script, 'argv': sys.argv[1:], 'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+               'peak_rss_kib': _peak_rss_kib(), **recorder.metrics()}
+    metrics_dir = os.path.dirname(os.path.abspath(metrics_path))
+    os.makedirs(metrics_dir, exist_ok=True)
+    tmp_path = f'{metrics_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as metrics_fp:
+        json.dump(metrics, metrics_fp, indent=1)
+    os.replace(tmp_path, metrics_path)
+
+
+def _finish_profile(profiler, profile_path: str) -> None:
+    """Stop profiler, dump its stats to profile_path and print the top entries by cumulative time."""
+    import pstats
+    profiler.disable()
+    os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+    profiler.dump_stats(profile_path)
+    print(f'Profile written to {profile_path}')
+    pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(_PROFILE_TOP)
+
+
+def start(script: str, timings: bool=False, metrics_path: str=None, profile_path: str=None) -> None:
+    """Start recording spans and/or profiling; the results are reported when the process exits.
+
+    Args:
+        script: Name of the script, used in the metrics.
+        timings: If true, print the span tree at exit.
+        metrics_path: If given, write the metrics JSON here at exit.
+        profile_path: If given, profile with cProfile and dump the stats here at exit.
+
+    NOTE: Only the first call in a process has an effect, e.g. when one script runs another's main().
+    """
+    global _RECORDER
+    if _RECORDER is not None:
+        LOGGER.debug('Instrumentation was already started; ignoring the options of %s.', script)
+        return
+    recorder = SpanRecorder()
+    _RECORDER = recorder
+    profiler = None
+    if profile_path is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    def finish() -> None:
+        global _RECORDER
+        _RECORDER = None
+        if profiler is not None:
+            _finish_profile(profiler, profile_path)
+        if timings:
+            print(recorder.format_tree())
+        if metrics_path is not None:
+            _write_metrics(metrics_path, script, recorder)
+            LOGGER.info('Metrics written to %s', metrics_path)
+
+    atexit.register(finish)
@@ -2,19 +2,68 @@
 
 import os
 import sys
-import json
-import jsmin
+import glob
+import time
 import logging
 import argparse
 import utilities
 import jsonschema
+import jsonc_loader
+import schema_registry
+import instrumentation
+import validation_manifest
+import concurrent.futures
+from typing import Callable, NamedTuple
 
 LOGGER = logging.getLogger(os.path.basename(__file__))
 """Logger for this module."""
 
+_ROOT = utilities.get_root_dir()
+"""Root dir of the worktree."""
+
+_LIBRARY_DIR = os.path.join(_ROOT, 'library')
+"""Path to library directory in the worktree, watched by --watch."""
+
+_JSON_DIR = os.path.join(_LIBRARY_DIR, 'json')
+"""Path to JSON directory in the worktree."""
+
+_SCHEMA_DIR = os.path.join(_LIBRARY_DIR, 'schemas')
+"""Path to schema directory in the worktree."""
+
+_SCHEMA_SUFFIX = '_schema.json'
+"""Suffix of every schema file name under _SCHEMA_DIR."""
+
+_SCHEMA_REGISTRY = {}
+"""Dict mapping JSON file name to schema file name, for files that don't follow the naming convention in _find_schema()."""
+
+
 class ValidatorException(Exception):
     """Exception for JSON validation error."""
 
+class FileResult(NamedTuple):
+    """Validation result for a single JSON file."""
+    json_path: str
+    schema_path: str  # None if no schema is associated with the file
+    valid: bool  # None if the file was not validated
+    seconds: float
+    manifest_entry: dict = None  # Updated validation_manifest entry, None if the manifest is not in use
+
+class ValidationReport(NamedTuple):
+    """Combined result of validating several JSON files."""
+    results: list  # List of FileResult
+    wall_seconds: float
+    sanity_warnings: tuple = ()  # sanity_checks.SanityWarnings for the checked files
+
+    @property
+    def valid(self) -> bool:
+        """True if every file with a schema is valid."""
+        return all(result.valid is not False for result in self.results)
+
+    @property
+    def unvalidated(self) -> list:
+        """List of JSON files that had no associated schema."""
+        return [result.json_path for result in self.results if result.schema_path is None]
+
 def _process_args(argv: list) -> argparse.Namespace:
     """Parse and process arguments; convert to argparse.Namespace object.
 
@@ -35,104 +84,503 @@ def _process_args(argv: list) -> argparse.Namespace:
     parser.add_argument(
         '-s',
         '--schema_file',
-        help='Path to JSON schame file to use for validation.',
+        help='Path to JSON schame file to use for validation. If not specified, the schema is detected automatically.',
         dest='schema_path',
         default=None
     )
+    parser.add_argument(
+        '-a',
+        '--all',
+        help=f'Validate every JSON file under {_JSON_DIR} with its associated schema.',
+        dest='validate_all',
+        action='store_true',
+        default=False
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help='Number of worker processes to use with --all (default=number of CPUs).',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count()
+    )
+    parser.add_argument(
+        '-c',
+        '--changed',
+        help='With --all, only validate files that git reports as modified, staged or untracked (or whose schema is).',
+        dest='changed_only',
+        action='store_true',
+        default=False
+    )
+    parser.add_argument(
+        '-n',
+        '--no_cache',
+        help='Ignore the validation manifest and re-validate every object.',
+        dest='no_cache',
+        action='store_true',
+        default=False
+    )
+    parser.add_argument(
+        '-S',
+        '--no_sanity',
+        help='Skip the sanity checks that run after schema validation.',
+        dest='no_sanity',
+        action='store_true',
+        default=False
+    )
+    parser.add_argument(
+        '-w',
+        '--watch',
+        help='With --all, keep running after the first pass and re-check every file as soon as it or its schema is saved.',
+        dest='watch',
+        action='store_true',
+        default=False
+    )
     args = utilities.parser_setup(parser, argv, LOGGER)
 
+    if args.validate_all:
+        if args.json_path is not None or args.schema_path is not None:
+            raise ValidatorException('--all cannot be combined with an input file or schema file!')
+        json_paths = _find_json_files()
+        if args.changed_only:
+            json_paths = _filter_changed(json_paths)
+        setattr(args, 'json_paths', json_paths)
+        return args
+    elif args.changed_only:
+        raise ValidatorException('--changed can only be used with --all!')
+    elif args.watch:
+        raise ValidatorException('--watch can only be used with --all!')
+
     if args.json_path is None:
-        # TODO allow for user to validate ALL json files at once
-        raise ValidatorException('Pending functionality; For now you must specify an input file!')
+        raise ValidatorException('You must specify an input file or use --all!')
     elif not os.path.exists(args.json_path):
         raise FileNotFoundError(f'Input file {args.json_path} does not exist!')
 
     if args.schema_path is None:
-        # TODO allow for user to validate ALL json files at once
-        raise ValidatorException('Pending functionality; For now you must specify a schema file!')
+        args.schema_path = _find_schema(args.json_path)
+        if args.schema_path is None:
+            raise ValidatorException(f'No schema is associated with {args.json_path}; you must specify a schema file!')
     elif not os.path.exists(args.schema_path):
-        raise FileNotFoundError(f'Schema file {args.json_path} does not exist!')
-
+        raise FileNotFoundError(f'Schema file {args.schema_path} does not exist!')
 
     return args
 
-def _object_is_valid(in_obj, schema, file_path: str='unknown') -> bool:
-    """Validate in_obj against schema."""
+def _find_json_files() -> list:
+    """Return the sorted list of every JSON file under _JSON_DIR."""
+    return sorted(glob.glob(os.path.join(_JSON_DIR, '**', '*.json'), recursive=True))
+
+def _filter_changed(json_paths: list) -> list:
+    """Narrow json_paths down to files that git reports as changed, or whose schema changed.
+
+    Args:
+        json_paths: List of absolute paths to JSON files.
+
+    Returns:
+        The changed subset of json_paths, in the same order.
+    """
+    changed_files = utilities.get_modified_files(_ROOT) + utilities.get_staged_files(_ROOT) + utilities.get_untracked_files(_ROOT)
+    changed_paths = {os.path.join(_ROOT, changed_file) for changed_file in changed_files}
+    LOGGER.debug('Changed files = %s', sorted(changed_paths))
+    return [json_path for json_path in json_paths if json_path in changed_paths or _find_schema(json_path) in changed_paths]
+
+def _find_schema(json_path: str) -> str:
+    """Find the schema associated with json_path.
+
+    Files listed in _SCHEMA_REGISTRY use their registered schema. Otherwise the schema
+    is found by naming convention: '<name>.json' maps to '<name>_schema.json', or to the
+    singular form if the file name is plural (e.g. talents.json -> talent_schema.json).
+
+    Args:
+        json_path: Path to JSON file.
+
+    Returns:
+        Path to the associated schema, or None if there isn't one.
+    """
+    json_name = os.path.basename(json_path)
+    if json_name in _SCHEMA_REGISTRY:
+        return os.path.join(_SCHEMA_DIR, _SCHEMA_REGISTRY[json_name])
+
+    stem = os.path.splitext(json_name)[0]
+    candidates = [stem + _SCHEMA_SUFFIX]
+    if stem.endswith('s'):
+        candidates.append(stem[:-1] + _SCHEMA_SUFFIX)
+    for candidate in candidates:
+        schema_path = os.path.join(_SCHEMA_DIR, candidate)
+        if os.path.isfile(schema_path):
+            return schema_path
+    return None
+
+def _get_validator(schema_path: str) -> jsonschema.protocols.Validator:
+    """Get the compiled validator for the schema at schema_path.
+
+    Validators come from schema_registry, which parses every schema in the schema's dir once so
+    $refs to other schema files resolve from memory, and keeps each compiled validator until a
+    schema in that dir changes.
+
+    Args:
+        schema_path: Path to schema file.
+
+    Returns:
+        validator: Validator instance for the schema.
+
+    Raises:
+        jsonschema.exceptions.SchemaError: Error if the schema itself is not valid.
+        schema_registry.SchemaRegistryError: Error if a $ref in the schema can't be resolved.
+    """
+    return schema_registry.get_validator(schema_path)
+
+def _object_errors(in_obj, validator: jsonschema.protocols.Validator, file_path: str='unknown') -> list:
+    """Validate in_obj with validator.
+
+    Args:
+        in_obj: Object to validate.
+        validator: Compiled validator, see _get_validator().
+        file_path: Path of the file in_obj came from, for logging.
+
+    Returns:
+        List of every jsonschema.exceptions.ValidationError found in in_obj; empty if valid.
+    """
     # Try and get the object's name to help with debugging
-    if isinstance(in_obj, dict):
-        in_obj_name = in_obj.get('name', None)
+    in_obj_name = in_obj.get('name', None) if isinstance(in_obj, dict) else None
+    obj_label = f'Object "{in_obj_name}"' if in_obj_name is not None else 'Object'
 
-    try:
-        jsonschema.validate(in_obj, schema)
-        if in_obj_name is not None:
-            LOGGER.info('-- Object "%s" from file %s is valid!', in_obj_name, file_path)
-        else:
-            LOGGER.info('-- Object from file %s is valid!', file_path)
-        return True
-    except jsonschema.exceptions.ValidationError as excpt:
-        if in_obj_name is not None:
-            LOGGER.info('-- Object "%s" from file %s is not valid!', in_obj_name, file_path)
-        else:
-            LOGGER.info('-- Object from file %s is not valid!', file_path)
-        LOGGER.debug(excpt)
-        return False
+    errors = list(validator.iter_errors(in_obj))
+    if errors:
+        LOGGER.info('-- %s from file %s is not valid!', obj_label, file_path)
+    else:
+        LOGGER.info('-- %s from file %s is valid!', obj_label, file_path)
+    return errors
 
-def _validate_json_file(json_path: str, schema_path: str) -> bool:
+def _entry_is_fresh(manifest_entry: dict, file_hash: str, schema_hash: str) -> bool:
+    """Return True if manifest_entry records a valid file with the same file and schema hashes."""
+    return (manifest_entry.get('valid', False)
+            and manifest_entry.get('file_hash') == file_hash
+            and manifest_entry.get('schema_hash') == schema_hash)
+
+def _validate_json_file(json_path: str, schema_path: str, manifest_entry: dict=None, json_list: list=None) -> bool:
     """Validate json_path using schema at schema_path.
 
     Args:
         json_path: Path to input JSON file.
         schema_path: Path to schema file.
+        manifest_entry: Optional validation_manifest entry from the last run. If given, the file is
+            skipped when neither it nor the schema (or any schema it refers to) changed, objects that were valid against the same
+            schema are not re-validated, and the entry is updated in place.
+        json_list: Already-parsed contents of json_path; streamed from the file if None.
 
     Returns:
         True if JSON is valid, false if not.
 
     NOTE: Input JSON files are expected to contain a list of objects,
-        each of which get validated one at a time by the schema.
+        each of which get streamed from the file and validated by the same
+        compiled validator. Every error in the file is logged together once
+        all objects are checked.
     """
     LOGGER.info('Validating %s with %s', json_path, schema_path)
-    with open(schema_path, 'r') as schema_fp:
-        my_schema = json.loads(jsmin.jsmin(schema_fp.read()))
-    
+    known_valid = set()
+    if manifest_entry is not None:
+        with instrumentation.span('hash'):
+            file_hash = utilities.hash_file(json_path)
+            schema_hash = schema_registry.schema_hash(schema_path)
+        if _entry_is_fresh(manifest_entry, file_hash, schema_hash):
+            LOGGER.info('-- %s is unchanged since it was last validated.', json_path)
+            return True
+        if manifest_entry.get('schema_hash') == schema_hash:
+            known_valid = set(manifest_entry.get('valid_objects', []))
+
+    with instrumentation.span('get_validator'):
+        validator = _get_validator(schema_path)
+
     # NOTE JSON files are expected to be lists of objects, each of which will be validated one at a time.
-    with open(json_path, 'r') as json_fp:
-        json_list = json.loads(jsmin.jsmin(json_fp.read()))
+    # Objects are streamed from the file so memory use doesn't grow with its size.
+    file_errors = []
+    valid_objects = []
+    revalidated = 0
+    object_count = 0
+    json_objects = json_list if json_list is not None else jsonc_loader.iter_array(json_path)
+    with instrumentation.span('check_objects'):
+        for index, my_obj in enumerate(json_objects):
+            object_count += 1
+            obj_hash = validation_manifest.hash_object(my_obj) if manifest_entry is not None else None
+            if obj_hash in known_valid:
+                valid_objects.append(obj_hash)
+                continue
+            revalidated += 1
+            obj_errors = _object_errors(my_obj, validator, json_path)
+            if obj_errors:
+                file_errors.extend((index, error) for error in obj_errors)
+            elif obj_hash is not None:
+                valid_objects.append(obj_hash)
 
-    validity = []
-    for my_obj in json_list:
-        validity.append(_object_is_valid(my_obj, my_schema, json_path))
-    if not all(validity):
+    if manifest_entry is not None:
+        LOGGER.debug('-- Re-validated %d of %d objects in %s', revalidated, object_count, json_path)
+        manifest_entry.clear()
+        manifest_entry.update(file_hash=file_hash, schema_hash=schema_hash, valid=not file_errors, valid_objects=valid_objects)
+
+    if file_errors:
+        LOGGER.debug('%d error(s) found in %s:', len(file_errors), json_path)
+        for index, error in file_errors:
+            LOGGER.debug('-- [object %d] %s: %s', index, error.json_path, error.message)
         return False
     return True
 
-def _sanity_check():
-    """TODO pending. Sanity check an object. This is meant to be a general use
-    function that can sanity check any object, dispatching the correct sanity
-    checker function as required. You will likely want a separate module with
-    all of the sanity checker functions.
+def _validate_worker(json_path: str, schema_path: str, manifest_entry: dict=None, json_list: list=None) -> FileResult:
+    """Validate a single file and time it. Runs in a worker process; compiled
+    validators stay in that process's schema_registry between files.
+
+    Args:
+        json_path: Path to input JSON file.
+        schema_path: Path to schema file, or None if the file has no schema.
+        manifest_entry: Optional validation_manifest entry, see _validate_json_file().
+        json_list: Optional already-parsed contents of json_path.
+
+    Returns:
+        FileResult for json_path, carrying the updated manifest entry. A file that can't be parsed
+        is not valid; the error is logged, so one broken file doesn't stop the other files.
+    """
+    start = time.perf_counter()
+    with instrumentation.span('validate_file'):
+        try:
+            valid = None if schema_path is None else _validate_json_file(json_path, schema_path, manifest_entry, json_list)
+        except (ValueError, jsonc_loader.JsoncError) as excpt:
+            LOGGER.warning('%s could not be parsed: %s', json_path, excpt)
+            valid = False
+    return FileResult(json_path, schema_path, valid, time.perf_counter() - start, manifest_entry)
+
+def _validate_all(json_paths: list, jobs: int=None, manifest: validation_manifest.ValidationManifest=None) -> ValidationReport:
+    """Validate every file in json_paths with its associated schema, in parallel.
+
+    Args:
+        json_paths: List of paths to JSON files.
+        jobs: Number of worker processes; defaults to the number of CPUs.
+        manifest: Optional manifest from previous runs. Unchanged files are answered from it
+            without starting any workers, and it is updated and saved afterwards.
+
+    Returns:
+        ValidationReport with one FileResult per file, in the order of json_paths.
+    """
+    start = time.perf_counter()
+    schema_paths = [_find_schema(json_path) for json_path in json_paths]
+    results = [None] * len(json_paths)
+    pending = []  # (index, json_path, schema_path, manifest_entry) of files that need a worker
+    schema_hashes = {}
+    with instrumentation.span('check_manifest'):
+        for index, (json_path, schema_path) in enumerate(zip(json_paths, schema_paths)):
+            if schema_path is None:
+                LOGGER.warning('%s has no associated schema and will not be validated!', json_path)
+                results[index] = FileResult(json_path, None, None, 0.0)
+                continue
+            if manifest is None:
+                pending.append((index, json_path, schema_path, None))
+                continue
+
+            # Answer unchanged files straight from the manifest
+            check_start = time.perf_counter()
+            manifest_entry = manifest.entry(json_path)
+            if schema_path not in schema_hashes:
+                schema_hashes[schema_path] = schema_registry.schema_hash(schema_path)
+            if _entry_is_fresh(manifest_entry, utilities.hash_file(json_path), schema_hashes[schema_path]):
+                LOGGER.info('%s is unchanged since it was last validated.', json_path)
+                results[index] = FileResult(json_path, schema_path, True, time.perf_counter() - check_start, manifest_entry)
+            else:
+                pending.append((index, json_path, schema_path, manifest_entry))
+
+    jobs = min(jobs or os.cpu_count(), len(pending))
+    with instrumentation.span('validate'):
+        if jobs <= 1:
+            # Not worth the cost of starting a pool
+            pending_results = [_validate_worker(*task[1:]) for task in pending]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+                pending_results = list(executor.map(_validate_worker, *list(zip(*pending))[1:]))
+    for task, result in zip(pending, pending_results):
+        results[task[0]] = result
+
+    if manifest is not None:
+        for result in results:
+            if result.manifest_entry is not None:
+                manifest.set_entry(result.json_path, result.manifest_entry)
+        manifest.save()
+
+    return ValidationReport(results, time.perf_counter() - start)
+
+def _print_report(report: ValidationReport) -> None:
+    """Print the result and timing of each file in report, then the totals."""
+    status_map = {True: 'valid', False: 'NOT VALID', None: 'not validated (no schema)'}
+    for result in report.results:
+        print(f'{result.json_path}: {status_map[result.valid]} ({result.seconds * 1000:.1f} ms)')
+    print(f'Checked {len(report.results)} file(s) in {report.wall_seconds * 1000:.1f} ms.')
+    if report.unvalidated:
+        print(f'{len(report.unvalidated)} file(s) have no schema and were not validated.')
+    if not report.valid:
+        print('Some files are not valid! Use -d option for more information.')
+
+def _schema_filter(valid_paths) -> Callable:
+    """Return a sanity_checks.LibraryContext object_filter that leaves out objects that fail their schema.
 
-    Sanity checking examples:
-        - Ensure talent level prerequisite > 0.
-        - Ensure talent ancestry prerequisite is an existing ancestry.
-        - Ensure prerequisites are met for all talents on a character sheet.
+    Args:
+        valid_paths: Paths of the files that were just validated and are valid; they are kept
+            whole without validating them again.
+    """
+    valid_paths = {os.path.abspath(json_path) for json_path in valid_paths}
+
+    def object_filter(json_path: str, json_list: list) -> list:
+        schema_path = None if os.path.abspath(json_path) in valid_paths else _find_schema(json_path)
+        if schema_path is None:
+            return json_list
+        validator = _get_validator(schema_path)
+        return [my_obj for my_obj in json_list if validator.is_valid(my_obj)]
+    return object_filter
+
+def _sanity_check(json_paths: list, load=None, valid_paths=()) -> list:
+    """Sanity check the objects in json_paths against the rest of the library.
+
+    The whole library is loaded once and every check registered in sanity_checks runs in a
+    single pass. Only objects that pass their schema are loaded into the library, so the checks
+    never trip over malformed data; the validation report covers those. Problems are warnings
+    only; they never make a file invalid.
+
+    Args:
+        json_paths: List of paths to the JSON files to report on.
+        load: Function that parses a JSON file, see sanity_checks.LibraryContext.
+        valid_paths: Paths of the files already found valid in this run, see _schema_filter().
+
+    Returns:
+        List of sanity_checks.SanityWarning.
     """
+    import sanity_checks  # Pulls in numpy; not needed for -S or --help
+    with instrumentation.span('sanity_checks'):
+        context = sanity_checks.LibraryContext(_JSON_DIR, load, _schema_filter(valid_paths))
+        warnings = sanity_checks.run_checks(context, json_paths)
+    for warning in warnings:
+        LOGGER.warning('%s', warning)
+    if warnings:
+        print(f'{len(warnings)} sanity check warning(s) found.')
+    return warnings
+
+def _affected_files(changed_paths: list) -> list:
+    """Return the sorted JSON files under _JSON_DIR that changed_paths affect.
+
+    A changed JSON file affects itself; a changed schema affects every file validated with it
+    or with a schema that refers to it.
+    """
+    json_paths = set()
+    changed_schemas = set()
+    for changed_path in changed_paths:
+        if os.path.dirname(changed_path) == _SCHEMA_DIR:
+            changed_schemas.add(changed_path)
+        elif changed_path.startswith(_JSON_DIR + os.sep) and os.path.isfile(changed_path):
+            json_paths.add(changed_path)
+    if changed_schemas:
+        registry = schema_registry.get_registry(_SCHEMA_DIR)
+        for changed_schema in list(changed_schemas):
+            changed_schemas.update(os.path.join(_SCHEMA_DIR, name) for name in registry.dependents(os.path.basename(changed_schema)))
+        json_paths.update(json_path for json_path in _find_json_files() if _find_schema(json_path) in changed_schemas)
+    return sorted(json_paths)
+
+def _revalidate(changed_paths: list, file_cache: 'library_watcher.FileCache', manifest: validation_manifest.ValidationManifest=None,
+                no_sanity: bool=False) -> ValidationReport:
+    """Re-check the files affected by changed_paths, in this process, with parsed files and validators kept in memory.
+
+    Each affected file is parsed once (through file_cache) and that parse is used both to
+    validate it and to sanity check the library; every other file is served from file_cache.
 
-def main(argv: list) -> None:
+    Args:
+        changed_paths: Absolute paths of the JSON and schema files that changed.
+        file_cache: Parsed files from earlier passes.
+        manifest: Optional validation manifest, updated and saved afterwards.
+        no_sanity: If true, skip the sanity checks.
+
+    Returns:
+        ValidationReport for the affected files.
+    """
+    start = time.perf_counter()
+    for changed_path in changed_paths:
+        if not os.path.isfile(changed_path):
+            LOGGER.info('%s was removed.', changed_path)
+            file_cache.discard(changed_path)
+    results = []
+    for json_path in _affected_files(changed_paths):
+        schema_path = _find_schema(json_path)
+        manifest_entry = None if manifest is None or schema_path is None else manifest.entry(json_path)
+        try:
+            json_list = file_cache.load(json_path)
+        except (ValueError, jsonc_loader.JsoncError) as excpt:
+            # Mid-edit files are common in watch mode; report them and carry on
+            LOGGER.warning('%s could not be parsed: %s', json_path, excpt)
+            results.append(FileResult(json_path, schema_path, False, 0.0))
+            continue
+        result = _validate_worker(json_path, schema_path, manifest_entry, json_list if isinstance(json_list, list) else None)
+        if manifest is not None and result.manifest_entry is not None:
+            manifest.set_entry(json_path, result.manifest_entry)
+        results.append(result)
+    if manifest is not None and results:
+        manifest.save()
+
+    report = ValidationReport(results, time.perf_counter() - start)
+    checked_paths = [result.json_path for result in results if result.valid is not False]
+    if not no_sanity and checked_paths:
+        try:
+            valid_paths = [result.json_path for result in results if result.valid]
+            report = report._replace(sanity_warnings=tuple(_sanity_check(checked_paths, file_cache.load, valid_paths)))
+        except (ValueError, jsonc_loader.JsoncError) as excpt:
+            LOGGER.warning('Skipping sanity checks, the library could not be parsed: %s', excpt)
+        report = report._replace(wall_seconds=time.perf_counter() - start)
+    return report
+
+def _watch(args: argparse.Namespace, file_cache: 'library_watcher.FileCache', manifest: validation_manifest.ValidationManifest=None) -> None:
+    """Re-check files as they are saved, until interrupted with Ctrl+C."""
+    import library_watcher
+    def on_change(changed_paths: list) -> None:
+        report = _revalidate(changed_paths, file_cache, manifest, args.no_sanity)
+        if report.results:
+            _print_report(report)
+
+    print(f'Watching {_LIBRARY_DIR} for changes; press Ctrl+C to stop.')
+    library_watcher.watch([_LIBRARY_DIR], on_change)
+
+def main(argv: list) -> ValidationReport:
     """Process args and sequence through actions.
 
     Args:
         argv: List of input arguments.
+
+    Returns:
+        ValidationReport for every file that was checked.
     """
     args = _process_args(argv)
 
+    manifest = None if args.no_cache else validation_manifest.ValidationManifest()
+
+    # Validate every JSON file in the library
+    if args.validate_all:
+        # In watch mode the library stays parsed in memory from the first sanity check on
+        file_cache = None
+        if args.watch:
+            import library_watcher  # Only --watch needs it
+            file_cache = library_watcher.FileCache()
+        report = _validate_all(args.json_paths, args.jobs, manifest)
+        _print_report(report)
+        if not args.no_sanity:
+            valid_paths = [result.json_path for result in report.results if result.valid]
+            sanity_warnings = _sanity_check(args.json_paths, None if file_cache is None else file_cache.load, valid_paths)
+            report = report._replace(sanity_warnings=tuple(sanity_warnings))
+        if args.watch:
+            _watch(args, file_cache, manifest)
+        return report
+
     # Validate the contents of a single JSON file
-    if args.json_path and args.schema_path:
-        if _validate_json_file(args.json_path, args.schema_path):
-            print(f'{args.json_path} is valid!')
-        else:
-            print(f'{args.json_path} is not valid! Use -d option for more information.')
+    manifest_entry = None if manifest is None else manifest.entry(args.json_path)
+    result = _validate_worker(args.json_path, args.schema_path, manifest_entry)
+    if manifest is not None:
+        manifest.set_entry(args.json_path, result.manifest_entry)
+        manifest.save()
+    if result.valid:
+        print(f'{args.json_path} is valid!')
     else:
-        LOGGER.info('Unsupported functionality; you must specify both an input JSON file and a schema with which to validate it.')
+        print(f'{args.json_path} is not valid! Use -d option for more information.')
+    sanity_warnings = () if args.no_sanity else tuple(_sanity_check([args.json_path], valid_paths=[args.json_path] if result.valid else []))
+    return ValidationReport([result], result.seconds, sanity_warnings)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,319 @@
+"""Loader for JSON with comments (JSONC), the format of every file under <ROOT>/library/."""
+
+import os
+import re
+import json
+import pickle
+import hashlib
+import logging
+import utilities
+import instrumentation
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_TOKEN_RE = re.compile(r'("[^"\\\n]*(?:\\.[^"\\\n]*)*")|//[^\n]*|/\*.*?\*/|(/\*)', re.DOTALL)
+"""Matches a string (group 1), a line comment, a block comment, or the opener of an unclosed block comment (group 2)."""
+
+_NON_WHITESPACE_RE = re.compile(r'\S')
+"""Matches the first non-whitespace character."""
+
+_CHUNK_SIZE = 1 << 16
+"""Number of characters to read from a file at a time when streaming."""
+
+_CACHE_SUBDIR = 'jsonc'
+"""Name of the dir inside the worktree cache dir where parsed files are cached."""
+
+_CACHE_VERSION = 1
+"""Version of the cache file format; cache files with any other version are ignored."""
+
+
+class JsoncError(Exception):
+    """Exception class for malformed JSONC."""
+
+
+def _strip_chunk(chunk: str) -> str:
+    """Remove every comment from chunk, leaving comment-like text inside strings alone."""
+    if '/*' in chunk:
+        return _TOKEN_RE.sub(r'\1', chunk)
+
+    # Without block comments, strings and comments can't span lines, so only lines with a '/' need the tokenizer
+    lines = chunk.split('\n')
+    for index, line in enumerate(lines):
+        if '/' in line:
+            lines[index] = _TOKEN_RE.sub(r'\1', line)
+    return '\n'.join(lines)
+
+
+def strip_comments(text: str) -> str:
+    """Remove every // and /* */ comment from text, leaving comment-like text inside strings alone.
+
+    Args:
+        text: JSONC text.
+
+    Returns:
+        The text as plain JSON.
+
+    Raises:
+        JsoncError: Error if a block comment is never closed.
+    """
+    if _find_unclosed_comment(text) != -1:
+        raise JsoncError('Unclosed block comment!')
+    return _strip_chunk(text)
+
+
+def loads(text: str):
+    """Parse JSONC text; the JSONC equivalent of json.loads()."""
+    with instrumentation.span('strip_comments'):
+        text = strip_comments(text)
+    with instrumentation.span('parse'):
+        return json.loads(text)
+
+
+def _cache_path(json_path: str) -> str:
+    """Return the path of the cache file for json_path."""
+    path_hash = hashlib.sha1(os.path.abspath(json_path).encode('UTF-8')).hexdigest()
+    return os.path.join(utilities.get_cache_dir(), _CACHE_SUBDIR, path_hash + '.pickle')
+
+
+def _write_cache(cache_path: str, header: dict, value) -> None:
+    """Write header and value to cache_path, replacing it atomically."""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as cache_fp:
+            pickle.dump(header, cache_fp, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, cache_fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError) as excpt:
+        LOGGER.debug('-- Unable to cache %s: %s', header.get('path'), excpt)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def prune_cache() -> int:
+    """Remove every cache file whose recorded path no longer exists, or that can't be read.
+
+    Returns:
+        The number of cache files removed.
+    """
+    cache_dir = os.path.join(utilities.get_cache_dir(), _CACHE_SUBDIR)
+    try:
+        cache_names = os.listdir(cache_dir)
+    except OSError:
+        return 0
+    removed = 0
+    for cache_name in cache_names:
+        if not cache_name.endswith('.pickle'):
+            continue
+        cache_path = os.path.join(cache_dir, cache_name)
+        try:
+            with open(cache_path, 'rb') as cache_fp:
+                json_path = pickle.load(cache_fp).get('path')
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+            json_path = None
+        if json_path is None or not os.path.exists(json_path):
+            LOGGER.debug('-- Pruning cache entry of %s', json_path)
+            try:
+                os.remove(cache_path)
+                removed += 1
+            except OSError:
+                pass  # Already removed by another process
+    return removed
+
+
+def load(json_path: str, use_cache: bool=True):
+    """Load a JSONC file, using the parsed-file cache in the worktree cache dir.
+
+    A cached value is used as-is if the file's mtime and size are unchanged. Otherwise the file
+    is read and hashed; if its content hash still matches, the cached value is used and only the
+    recorded mtime is updated, else the file is parsed and the cache is refreshed. Whenever a new
+    cache entry is added, entries of files that no longer exist are pruned, see prune_cache().
+
+    Args:
+        json_path: Path to JSONC file.
+        use_cache: If false, always parse the file and leave the cache alone.
+
+    Returns:
+        The parsed value of the file.
+
+    Raises:
+        JsoncError: Error if a block comment is never closed.
+        json.JSONDecodeError: Error if the file is not valid JSON once comments are removed.
+    """
+    with instrumentation.span('load'):
+        return _load(json_path, use_cache)
+
+
+def _load(json_path: str, use_cache: bool):
+    """Implementation of load(), inside its span."""
+    if not use_cache:
+        with open(json_path, 'r', encoding='UTF-8') as json_fp:
+            return loads(json_fp.read())
+
+    json_path = os.path.abspath(json_path)
+    file_stat = os.stat(json_path)
+    cache_path = _cache_path(json_path)
+    json_bytes = None
+    value = None
+    try:
+        with open(cache_path, 'rb') as cache_fp:
+            header = pickle.load(cache_fp)
+            if header.get('version') == _CACHE_VERSION and header.get('path') == json_path:
+                if header['mtime_ns'] == file_stat.st_mtime_ns and header['size'] == file_stat.st_size:
+                    LOGGER.debug('-- Loaded %s from cache', json_path)
+                    return pickle.load(cache_fp)
+                with open(json_path, 'rb') as json_fp:
+                    json_bytes = json_fp.read()
+                if header['hash'] == hashlib.sha1(json_bytes).hexdigest():
+                    LOGGER.debug('-- Loaded %s from cache (touched but unchanged)', json_path)
+                    value = pickle.load(cache_fp)
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError, pickle.UnpicklingError):
+        pass  # Missing, stale or corrupt cache file
+
+    if json_bytes is None:
+        with open(json_path, 'rb') as json_fp:
+            json_bytes = json_fp.read()
+    if value is None:
+        LOGGER.debug('-- Parsing %s', json_path)
+        value = loads(json_bytes.decode('UTF-8'))
+    header = {'version': _CACHE_VERSION, 'path': json_path, 'mtime_ns': file_stat.st_mtime_ns,
+              'size': file_stat.st_size, 'hash': hashlib.sha1(json_bytes).hexdigest()}
+    new_entry = not os.path.exists(cache_path)
+    _write_cache(cache_path, header, value)
+    if new_entry:
+        prune_cache()
+    return value
+
+
+def _find_unclosed_comment(chunk: str) -> int:
+    """Return the index of a block comment in chunk that is not closed, or -1 if there isn't one."""
+    if '/*' not in chunk:
+        return -1
+    for match in _TOKEN_RE.finditer(chunk):
+        if match.group(2):
+            return match.start()
+    return -1
+
+
+def _iter_stripped_chunks(json_fp, chunk_size: int=_CHUNK_SIZE):
+    """Read json_fp a chunk at a time and yield the chunks with comments removed.
+
+    Chunks are only ever split after a newline, where no string or line comment can be open,
+    so each chunk can be stripped on its own; a block comment that is still open at the end
+    of a chunk is carried over to the next one.
+
+    NOTE: A file with no newlines at all is buffered whole before it is stripped.
+    """
+    carry = ''
+    while True:
+        block = json_fp.read(chunk_size)
+        text = carry + block
+        if not block:
+            break
+        cut = text.rfind('\n') + 1
+        chunk, carry = text[:cut], text[cut:]
+        unclosed = _find_unclosed_comment(chunk)
+        if unclosed != -1:
+            chunk, carry = chunk[:unclosed], chunk[unclosed:] + carry
+        if chunk:
+            yield _strip_chunk(chunk)
+
+    if _find_unclosed_comment(text) != -1:
+        raise JsoncError(f'Unclosed block comment in {json_fp.name}!')
+    if text:
+        yield _strip_chunk(text)
+
+
+class _StreamReader:
+    """Decodes JSON values one at a time from an iterator of comment-free text chunks."""
+
+    def __init__(self, chunks, name: str):
+        self._chunks = chunks
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self.name = name
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping everything already consumed. Return False at EOF."""
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it; empty string at EOF."""
+        while True:
+            match = _NON_WHITESPACE_RE.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buffer[self._pos]
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return ''
+
+    def consume(self) -> None:
+        """Consume the character returned by peek()."""
+        self._pos += 1
+
+    def decode(self):
+        """Decode and consume the next JSON value."""
+        self.peek()  # raw_decode() doesn't skip leading whitespace
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value that runs to the very end of the buffer may be cut short (e.g. a number)
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as excpt:
+                if self._eof:
+                    raise JsoncError(f'Malformed JSON in {self.name}: {excpt}') from excpt
+            # Grow the buffer geometrically so a large value isn't re-decoded once per chunk
+            target_size = 2 * (len(self._buffer) - self._pos)
+            while self._fill() and len(self._buffer) < target_size:
+                pass
+
+
+def iter_array(json_path: str, chunk_size: int=_CHUNK_SIZE):
+    """Stream the items of the top-level array in a JSONC file, one at a time.
+
+    Only the current chunk of the file and the item being decoded are held in memory,
+    so work can start on the first item immediately and memory use doesn't grow with
+    the size of the file.
+
+    Args:
+        json_path: Path to a JSONC file containing a list.
+        chunk_size: Number of characters to read at a time.
+
+    Yields:
+        Each item of the top-level array, in order.
+
+    Raises:
+        JsoncError: Error if the file is malformed or its top-level value is not an array.
+    """
+    with open(json_path, 'r', encoding='UTF-8') as json_fp:
+        reader = _StreamReader(_iter_stripped_chunks(json_fp, chunk_size), json_path)
+        if reader.peek() != '[':
+            raise JsoncError(f'Top-level value of {json_path} is not an array!')
+        reader.consume()
+
+        if reader.peek() == ']':
+            reader.consume()
+        else:
+            while True:
+                yield reader.decode()
+                next_char = reader.peek()
+                reader.consume()
+                if next_char == ']':
+                    break
+                if next_char != ',':
+                    raise JsoncError(f'Expected "," or "]" between array items in {json_path}, found "{next_char}"!')
+
+        if reader.peek() != '':
+            raise JsoncError(f'Unexpected data after the top-level array in {json_path}!')
@@ -0,0 +1,282 @@
+"""Watch the library for changes, for the --watch modes of json_validator and database_compiler.
+
+On Linux the library is watched with inotify (through ctypes, so there is nothing to install);
+anywhere else, or if inotify can't be set up, the JSON files are polled for changes in mtime and
+size instead. Either way watch() calls back with every JSON file that changed, batched over a
+short settle time so the temporary files and renames of a single editor save arrive together.
+
+FileCache keeps every parsed file in memory between changes, so each change only re-parses the
+files that were actually saved.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import jsonc_loader
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_SETTLE_SECONDS = 0.02
+"""Time to keep collecting changes after the first one, so a save that touches several files is handled once."""
+
+_POLL_SECONDS = 0.025
+"""Time between scans of the polling watcher."""
+
+_WATCHED_SUFFIX = '.json'
+"""Suffix of the files that are reported; editor swap and backup files are ignored."""
+
+# inotify constants, see inotify(7)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+_EVENT = struct.Struct('iIII')
+"""Header of an inotify event: watch descriptor, mask, cookie, length of the name that follows."""
+
+_READ_SIZE = 1 << 16
+"""Number of bytes to read from the inotify descriptor at a time."""
+
+
+class WatcherError(Exception):
+    """Exception class for when a watcher can't be set up."""
+
+
+def _is_watched(path: str) -> bool:
+    """Return True if changes to path should be reported."""
+    return path.endswith(_WATCHED_SUFFIX)
+
+
+def _walk_dirs(watch_dirs: list) -> list:
+    """Return every dir under watch_dirs (including themselves) that exists."""
+    found = []
+    for watch_dir in watch_dirs:
+        for dir_path, _, _ in os.walk(watch_dir):
+            found.append(os.path.abspath(dir_path))
+    return found
+
+
+class InotifyWatcher:
+    """Watches dirs (recursively, including dirs created later) with Linux inotify."""
+
+    def __init__(self, watch_dirs: list):
+        """Start watching watch_dirs.
+
+        Raises:
+            WatcherError: Error if inotify isn't available on this system.
+        """
+        if not sys.platform.startswith('linux'):
+            raise WatcherError('inotify is only available on Linux!')
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            self._libc.inotify_init1.argtypes = [ctypes.c_int]
+            self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        except (OSError, AttributeError) as excpt:
+            raise WatcherError(f'Unable to load inotify from libc: {excpt}') from None
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise WatcherError(f'inotify_init1 failed: {os.strerror(ctypes.get_errno())}')
+        self.watch_dirs = list(watch_dirs)
+        self._dirs = {}  # Watch descriptor to dir path
+        try:
+            for dir_path in _walk_dirs(watch_dirs):
+                self._add_watch(dir_path)
+        except WatcherError:
+            self.close()
+            raise
+
+    def _add_watch(self, dir_path: str) -> None:
+        """Watch dir_path (not recursively)."""
+        descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), _WATCH_MASK)
+        if descriptor < 0:
+            raise WatcherError(f'Unable to watch {dir_path}: {os.strerror(ctypes.get_errno())}')
+        self._dirs[descriptor] = dir_path
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def wait(self, timeout: float=None) -> set:
+        """Block until something changes or timeout seconds pass (forever if None).
+
+        Returns:
+            Set of absolute paths of the watched files that changed; empty on a timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                break
+            changed |= self._read_events()
+        return changed
+
+    def _watch_new_dirs(self, dir_paths: list) -> set:
+        """Watch every dir under dir_paths and return the watched files already in them.
+
+        A dir that can't be watched (e.g. it was removed again straight away, or the watch limit
+        was reached) is logged and skipped, so one bad dir doesn't stop the watch loop.
+        """
+        found = set()
+        for dir_path in _walk_dirs(dir_paths):
+            try:
+                self._add_watch(dir_path)
+                found.update(os.path.join(dir_path, file_name) for file_name in os.listdir(dir_path) if _is_watched(file_name))
+            except (WatcherError, OSError) as excpt:
+                LOGGER.warning('Not watching %s: %s', dir_path, excpt)
+        return found
+
+    def _read_events(self) -> set:
+        """Read every pending event and return the watched files they concern.
+
+        If the kernel's event queue overflowed, events were dropped and there is no telling which
+        files they were about, so every dir is watched again and every watched file is reported.
+        """
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            descriptor, mask, _, name_length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + name_length].rstrip(b'\0')
+            offset += _EVENT.size + name_length
+            if mask & _IN_Q_OVERFLOW:
+                LOGGER.warning('The inotify event queue overflowed; rescanning %s.', ', '.join(self.watch_dirs))
+                return self._watch_new_dirs(self.watch_dirs)
+            if descriptor not in self._dirs or not name:
+                continue
+            path = os.path.join(self._dirs[descriptor], os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # Watch the new dir, and report any files that were written before the watch was in place
+                    changed |= self._watch_new_dirs([path])
+            elif _is_watched(path):
+                changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """Watches dirs by scanning the mtime and size of every watched file at an interval."""
+
+    def __init__(self, watch_dirs: list, interval: float=_POLL_SECONDS):
+        """Take the first snapshot of watch_dirs."""
+        self.watch_dirs = list(watch_dirs)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict:
+        """Return a dict mapping every watched file to its (mtime_ns, size)."""
+        snapshot = {}
+        for dir_path in _walk_dirs(self.watch_dirs):
+            try:
+                entries = list(os.scandir(dir_path))
+            except OSError:
+                continue  # Removed while scanning
+            for entry in entries:
+                if _is_watched(entry.name):
+                    try:
+                        file_stat = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[entry.path] = (file_stat.st_mtime_ns, file_stat.st_size)
+        return snapshot
+
+    def close(self) -> None:
+        """Stop watching; nothing to release."""
+
+    def wait(self, timeout: float=None) -> set:
+        """Block until something changes or timeout seconds pass (forever if None).
+
+        Returns:
+            Set of absolute paths of the watched files that changed, appeared or disappeared; empty on a timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic())))
+
+
+def create_watcher(watch_dirs: list, poll: bool=False):
+    """Return an InotifyWatcher for watch_dirs, or a PollingWatcher if inotify isn't available or poll is True."""
+    if not poll:
+        try:
+            return InotifyWatcher(watch_dirs)
+        except WatcherError as excpt:
+            LOGGER.info('Falling back to polling: %s', excpt)
+    return PollingWatcher(watch_dirs)
+
+
+def watch(watch_dirs: list, on_change, poll: bool=False, settle: float=_SETTLE_SECONDS, max_batches: int=None) -> None:
+    """Call on_change with every batch of changed files under watch_dirs, until interrupted with Ctrl+C.
+
+    Args:
+        watch_dirs: Dirs to watch, recursively.
+        on_change: Function called with the sorted list of absolute paths of the JSON files that
+            were changed, created or removed.
+        poll: If true, poll even if inotify is available.
+        settle: Seconds to keep collecting changes after the first one before calling on_change.
+        max_batches: Stop after this many calls of on_change; watch forever if None.
+    """
+    watcher = create_watcher(watch_dirs, poll)
+    LOGGER.info('Watching %s with %s...', ', '.join(watch_dirs), type(watcher).__name__)
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            changed = watcher.wait()
+            while True:
+                more = watcher.wait(settle)
+                if not more:
+                    break
+                changed |= more
+            on_change(sorted(changed))
+            batches += 1
+    except KeyboardInterrupt:
+        LOGGER.info('Stopped watching.')
+    finally:
+        watcher.close()
+
+
+class FileCache:
+    """Parsed JSON files kept in memory, re-parsed only when their mtime or size changes."""
+
+    def __init__(self):
+        self._files = {}  # Absolute path to ((mtime_ns, size), parsed value)
+
+    def load(self, json_path: str):
+        """Return the parsed contents of json_path, see jsonc_loader.load()."""
+        json_path = os.path.abspath(json_path)
+        file_stat = os.stat(json_path)
+        signature = (file_stat.st_mtime_ns, file_stat.st_size)
+        cached = self._files.get(json_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        value = jsonc_loader.load(json_path)
+        self._files[json_path] = (signature, value)
+        return value
+
+    def discard(self, json_path: str) -> None:
+        """Forget json_path, e.g. because it was removed."""
+        self._files.pop(os.path.abspath(json_path), None)
@@ -0,0 +1,108 @@
+"""Trigram index over library names, for exact lookups that tolerate case and separators, and typo suggestions."""
+
+import os
+import logging
+import talent_db
+from typing import NamedTuple
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_MIN_SIMILARITY = 0.3
+"""Default lowest trigram similarity for a name to be suggested."""
+
+
+class Suggestion(NamedTuple):
+    """A name close to a query, with its trigram similarity in [0, 1]."""
+    name: str
+    similarity: float
+
+
+def trigrams(name: str) -> set:
+    """Return the set of trigrams of the normalized name, padded so word starts and ends count.
+
+    See talent_db.normalize_name(); every word is padded separately, so 'Swift_I' gives
+    '  s', ' sw', 'swi', 'wif', 'ift', 'ft ', '  i' and ' i '.
+    """
+    grams = set()
+    for word in talent_db.normalize_name(name).split('_'):
+        padded = f'  {word} '
+        grams.update(padded[start:start + 3] for start in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    """Names indexed by normalized form and by trigram.
+
+    resolve() is a single dict lookup. suggest() only scores the names that share a trigram
+    with the query, found through the trigram postings, instead of comparing the query with
+    every name.
+    """
+
+    def __init__(self, names):
+        """Index names.
+
+        Args:
+            names: Iterable of names; if two names normalize the same, the first one wins.
+        """
+        self.names = []
+        self._by_key = {}
+        self._grams = []
+        self._postings = {}
+        for name in names:
+            key = talent_db.normalize_name(name)
+            if key in self._by_key:
+                continue
+            index = len(self.names)
+            self.names.append(name)
+            self._by_key[key] = index
+            grams = trigrams(name)
+            self._grams.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return talent_db.normalize_name(name) in self._by_key
+
+    def resolve(self, name: str) -> str:
+        """Return the indexed name that name refers to, ignoring case and separators, or None."""
+        index = self._by_key.get(talent_db.normalize_name(name))
+        return self.names[index] if index is not None else None
+
+    def suggest(self, name: str, limit: int=3, min_similarity: float=_MIN_SIMILARITY) -> list:
+        """Return the indexed names closest to name.
+
+        Similarity is the Dice coefficient of the trigram sets: twice the shared trigrams over
+        the total number of trigrams of both names.
+
+        Args:
+            name: Name to find matches for.
+            limit: Maximum number of suggestions.
+            min_similarity: Lowest similarity to include.
+
+        Returns:
+            List of Suggestion, most similar first, ties in index order.
+        """
+        query_grams = trigrams(name)
+        shared = {}
+        for gram in query_grams:
+            for index in self._postings.get(gram, ()):
+                shared[index] = shared.get(index, 0) + 1
+        scored = []
+        for index, count in shared.items():
+            similarity = 2 * count / (len(query_grams) + self._grams[index])
+            if similarity >= min_similarity:
+                scored.append((-similarity, index))
+        scored.sort()
+        return [Suggestion(self.names[index], -negative) for negative, index in scored[:limit]]
+
+    def best_match(self, name: str, min_similarity: float=_MIN_SIMILARITY) -> str:
+        """Return the indexed name that name refers to, or failing that the closest one, or None."""
+        resolved = self.resolve(name)
+        if resolved is not None:
+            return resolved
+        suggestions = self.suggest(name, limit=1, min_similarity=min_similarity)
+        return suggestions[0].name if suggestions else None
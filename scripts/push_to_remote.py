@@ -58,9 +58,9 @@ def _process_args(argv):
     return args
 
 
-def _run_unittests():
-    """Run all unittests."""
-    run_test.main(['-t', 'all'])
+def _run_unittests(branch: str):
+    """Run the unittests affected by the changes not yet pushed to origin/<branch> (every unittest if it doesn't exist yet)."""
+    run_test.main(['-t', 'all', '--affected', f'origin/{branch}'])
 
 
 def _print_list(my_list: list, tabs: int=0):
@@ -97,7 +97,7 @@ def main(argv):
 
     LOGGER.info('Worktree clean. Running unittests...')
     if not args.dry_run:
-        _run_unittests()
+        _run_unittests(args.branch)
 
     print(f'Worktree clean and unittests passed, pushing to origin/{args.branch}...')
     push_cmd = f'git push origin {args.branch} -f' if args.force else f'git push origin {args.branch}'
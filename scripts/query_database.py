@@ -0,0 +1,151 @@
+"""Script to search the SQLite database of the library generated by database_compiler.py."""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import talent_db
+import utilities
+import sqlite_db
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+
+class QueryError(Exception):
+    """Exception class for malformed queries."""
+
+
+def _parse_scores(scores: list) -> dict:
+    """Parse a list of 'attribute=score' strings into a dict.
+
+    Raises:
+        QueryError: Error if an entry is malformed or names an unknown attribute.
+    """
+    parsed = {}
+    for score in scores:
+        attribute, _, value = score.partition('=')
+        if attribute not in talent_db.ATTRIBUTES:
+            raise QueryError(f'Unknown attribute in "{score}"! Attributes = {talent_db.ATTRIBUTES}')
+        try:
+            parsed[attribute] = int(value)
+        except ValueError:
+            raise QueryError(f'Score in "{score}" is not an integer!') from None
+    return parsed
+
+
+def _process_args(argv: list) -> argparse.Namespace:
+    """Parse and process arguments; convert to argparse.Namespace object.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        args: Parsed args with args as properties on the object.
+    """
+    parser = argparse.ArgumentParser(
+        os.path.basename(__file__),
+        description='Search the library by text in names and descriptions, and filter by level and prerequisites.'
+    )
+    parser.add_argument(
+        'text',
+        help='Words that must appear in the name or description, e.g. "unarmed" or "**2** damage".',
+        nargs='?',
+        default=None
+    )
+    parser.add_argument(
+        '-c',
+        '--collection',
+        help='Only search this collection, e.g. talents or statblocks.',
+        dest='collection',
+        default=None
+    )
+    parser.add_argument(
+        '-l',
+        '--level',
+        help='Only show results of exactly this level.',
+        dest='level',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '-m',
+        '--max_level',
+        help='Only show results of this level or lower.',
+        dest='max_level',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '-A',
+        '--ancestry',
+        help='Only show talents that require this ancestry.',
+        dest='ancestry',
+        default=None
+    )
+    parser.add_argument(
+        '-r',
+        '--requires',
+        help='Only show talents with a prerequisite on this attribute. May be given more than once.',
+        dest='requires',
+        choices=talent_db.ATTRIBUTES,
+        action='append',
+        default=[]
+    )
+    parser.add_argument(
+        '-e',
+        '--eligible',
+        help='Only show talents whose attribute prerequisites are met by these scores, e.g. -e str=2 -e dex=1. Missing attributes count as 0.',
+        dest='eligible',
+        action='append',
+        default=None
+    )
+    parser.add_argument(
+        '-n',
+        '--limit',
+        help='Maximum number of results (default=50).',
+        dest='limit',
+        type=int,
+        default=50
+    )
+    parser.add_argument(
+        '--db',
+        help='Path to the SQLite database (default=generated/library.sqlite).',
+        dest='db_path',
+        default=None
+    )
+    args = utilities.parser_setup(parser, argv, LOGGER)
+    if args.eligible is not None:
+        args.eligible = _parse_scores(args.eligible)
+    return args
+
+
+def main(argv: list) -> list:
+    """Process args, run the search and print the results.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        List of sqlite_db.SearchResult.
+    """
+    args = _process_args(argv)
+    start = time.perf_counter()
+    connection = sqlite_db.connect(args.db_path)
+    try:
+        results = sqlite_db.search(connection, args.text, args.collection, args.level, args.max_level,
+                                   args.ancestry, args.requires, args.eligible, args.limit)
+    finally:
+        connection.close()
+    seconds = time.perf_counter() - start
+
+    for result in results:
+        line = f'[{result.collection}] {result.name.replace("_", " ")} (level {result.level})'
+        print(f'{line}: {result.snippet}' if result.snippet else line)
+    print(f'{len(results)} result(s) in {seconds * 1000:.1f} ms.')
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
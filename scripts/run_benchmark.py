@@ -0,0 +1,231 @@
+"""Script to run the performance benchmarks under <ROOT>/scripts/benchmarks/.
+
+Results can be saved as a baseline, and later runs compared against it: a metric that got
+worse by more than the threshold is a regression. Whether lower or higher is better is read
+from the metric name (see _metric_direction()); metrics where it can't be told are only
+printed. Baselines are kept per count, since most metrics depend on it.
+
+NOTE: Baselines are saved to the worktree cache dir by default, which is not tracked: timings
+only compare on the machine they were taken on, so each worktree records its own with
+--save_baseline before comparing against it. Pass --baseline_file to keep one somewhere else,
+e.g. to share it between worktrees on the same machine.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import importlib
+import utilities
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_ROOT = utilities.get_root_dir()
+"""Root of the worktree."""
+
+_BENCH_DIR = os.path.join(_ROOT, 'scripts', 'benchmarks')
+"""Path to benchmarks directory."""
+
+_BENCH_RE = os.path.join('scripts', 'benchmarks', 'bench_*.py')
+"""Glob pattern to match benchmark modules."""
+
+_BENCH_FUNC_PREFIX = 'bench_'
+"""Prefix of benchmark functions inside a benchmark module; each must have the signature 'bench_name(count) -> dict'."""
+
+_BASELINE_NAME = 'benchmark_baselines.json'
+"""File name of the saved baselines inside the worktree cache dir."""
+
+_LOWER_IS_BETTER = frozenset(('secs', 'ms', 'us', 'usecs', 'kib', 'mb'))
+"""Units that mark metrics where lower values are better (times and sizes), e.g. 'validate_secs'."""
+
+_HIGHER_IS_BETTER = frozenset(('speedup',))
+"""Words that mark metrics where higher values are better; so do rates, e.g. 'objs_per_sec'."""
+
+
+class BenchmarkError(Exception):
+    """Exception class for benchmark errors."""
+
+
+def _process_args(argv: list) -> argparse.Namespace:
+    """Parse and process arguments; convert to argparse.Namespace object.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        args: Parsed args with args as properties on the object.
+    """
+    parser = argparse.ArgumentParser(os.path.basename(__file__),
+                                     description='Run performance benchmarks and print their results.')
+    bench_files = glob.glob(_BENCH_RE, root_dir=_ROOT)
+    bench_options = [os.path.basename(file).split('.')[0] for file in bench_files]
+    bench_options.append('all')
+    parser.add_argument(
+        '-b',
+        '--bench_name',
+        help='Name of the benchmark module to run.',
+        dest='bench',
+        choices=bench_options,
+        default='all'
+    )
+    parser.add_argument(
+        '-n',
+        '--count',
+        help='Number of synthetic objects each benchmark should work on (default=10000).',
+        dest='count',
+        type=int,
+        default=10000
+    )
+    parser.add_argument(
+        '--save_baseline',
+        help='Save the results as the baseline for this count instead of comparing against it.',
+        action='store_true',
+        dest='save_baseline',
+        default=False
+    )
+    parser.add_argument(
+        '--baseline_file',
+        help=f'Baseline file to compare against or save to (default={_BASELINE_NAME} in the untracked worktree cache dir).',
+        dest='baseline_file',
+        default=None
+    )
+    parser.add_argument(
+        '--threshold',
+        help='Fraction a metric may get worse than its baseline before it counts as a regression (default=0.2).',
+        dest='threshold',
+        type=float,
+        default=0.2
+    )
+    args = utilities.parser_setup(parser, argv, LOGGER)
+
+    if args.baseline_file is None:
+        args.baseline_file = os.path.join(utilities.get_cache_dir(_ROOT), _BASELINE_NAME)
+    module_names = [option for option in bench_options if option != 'all']
+    setattr(args, 'modules', sorted(module_names) if args.bench == 'all' else [args.bench])
+
+    return args
+
+
+def _run_module(module_name: str, count: int) -> dict:
+    """Run every benchmark function in the module module_name.
+
+    Args:
+        module_name: Name of a module under _BENCH_DIR.
+        count: Number of synthetic objects to pass to each benchmark function.
+
+    Returns:
+        Dict mapping '<module>.<function>' to the dict of metrics returned by that function.
+    """
+    if _BENCH_DIR not in sys.path:
+        sys.path.insert(0, _BENCH_DIR)
+    module = importlib.import_module(module_name)
+
+    results = {}
+    for attr_name in sorted(dir(module)):
+        bench_func = getattr(module, attr_name)
+        if not attr_name.startswith(_BENCH_FUNC_PREFIX) or not callable(bench_func):
+            continue
+        LOGGER.info('Running %s.%s (count=%d)...', module_name, attr_name, count)
+        start = time.perf_counter()
+        results[f'{module_name}.{attr_name}'] = bench_func(count)
+        LOGGER.debug('-- Finished in %.3f s', time.perf_counter() - start)
+    return results
+
+
+def _print_results(results: dict) -> None:
+    """Print benchmark results, one metric per line."""
+    for bench_name, metrics in results.items():
+        print(bench_name)
+        for metric, value in metrics.items():
+            value_str = f'{value:,.3f}' if isinstance(value, float) else str(value)
+            print(f'    {metric}: {value_str}')
+
+
+def _load_baselines(baseline_path: str) -> dict:
+    """Return a dict mapping count (as a string) to the results saved for it, or an empty dict if there are none."""
+    try:
+        with open(baseline_path, 'r') as baseline_fp:
+            return json.load(baseline_fp)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_baseline(baseline_path: str, count: int, results: dict) -> None:
+    """Save results as the baseline for count, keeping the results of other benchmarks and counts."""
+    baselines = _load_baselines(baseline_path)
+    baselines.setdefault(str(count), {}).update(results)
+    tmp_path = f'{baseline_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as baseline_fp:
+        json.dump(baselines, baseline_fp, indent=1, sort_keys=True)
+    os.replace(tmp_path, baseline_path)
+
+
+def _metric_direction(metric: str) -> int:
+    """Return 1 if higher values of metric are better, -1 if lower values are, or 0 if it can't be told from its name."""
+    words = set(metric.split('_'))
+    if '_per_sec' in metric or words & _HIGHER_IS_BETTER:
+        return 1
+    if words & _LOWER_IS_BETTER:
+        return -1
+    return 0
+
+
+def _find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """Compare results with baseline.
+
+    Args:
+        results: Dict mapping benchmark name to its dict of metrics.
+        baseline: Saved results of an earlier run, in the same format.
+        threshold: Fraction a metric may get worse before it counts as a regression.
+
+    Returns:
+        List of (benchmark name, metric, baseline value, new value) of every regressed metric.
+    """
+    regressions = []
+    for bench_name, metrics in results.items():
+        for metric, value in metrics.items():
+            old_value = baseline.get(bench_name, {}).get(metric)
+            if not isinstance(old_value, (int, float)) or not isinstance(value, (int, float)) or old_value <= 0:
+                continue
+            direction = _metric_direction(metric)
+            if (direction < 0 and value > old_value * (1 + threshold)) or (direction > 0 and value < old_value * (1 - threshold)):
+                regressions.append((bench_name, metric, old_value, value))
+    return regressions
+
+
+def main(argv):
+    """Run benchmarks, then save them as the baseline or compare them against it.
+
+    Raises:
+        BenchmarkError: Error if any metric regressed beyond the threshold.
+    """
+    args = _process_args(argv)
+    if args.count < 1:
+        raise BenchmarkError(f'Benchmark count must be positive, got {args.count}!')
+    results = {}
+    for module_name in args.modules:
+        results.update(_run_module(module_name, args.count))
+    _print_results(results)
+
+    if args.save_baseline:
+        _save_baseline(args.baseline_file, args.count, results)
+        print(f'Saved baseline for count={args.count} to {args.baseline_file}')
+        return results
+    baseline = _load_baselines(args.baseline_file).get(str(args.count))
+    if baseline is None:
+        LOGGER.info('No baseline for count=%d in %s; use --save_baseline to save one.', args.count, args.baseline_file)
+        return results
+    regressions = _find_regressions(results, baseline, args.threshold)
+    for bench_name, metric, old_value, value in regressions:
+        print(f'REGRESSION {bench_name}.{metric}: {old_value:,.3f} -> {value:,.3f}')
+    if regressions:
+        raise BenchmarkError(f'{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}!')
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
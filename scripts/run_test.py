@@ -1,11 +1,27 @@
+"""Script to run the python unittests under scripts/testing, sharded across worker processes.
 
+Each test module runs as one shard. Every test's run time is recorded in the worktree cache
+dir, and shards are handed to the workers slowest first, so a slow module never starts last
+and keeps the others waiting. Modules without a recorded time count as slowest.
+
+With --affected, only the test modules that import a changed file are run, found with a static
+import graph of every python file under scripts/.
+"""
+
+import io
 import os
 import sys
+import ast
 import glob
+import json
+import time
 import logging
 import unittest
 import argparse
+import subprocess
+import concurrent.futures
 import utilities
+from typing import NamedTuple
 
 LOGGER = logging.getLogger(os.path.basename(__file__))
 """Logger for this module."""
@@ -13,16 +29,80 @@ LOGGER = logging.getLogger(os.path.basename(__file__))
 _ROOT = utilities.get_root_dir()
 """Root of the worktree."""
 
-_TEST_DIR = os.path.join(_ROOT, 'scripts', 'testing')
+_SCRIPTS_DIR = os.path.join(_ROOT, 'scripts')
+"""Path to scripts directory."""
+
+_TEST_DIR = os.path.join(_SCRIPTS_DIR, 'testing')
 """Path to testing directory."""
 
 _TEST_RE = os.path.join('scripts', 'testing', 'test_*.py')
 """Glob pattern to match python unittests."""
 
+_TIMINGS_NAME = 'test_timings.json'
+"""File name of the recorded test run times inside the worktree cache dir."""
+
+_TIMINGS_VERSION = 1
+"""Version of the timings format; timings with any other version are discarded."""
+
+_RUN_ALL_PATHS = ('library/schemas/', 'scripts/requirements.txt')
+"""Changed files under these paths (relative to the root) can affect any test, so --affected runs every test."""
+
 
 class TestFailedException(Exception):
     """Exception class for failed unittest."""
 
+
+class ModuleResult(NamedTuple):
+    """Result of running a single test module."""
+    module: str
+    tests_run: int
+    failures: list  # (test id, traceback) of each failed test
+    errors: list  # (test id, traceback) of each test that raised an error
+    skipped: int
+    durations: dict  # Test id to run time in seconds
+    output: str  # Output of the text test runner
+    seconds: float
+
+
+class SuiteReport(NamedTuple):
+    """Combined result of running several test modules."""
+    results: list  # List of ModuleResult, in the order they finished
+    wall_seconds: float
+    jobs: int
+
+    @property
+    def tests_run(self) -> int:
+        """Total number of tests run."""
+        return sum(result.tests_run for result in self.results)
+
+    @property
+    def failures(self) -> list:
+        """(test id, traceback) of every failed test."""
+        return [failure for result in self.results for failure in result.failures]
+
+    @property
+    def errors(self) -> list:
+        """(test id, traceback) of every test that raised an error."""
+        return [error for result in self.results for error in result.errors]
+
+
+class _TimedTestResult(unittest.TextTestResult):
+    """Text test result that records the run time of every test."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.durations = {}
+        self._start = None
+
+    def startTest(self, test: unittest.TestCase) -> None:
+        self._start = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test: unittest.TestCase) -> None:
+        super().stopTest(test)
+        self.durations[test.id()] = time.perf_counter() - self._start
+
+
 def _process_args(argv: list) -> argparse.Namespace:
     """Parse and process arguments; convert to argparse.Namespace object.
 
@@ -36,39 +116,228 @@ def _process_args(argv: list) -> argparse.Namespace:
     parser = argparse.ArgumentParser(os.path.basename(__file__),
                                      description='Run a python unittest. Unittests should not be '
                                      'run directly! They must be run using this script.')
-    test_files = glob.glob(_TEST_RE, root_dir=_ROOT)
-    test_options = [os.path.basename(file).split('.')[0] for file in test_files]
-    test_files.append('test_*.py')
-    test_options.append('all')
+    test_options = sorted(os.path.splitext(os.path.basename(file))[0] for file in glob.glob(_TEST_RE, root_dir=_ROOT))
     parser.add_argument(
         '-t',
         '--test_name',
         help='Name of the test to run.',
         dest='test',
-        choices=test_options,
+        choices=test_options + ['all'],
         default='all'
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help='Number of worker processes to shard test modules across (default=number of CPUs).',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count()
+    )
+    parser.add_argument(
+        '-a',
+        '--affected',
+        help='Only run the tests that import a file changed since REF (default=HEAD, i.e. modified, staged '
+             'and untracked files), found with a static import graph of scripts/.',
+        dest='affected_ref',
+        nargs='?',
+        const='HEAD',
+        default=None,
+        metavar='REF'
+    )
     args = utilities.parser_setup(parser, argv, LOGGER)
 
-    test_map = {basename: os.path.basename(path) for basename, path in zip(test_options, test_files)}
-    setattr(args, 'test_map', test_map)
-
+    setattr(args, 'test_modules', test_options if args.test == 'all' else [args.test])
     return args
 
 
-def _run_test(test_pattern: str) -> unittest.TestResult:
-    """Run the python unittest specified by test_pattern."""
-    test_suite = unittest.defaultTestLoader.discover(_TEST_DIR, test_pattern)
-    result = unittest.TextTestRunner().run(test_suite)
-    return result
+def _timings_path() -> str:
+    """Return the path of the recorded test run times."""
+    return os.path.join(utilities.get_cache_dir(_ROOT), _TIMINGS_NAME)
+
+
+def _load_timings() -> dict:
+    """Return a dict mapping test id to its last recorded run time in seconds."""
+    try:
+        with open(_timings_path(), 'r') as timings_fp:
+            timings = json.load(timings_fp)
+    except (OSError, ValueError):
+        return {}
+    return timings.get('tests', {}) if timings.get('version') == _TIMINGS_VERSION else {}
+
+
+def _save_timings(timings: dict) -> None:
+    """Save timings, see _load_timings(), replacing the file atomically."""
+    timings_path = _timings_path()
+    tmp_path = f'{timings_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as timings_fp:
+        json.dump({'version': _TIMINGS_VERSION, 'tests': timings}, timings_fp, indent=1, sort_keys=True)
+    os.replace(tmp_path, timings_path)
+
+
+def _schedule(test_modules: list, timings: dict) -> list:
+    """Return test_modules ordered slowest first by their recorded time; modules with no recorded tests come first."""
+    module_seconds = {}
+    for test_id, seconds in timings.items():
+        module = test_id.split('.', 1)[0]
+        module_seconds[module] = module_seconds.get(module, 0.0) + seconds
+    return sorted(test_modules, key=lambda module: -module_seconds.get(module, float('inf')))
+
+
+def _import_graph(scripts_dir: str=_SCRIPTS_DIR) -> dict:
+    """Build the static import graph of every python file under scripts_dir.
+
+    Returns:
+        Dict mapping module name (file name without extension) to the set of module names under
+        scripts_dir it imports at the top level or inside functions.
+    """
+    paths = {os.path.splitext(os.path.basename(path))[0]: path for path in glob.glob(os.path.join(scripts_dir, '**', '*.py'), recursive=True)}
+    graph = {}
+    for module, path in paths.items():
+        with open(path, 'r', encoding='UTF-8') as py_fp:
+            try:
+                tree = ast.parse(py_fp.read(), path)
+            except SyntaxError:
+                LOGGER.warning('Unable to parse %s; treating it as importing nothing.', path)
+                tree = ast.Module(body=[], type_ignores=[])
+        imported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module is not None and not node.level:
+                imported.add(node.module.split('.')[0])
+        graph[module] = imported & paths.keys()
+    return graph
+
+
+def _affected_tests(changed_files: list, test_modules: list, graph: dict) -> list:
+    """Return the test modules in test_modules that import (directly or not) any of changed_files.
+
+    Args:
+        changed_files: Changed files, relative to the root of the worktree.
+        test_modules: Test module names to choose from.
+        graph: Import graph, see _import_graph().
+
+    Returns:
+        The affected subset of test_modules, in the same order. If a module was deleted, its
+        importers are no longer in graph, so every test module is affected.
+    """
+    if any(changed_file.startswith(_RUN_ALL_PATHS) for changed_file in changed_files):
+        return list(test_modules)
+    changed = {os.path.splitext(os.path.basename(changed_file))[0] for changed_file in changed_files
+               if changed_file.startswith('scripts/') and changed_file.endswith('.py')}
+    if changed - graph.keys():
+        LOGGER.debug('Deleted modules %s; every test is affected.', sorted(changed - graph.keys()))
+        return list(test_modules)
+    importers = {}
+    for module, imported in graph.items():
+        for imported_module in imported:
+            importers.setdefault(imported_module, set()).add(module)
+    affected = set()
+    pending = list(changed & graph.keys())
+    while pending:
+        module = pending.pop()
+        if module not in affected:
+            affected.add(module)
+            pending.extend(importers.get(module, ()))
+    return [test_module for test_module in test_modules if test_module in affected]
+
+
+def _run_module(test_module: str, test_dir: str=_TEST_DIR) -> ModuleResult:
+    """Run every test in test_module under test_dir. Runs in a worker process.
+
+    Returns:
+        ModuleResult of the module; test objects are reduced to ids so the result can be pickled.
+    """
+    start = time.perf_counter()
+    test_suite = unittest.TestLoader().discover(test_dir, f'{test_module}.py')
+    stream = io.StringIO()
+    result = unittest.TextTestRunner(stream=stream, resultclass=_TimedTestResult).run(test_suite)
+    return ModuleResult(
+        module=test_module,
+        tests_run=result.testsRun,
+        failures=[(test.id(), traceback) for test, traceback in result.failures],
+        errors=[(test.id(), traceback) for test, traceback in result.errors],
+        skipped=len(result.skipped),
+        durations=result.durations,
+        output=stream.getvalue(),
+        seconds=time.perf_counter() - start
+    )
+
+
+def _run_tests(test_modules: list, jobs: int=None) -> SuiteReport:
+    """Run test_modules, slowest first, sharded across jobs worker processes, and record every test's run time.
+
+    Args:
+        test_modules: Names of the test modules to run.
+        jobs: Number of worker processes; defaults to the number of CPUs.
+
+    Returns:
+        SuiteReport of the run.
+    """
+    start = time.perf_counter()
+    timings = _load_timings()
+    ordered = _schedule(test_modules, timings)
+    jobs = max(1, min(jobs or os.cpu_count(), len(ordered)))
+    LOGGER.debug('Running %s on %d worker(s)', ordered, jobs)
+    if jobs <= 1:
+        # Not worth the cost of starting a pool
+        results = [_run_module(test_module) for test_module in ordered]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            # Workers take the next module as soon as they are free, so submission order is run order
+            futures = [executor.submit(_run_module, test_module) for test_module in ordered]
+            results = [future.result() for future in concurrent.futures.as_completed(futures)]
+
+    for result in results:
+        # Forget tests that no longer exist in the modules that ran
+        timings = {test_id: seconds for test_id, seconds in timings.items() if test_id.split('.', 1)[0] != result.module}
+        timings.update(result.durations)
+    _save_timings(timings)
+    return SuiteReport(results, time.perf_counter() - start, jobs)
+
+
+def _print_report(report: SuiteReport) -> None:
+    """Print the output of every module with problems, then the totals."""
+    for result in report.results:
+        LOGGER.info('%s: %d test(s) in %.2f s', result.module, result.tests_run, result.seconds)
+        if result.failures or result.errors:
+            print(result.output)
+    print(f'Ran {report.tests_run} test(s) from {len(report.results)} module(s) on {report.jobs} worker(s) '
+          f'in {report.wall_seconds:.2f} s')
+    if report.failures or report.errors:
+        print(f'FAILED (failures={len(report.failures)}, errors={len(report.errors)})')
+    else:
+        print('OK')
 
 
 def main(argv):
-    """Run a unittest."""
+    """Run unittests.
+
+    Returns:
+        SuiteReport of the run, or None if --affected found no affected tests.
+
+    Raises:
+        TestFailedException: Error if any test failed.
+    """
     args = _process_args(argv)
-    result = _run_test(args.test_map[args.test])
-    if result.failures or result.errors:
+    test_modules = args.test_modules
+    if args.affected_ref is not None:
+        try:
+            changed_files = utilities.get_changed_files(args.affected_ref, _ROOT)
+        except subprocess.CalledProcessError:
+            LOGGER.warning('Unable to compare against %s; running every test.', args.affected_ref)
+        else:
+            LOGGER.debug('Changed files = %s', changed_files)
+            test_modules = _affected_tests(changed_files, test_modules, _import_graph())
+            if not test_modules:
+                print(f'No tests are affected by the changes since {args.affected_ref}.')
+                return None
+
+    report = _run_tests(test_modules, args.jobs)
+    _print_report(report)
+    if report.failures or report.errors:
         raise TestFailedException(f'Unittests failed for "{args.test}" suite!')
+    return report
 
 
 if __name__ == '__main__':
@@ -0,0 +1,247 @@
+"""Sanity checks for the JSON library: rules of the RPG that a schema can't (or shouldn't) enforce.
+
+Sanity checks only ever emit warnings; see library/markdown/talent_json_plan.md for why.
+Every check is registered for one collection (the stem of a file under library/json, e.g.
+'talents') with @sanity_check. run_checks() loads the whole library once into a LibraryContext
+of shared lookup tables, then makes a single pass over every object, running all of the checks
+registered for its collection, so the cost grows linearly with the size of the library.
+"""
+
+import os
+import glob
+import logging
+import talent_db
+import utilities
+import name_index
+import talent_graph
+import jsonc_loader
+from typing import NamedTuple
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_STANDARD_MAX_LEVEL = 10
+"""Highest level supported by the rules as written; higher levels are allowed but get a warning."""
+
+_ABILITY_COLLECTIONS = ('abilities', 'sorceries', 'incantations', 'techniques')
+"""Collections whose objects are abilities."""
+
+_CHECKS = {}
+"""Dict mapping collection name to the list of check functions registered for it."""
+
+
+class SanityWarning(NamedTuple):
+    """A single sanity check warning."""
+    json_path: str
+    object_name: str
+    message: str
+
+    def __str__(self) -> str:
+        return f'{self.json_path}: "{self.object_name}": {self.message}'
+
+
+def sanity_check(collection: str):
+    """Decorator that registers a sanity check function for every object in collection.
+
+    Check functions must have the signature 'func_name(obj, context):' and return (or yield) a
+    message for each problem found, where context is the LibraryContext of the run.
+    """
+    def decorator(check):
+        _CHECKS.setdefault(collection, []).append(check)
+        return check
+    return decorator
+
+
+def _index_by_name(json_list: list) -> dict:
+    """Return a dict mapping the normalized name of each object in json_list to the object."""
+    return {talent_db.normalize_name(my_obj.get('name', '')): my_obj for my_obj in json_list if isinstance(my_obj, dict)}
+
+
+class LibraryContext:
+    """Every file in the library, loaded once, with the lookup tables shared by all sanity checks.
+
+    Attributes:
+        collections: Dict mapping collection name to (path, parsed list of objects).
+        talents: talent_db.TalentDB of the talents collection.
+        talent_graph: talent_graph.PrerequisiteGraph of the talents collection.
+        ancestries: Dict mapping normalized ancestry name to ancestry object.
+        ancestry_names: name_index.NameIndex of ancestry names.
+        abilities: Dict mapping normalized ability name to ability object, across every ability collection.
+        names: name_index.NameIndex of every talent and ability name, for suggestions.
+        statblock_outliers: Dict mapping statblock name to its statblocks.StatblockOutliers, all
+            scored in one vectorized pass.
+    """
+
+    def __init__(self, json_dir: str=None, load=None, object_filter=None):
+        """Load every JSON file under json_dir; defaults to library/json in this worktree.
+
+        Files that can't be parsed, or that aren't a list of objects, are skipped with a warning,
+        and so are objects that aren't dicts; json_validator.py is what reports them as errors.
+
+        Args:
+            json_dir: Dir of the library.
+            load: Function that parses a JSON file; defaults to jsonc_loader.load(). The --watch
+                modes pass library_watcher.FileCache.load() so unchanged files stay parsed in memory.
+            object_filter: Function 'object_filter(json_path, json_list) -> list' that returns the
+                objects of a file to keep, e.g. only those that pass its schema, so the lookup tables
+                and checks never see malformed objects. Defaults to keeping every dict.
+        """
+        load = load if load is not None else jsonc_loader.load
+        if json_dir is None:
+            json_dir = os.path.join(utilities.get_root_dir(), 'library', 'json')
+        self.collections = {}
+        for json_path in sorted(glob.glob(os.path.join(json_dir, '**', '*.json'), recursive=True)):
+            try:
+                json_list = load(json_path)
+            except (OSError, ValueError, jsonc_loader.JsoncError) as excpt:
+                LOGGER.warning('Skipping %s, it could not be parsed: %s', json_path, excpt)
+                continue
+            if not isinstance(json_list, list):
+                LOGGER.warning('Skipping %s, it is not a list of objects.', json_path)
+                continue
+            json_list = [my_obj for my_obj in json_list if isinstance(my_obj, dict)]
+            if object_filter is not None:
+                json_list = object_filter(json_path, json_list)
+            self.collections[os.path.splitext(os.path.basename(json_path))[0]] = (json_path, json_list)
+
+        self.talents = talent_db.TalentDB(self.objects('talents'))
+        self.talent_graph = talent_graph.PrerequisiteGraph(self.talents)
+        self._cycle_members = {talent_db.normalize_name(name) for cycle in self.talent_graph.cycles for name in cycle}
+        self.ancestries = _index_by_name(self.objects('ancestries'))
+        self.abilities = {}
+        for collection in _ABILITY_COLLECTIONS:
+            self.abilities.update(_index_by_name(self.objects(collection)))
+        self.ancestry_names = name_index.NameIndex(ancestry.get('name', '') for ancestry in self.ancestries.values())
+        self.names = name_index.NameIndex([talent.get('name', '') for talent in self.talents] +
+                                          [ability.get('name', '') for ability in self.abilities.values()])
+
+        self.statblock_outliers = {}
+        if 'statblocks' in self.collections:
+            statblocks_path, statblock_list = self.collections['statblocks']
+            import statblocks  # Pulls in numpy; only needed with a statblock library
+            library = statblocks.StatblockLibrary(statblock_list, statblocks.load_tables(statblocks_path, statblock_list))
+            for outlier in library.outliers():
+                self.statblock_outliers.setdefault(outlier.name, []).append(outlier)
+
+    def objects(self, collection: str) -> list:
+        """Return the objects in collection, or an empty list if there is no such file."""
+        return self.collections.get(collection, (None, []))[1]
+
+    def on_cycle(self, talent_name: str) -> bool:
+        """Return True if the talent called talent_name is part of a prerequisite cycle."""
+        return talent_db.normalize_name(talent_name) in self._cycle_members
+
+
+def run_checks(context: LibraryContext, json_paths: list=None) -> list:
+    """Run every registered check over every object in the library in one pass.
+
+    Args:
+        context: Loaded library.
+        json_paths: Optional list of paths; if given, only objects from those files are checked.
+
+    Returns:
+        List of SanityWarning.
+    """
+    if json_paths is not None:
+        json_paths = {os.path.abspath(json_path) for json_path in json_paths}
+    warnings = []
+    for collection, (json_path, json_list) in context.collections.items():
+        checks = _CHECKS.get(collection, [])
+        if not checks or (json_paths is not None and os.path.abspath(json_path) not in json_paths):
+            continue
+        LOGGER.debug('-- Sanity checking %d object(s) in %s', len(json_list), json_path)
+        for my_obj in json_list:
+            if not isinstance(my_obj, dict):
+                continue  # Leave malformed objects to the schema
+            for check in checks:
+                for message in check(my_obj, context) or []:
+                    warnings.append(SanityWarning(json_path, my_obj.get('name', ''), message))
+    return warnings
+
+
+def _did_you_mean(index: name_index.NameIndex, name: str) -> str:
+    """Return ' Did you mean "<closest name>"?' if index has a name close to name, else ''."""
+    suggestions = index.suggest(name, limit=1)
+    return f' Did you mean "{suggestions[0].name}"?' if suggestions else ''
+
+
+# ======== Sanity checks ========
+@sanity_check('talents')
+def _check_talent_level(talent: dict, context: LibraryContext) -> list:
+    """Talent level prerequisites should be in [1, _STANDARD_MAX_LEVEL]."""
+    level = talent_db.talent_level(talent)
+    if level < 1:
+        return [f'Level prerequisite is {level}; talents should be level 1 or higher.']
+    if level > _STANDARD_MAX_LEVEL:
+        return [f'Level prerequisite is {level}, above the standard maximum of {_STANDARD_MAX_LEVEL}.']
+    return []
+
+
+@sanity_check('talents')
+def _check_talent_ancestry(talent: dict, context: LibraryContext) -> list:
+    """Talent ancestry prerequisites should name an existing ancestry."""
+    ancestry = talent.get('prerequisites', {}).get('ancestry')
+    if ancestry is not None and talent_db.normalize_name(ancestry) not in context.ancestries:
+        return [f'Ancestry prerequisite "{ancestry}" is not a known ancestry.' + _did_you_mean(context.ancestry_names, ancestry)]
+    return []
+
+
+@sanity_check('talents')
+def _check_talent_references(talent: dict, context: LibraryContext) -> list:
+    """Talent names should be unique, other_talents should name existing talents, and there should be no cycles."""
+    messages = []
+    name = talent.get('name', '')
+    if context.talents.get(name) is not talent:
+        messages.append('Another talent has the same name.')
+    for reference in context.talent_graph.unresolved.get(name, []):
+        messages.append(f'Talent prerequisite "{reference}" is not a known talent.' + _did_you_mean(context.names, reference))
+    if context.on_cycle(name):
+        messages.append('Talent prerequisites form a cycle, so this talent can never be taken.')
+    return messages
+
+
+def _attribute_score(sheet: dict, attribute: str) -> int:
+    """Return a character's score for attribute; attributes may be plain scores or dicts with a 'score' key."""
+    value = sheet.get('attributes', {}).get(attribute, 0)
+    return value.get('score', 0) if isinstance(value, dict) else value
+
+
+@sanity_check('character_sheets')
+def _check_character_talents(sheet: dict, context: LibraryContext) -> list:
+    """Every talent on a character sheet should exist and have its prerequisites met."""
+    messages = []
+    level = sheet.get('level', 0)
+    if isinstance(level, dict):
+        level = level.get('level', 0)
+    ancestry = sheet.get('ancestry')
+    if isinstance(ancestry, dict):
+        ancestry = ancestry.get('name')
+
+    owned_names = [name for name in sheet.get('talents', []) if isinstance(name, str)]
+    known_names = [name for name in owned_names if name in context.talents]
+    owned_mask = context.talent_graph.mask_of(known_names)
+    for name in owned_names:
+        talent = context.talents.get(name)
+        if talent is None:
+            messages.append(f'Talent "{name}" is not a known talent.' + _did_you_mean(context.names, name))
+            continue
+        prerequisites = talent.get('prerequisites', {})
+        if talent_db.talent_level(talent) > level:
+            messages.append(f'Talent "{name}" requires level {talent_db.talent_level(talent)}.')
+        required_ancestry = prerequisites.get('ancestry')
+        if required_ancestry is not None and (ancestry is None or talent_db.normalize_name(ancestry) != talent_db.normalize_name(required_ancestry)):
+            messages.append(f'Talent "{name}" requires the {required_ancestry} ancestry.')
+        for attribute, threshold in prerequisites.get('attributes', {}).items():
+            if _attribute_score(sheet, attribute) < threshold:
+                messages.append(f'Talent "{name}" requires {attribute} {threshold}.')
+        missing = context.talent_graph.missing_prerequisites(name, owned_mask)
+        if missing:
+            messages.append(f'Talent "{name}" requires talent(s) {context.talent_graph.names(missing)}.')
+    return messages
+
+
+@sanity_check('statblocks')
+def _check_statblock_stats(statblock: dict, context: LibraryContext) -> list:
+    """HP, armor and damage should be close to those of other statblocks of the same level and role."""
+    return [outlier.message for outlier in context.statblock_outliers.get(statblock.get('name', ''), [])]
+# ======== End sanity checks ========
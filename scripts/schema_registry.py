@@ -0,0 +1,184 @@
+"""Registry of the schemas under <ROOT>/library/schemas/, so schemas can $ref each other across files.
+
+Every schema in a dir is parsed once into a single referencing.Registry, under its file name
+(and its $id, if it has one), so one schema can use another's definitions with a relative $ref
+such as "talent_schema.json#/$defs/attributes_def". Validators are compiled against that shared
+store and kept for the life of the process, so a schema that pulls in several others costs one
+parse of each file, not one per use.
+
+The registry of a dir is rebuilt, and its validators dropped, only once a schema file in it is
+added, removed or changed (by mtime and size), so long-running processes such as the watch
+modes always validate against the schemas on disk.
+"""
+
+import os
+import glob
+import hashlib
+import logging
+import urllib.parse
+import jsonschema
+import referencing
+import referencing.exceptions
+import referencing.jsonschema
+import jsonc_loader
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_REGISTRIES = {}
+"""Dict mapping absolute schema dir to its SchemaRegistry, see get_registry()."""
+
+
+class SchemaRegistryError(Exception):
+    """Exception class for schemas that are missing or have $refs that can't be resolved."""
+
+
+def _dir_signature(schema_dir: str) -> tuple:
+    """Return (file name, mtime, size) of every schema file in schema_dir; it changes whenever a schema does."""
+    signature = []
+    for schema_path in sorted(glob.glob(os.path.join(schema_dir, '*.json'))):
+        schema_stat = os.stat(schema_path)
+        signature.append((os.path.basename(schema_path), schema_stat.st_mtime_ns, schema_stat.st_size))
+    return tuple(signature)
+
+
+def _find_refs(node) -> list:
+    """Return every $ref value in node and its subschemas."""
+    refs = []
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get('$ref'), str):
+                refs.append(node['$ref'])
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return refs
+
+
+class SchemaRegistry:
+    """Every schema in a dir, parsed once, with the validators compiled from them.
+
+    Schemas are identified by file name, e.g. 'talent_schema.json'.
+    """
+
+    def __init__(self, schema_dir: str, signature: tuple=None):
+        """Parse and register every schema file in schema_dir.
+
+        Args:
+            schema_dir: Dir of the schema files.
+            signature: The _dir_signature() of schema_dir, if already known.
+        """
+        self.schema_dir = os.path.abspath(schema_dir)
+        self.signature = signature if signature is not None else _dir_signature(self.schema_dir)
+        self.schemas = {}  # File name to parsed schema
+        self.hashes = {}  # File name to SHA-1 of the file contents
+        self._validators = {}
+        uris = {}
+        resources = []
+        for schema_path in sorted(glob.glob(os.path.join(self.schema_dir, '*.json'))):
+            name = os.path.basename(schema_path)
+            with open(schema_path, 'rb') as schema_fp:
+                schema_bytes = schema_fp.read()
+            schema = jsonc_loader.loads(schema_bytes.decode('UTF-8'))
+            self.schemas[name] = schema
+            self.hashes[name] = hashlib.sha1(schema_bytes).hexdigest()
+            resource = referencing.Resource.from_contents(schema, default_specification=referencing.jsonschema.DRAFT202012)
+            for uri in {name, self._base_uri(name)}:
+                uris[uri] = name
+                resources.append((uri, resource))
+        self.registry = referencing.Registry().with_resources(resources)
+
+        # File names of the other schemas each schema refers to directly
+        self._references = {}
+        for name, schema in self.schemas.items():
+            targets = (urllib.parse.urljoin(self._base_uri(name), ref).split('#')[0] for ref in _find_refs(schema) if not ref.startswith('#'))
+            self._references[name] = {uris[target] for target in targets if target in uris} - {name}
+        LOGGER.debug('Loaded %d schema(s) from %s', len(self.schemas), self.schema_dir)
+
+    def _base_uri(self, name: str) -> str:
+        """Return the URI relative $refs in the schema name are resolved against: its $id, else its file name."""
+        schema = self.schemas[name]
+        return schema.get('$id', name) if isinstance(schema, dict) else name
+
+    def dependencies(self, name: str) -> set:
+        """Return the file names of name and every schema it refers to, directly or not."""
+        dependencies = set()
+        pending = [name]
+        while pending:
+            name = pending.pop()
+            if name not in dependencies:
+                dependencies.add(name)
+                pending.extend(self._references.get(name, ()))
+        return dependencies
+
+    def dependents(self, name: str) -> set:
+        """Return the file names of every schema that refers to name, directly or not, and name itself."""
+        return {other for other in self.schemas if name in self.dependencies(other)} | {name}
+
+    def schema_hash(self, name: str) -> str:
+        """Return a hash of name and every schema it depends on, so it changes if any of them does.
+
+        NOTE: For a schema without cross-file $refs this is the hash of its file, the same as utilities.hash_file().
+        """
+        dependencies = sorted(self.dependencies(name))
+        if dependencies == [name]:
+            return self.hashes[name]
+        return hashlib.sha1(''.join(self.hashes[dependency] for dependency in dependencies).encode('UTF-8')).hexdigest()
+
+    def validator(self, name: str) -> jsonschema.protocols.Validator:
+        """Return the compiled validator for the schema name, compiling it the first time.
+
+        The schema is checked against its metaschema, compiled with the validator class for its
+        declared draft and every $ref in it is resolved once, so a dangling $ref fails here rather
+        than part way through validating a file.
+
+        Raises:
+            SchemaRegistryError: Error if there is no schema name or one of its $refs can't be resolved.
+            jsonschema.exceptions.SchemaError: Error if the schema itself is not valid.
+        """
+        validator = self._validators.get(name)
+        if validator is None:
+            if name not in self.schemas:
+                raise SchemaRegistryError(f'There is no schema {name} in {self.schema_dir}!')
+            LOGGER.debug('-- Compiling validator for %s', name)
+            schema = self.schemas[name]
+            validator_cls = jsonschema.validators.validator_for(schema)
+            validator_cls.check_schema(schema)
+            validator = validator_cls(schema, registry=self.registry)
+            resolver = self.registry.resolver_with_root(referencing.Resource.from_contents(
+                schema, default_specification=referencing.jsonschema.DRAFT202012))
+            for ref in _find_refs(schema):
+                try:
+                    resolver.lookup(ref)
+                except referencing.exceptions.Unresolvable as excpt:
+                    raise SchemaRegistryError(f'Unable to resolve "{ref}" in {name}: {excpt}') from excpt
+            self._validators[name] = validator
+        return validator
+
+
+def get_registry(schema_dir: str) -> SchemaRegistry:
+    """Return the SchemaRegistry of schema_dir, building it again if any schema in it changed since the last call."""
+    schema_dir = os.path.abspath(schema_dir)
+    signature = _dir_signature(schema_dir)
+    registry = _REGISTRIES.get(schema_dir)
+    if registry is None or registry.signature != signature:
+        registry = SchemaRegistry(schema_dir, signature)
+        _REGISTRIES[schema_dir] = registry
+    return registry
+
+
+def get_validator(schema_path: str) -> jsonschema.protocols.Validator:
+    """Return the compiled validator for the schema at schema_path, with $refs resolved against the other schemas in its dir."""
+    return get_registry(os.path.dirname(os.path.abspath(schema_path))).validator(os.path.basename(schema_path))
+
+
+def schema_hash(schema_path: str) -> str:
+    """Return the hash of the schema at schema_path and every schema it depends on, see SchemaRegistry.schema_hash()."""
+    return get_registry(os.path.dirname(os.path.abspath(schema_path))).schema_hash(os.path.basename(schema_path))
+
+
+def clear() -> None:
+    """Forget every registry and validator, e.g. to time a cold start."""
+    _REGISTRIES.clear()
@@ -0,0 +1,224 @@
+"""SQLite export of the JSON library, built by database_compiler, with full-text search over descriptions.
+
+Tables:
+    objects             one row per object of every collection: collection, name, level, JSON body
+    object_search       FTS5 index over the name and markdown description of every object, by objects.id
+    talents             level and normalized ancestry prerequisite of every talent
+    talent_attributes   one row per attribute prerequisite of a talent
+    talent_prerequisites  one row per other_talents entry of a talent
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import talent_db
+import utilities
+from typing import NamedTuple
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_SCHEMA_VERSION = 1
+"""Version of the table layout, stored in PRAGMA user_version; readers refuse any other version."""
+
+_CREATE_TABLES = '''
+CREATE TABLE objects (
+    id INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    name TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE object_search USING fts5(name, description);
+CREATE TABLE talents (
+    id INTEGER PRIMARY KEY REFERENCES objects(id),
+    level INTEGER NOT NULL,
+    ancestry TEXT
+);
+CREATE TABLE talent_attributes (
+    talent_id INTEGER NOT NULL REFERENCES talents(id),
+    attribute TEXT NOT NULL,
+    threshold INTEGER NOT NULL
+);
+CREATE TABLE talent_prerequisites (
+    talent_id INTEGER NOT NULL REFERENCES talents(id),
+    prerequisite TEXT NOT NULL
+);
+'''
+"""Tables of the database, created before loading."""
+
+_CREATE_INDEXES = '''
+CREATE INDEX objects_by_collection_level ON objects(collection, level);
+CREATE INDEX objects_by_collection_name ON objects(collection, name COLLATE NOCASE);
+CREATE INDEX talents_by_level ON talents(level);
+CREATE INDEX talents_by_ancestry ON talents(ancestry);
+CREATE INDEX talent_attributes_by_attribute ON talent_attributes(attribute, threshold);
+CREATE INDEX talent_attributes_by_talent ON talent_attributes(talent_id);
+CREATE INDEX talent_prerequisites_by_talent ON talent_prerequisites(talent_id);
+'''
+"""Indexes of the database, created after loading since that is faster than updating them per row."""
+
+
+class SqliteDatabaseError(Exception):
+    """Exception class for missing or outdated databases."""
+
+
+class SearchResult(NamedTuple):
+    """A single search result."""
+    collection: str
+    name: str
+    level: int
+    snippet: str  # Matching part of the description, with matches in [brackets]; empty without a text query
+
+
+def database_path() -> str:
+    """Return the path to the database database_compiler generates in this worktree."""
+    return os.path.join(utilities.get_root_dir(), 'generated', 'library.sqlite')
+
+
+def _execute_script(connection: sqlite3.Connection, script: str) -> None:
+    """Run every statement in script inside the current transaction (executescript() would commit it)."""
+    for statement in script.split(';'):
+        if statement.strip():
+            connection.execute(statement)
+
+
+def write_database(collections: dict, db_path: str) -> None:
+    """Bulk-load collections into a new SQLite database at db_path, replacing it atomically.
+
+    Every row is inserted with executemany() inside a single transaction, and the indexes are
+    built once all rows are in.
+
+    Args:
+        collections: Dict mapping collection name (e.g. 'talents') to its list of objects.
+        db_path: Path of the database file.
+    """
+    objects = []
+    texts = []
+    talents = []
+    talent_attributes = []
+    talent_prerequisites = []
+    for collection in sorted(collections):
+        for my_obj in collections[collection]:
+            if not isinstance(my_obj, dict):
+                continue
+            row_id = len(objects) + 1
+            name = str(my_obj.get('name', ''))
+            objects.append((row_id, collection, name, talent_db.object_level(my_obj), json.dumps(my_obj, separators=(',', ':'))))
+            texts.append((row_id, name.replace('_', ' '), str(my_obj.get('description', ''))))
+            if collection == 'talents':
+                prerequisites = my_obj.get('prerequisites', {})
+                ancestry = prerequisites.get('ancestry')
+                talents.append((row_id, talent_db.talent_level(my_obj), talent_db.normalize_name(ancestry) if ancestry is not None else None))
+                talent_attributes.extend((row_id, attribute, threshold) for attribute, threshold in prerequisites.get('attributes', {}).items())
+                talent_prerequisites.extend((row_id, other_talent) for other_talent in prerequisites.get('other_talents', []))
+
+    tmp_path = f'{db_path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    # The file is only moved into place once complete, so there is nothing for a journal to protect
+    connection = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.execute('BEGIN')
+        _execute_script(connection, _CREATE_TABLES)
+        connection.executemany('INSERT INTO objects VALUES (?, ?, ?, ?, ?)', objects)
+        connection.executemany('INSERT INTO object_search(rowid, name, description) VALUES (?, ?, ?)', texts)
+        connection.executemany('INSERT INTO talents VALUES (?, ?, ?)', talents)
+        connection.executemany('INSERT INTO talent_attributes VALUES (?, ?, ?)', talent_attributes)
+        connection.executemany('INSERT INTO talent_prerequisites VALUES (?, ?)', talent_prerequisites)
+        _execute_script(connection, _CREATE_INDEXES)
+        connection.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        connection.execute('COMMIT')
+    finally:
+        connection.close()
+    os.replace(tmp_path, db_path)
+    LOGGER.debug('-- Loaded %d object(s) into %s', len(objects), db_path)
+
+
+def connect(db_path: str=None) -> sqlite3.Connection:
+    """Open a database read-only; defaults to the database in this worktree.
+
+    Raises:
+        SqliteDatabaseError: Error if the database doesn't exist or has another table layout.
+    """
+    db_path = db_path if db_path is not None else database_path()
+    if not os.path.isfile(db_path):
+        raise SqliteDatabaseError(f'{db_path} does not exist; run database_compiler.py to build it!')
+    connection = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+    if version != _SCHEMA_VERSION:
+        connection.close()
+        raise SqliteDatabaseError(f'{db_path} has version {version}, not {_SCHEMA_VERSION}; run database_compiler.py to rebuild it!')
+    return connection
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word, so markdown like '**2**' needs no escaping."""
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+def search(connection: sqlite3.Connection, text: str=None, collection: str=None, level: int=None, max_level: int=None,
+           ancestry: str=None, requires: tuple=(), eligible: dict=None, limit: int=50) -> list:
+    """Search the library; every filter that is given must match.
+
+    Args:
+        connection: Connection from connect().
+        text: Free text that must appear in the name or description; results are ranked by relevance.
+        collection: Only return objects of this collection.
+        level: Only return objects of exactly this level.
+        max_level: Only return objects of this level or lower.
+        ancestry: Only return talents that require this ancestry.
+        requires: Only return talents with a prerequisite on each of these attributes.
+        eligible: Dict mapping attribute to score; only return talents whose attribute
+            prerequisites are all met by it (missing attributes count as 0).
+        limit: Maximum number of results.
+
+    Returns:
+        List of SearchResult.
+    """
+    columns = ['objects.collection', 'objects.name', 'objects.level']
+    tables = ['objects']
+    conditions = []
+    params = []
+    order = 'objects.collection, objects.level, objects.name'
+    if text:
+        columns.append("snippet(object_search, 1, '[', ']', '...', 12)")
+        tables.append('JOIN object_search ON object_search.rowid = objects.id')
+        conditions.append('object_search MATCH ?')
+        params.append(fts_query(text))
+        order = 'object_search.rank'
+    else:
+        columns.append("''")
+    if collection is not None:
+        conditions.append('objects.collection = ?')
+        params.append(collection)
+    if level is not None:
+        conditions.append('objects.level = ?')
+        params.append(level)
+    if max_level is not None:
+        conditions.append('objects.level <= ?')
+        params.append(max_level)
+    if ancestry is not None or requires or eligible is not None:
+        tables.append('JOIN talents ON talents.id = objects.id')
+    if ancestry is not None:
+        conditions.append('talents.ancestry = ?')
+        params.append(talent_db.normalize_name(ancestry))
+    for attribute in requires:
+        conditions.append('EXISTS (SELECT 1 FROM talent_attributes WHERE talent_id = talents.id AND attribute = ?)')
+        params.append(attribute)
+    if eligible is not None:
+        unmet = ' OR '.join(['(attribute = ? AND threshold > ?)' for _ in talent_db.ATTRIBUTES])
+        conditions.append(f'NOT EXISTS (SELECT 1 FROM talent_attributes WHERE talent_id = talents.id AND ({unmet}))')
+        for attribute in talent_db.ATTRIBUTES:
+            params += [attribute, eligible.get(attribute, 0)]
+
+    sql = f"SELECT {', '.join(columns)} FROM {' '.join(tables)}"
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += f' ORDER BY {order} LIMIT ?'
+    params.append(limit)
+    LOGGER.debug('-- %s %s', sql, params)
+    return [SearchResult(*row) for row in connection.execute(sql, params)]
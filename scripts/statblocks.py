@@ -0,0 +1,320 @@
+"""Script to suggest fixes for NPC statblocks whose HP, armor or damage is unusual for their level and role.
+
+Expected values come from the statblock library itself: the mean and spread of every stat for
+each (level, role) group. Each statblock is compared against the rest of its group (leaving
+itself out, so one extreme statblock can't hide itself by skewing the group), falling back to
+the rest of its level when the group is too small to go by. Statblocks with too few peers at
+their level aren't scored at all, since other levels say nothing about what to expect.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import logging
+import argparse
+import numpy
+import talent_db
+import utilities
+import jsonc_loader
+from typing import NamedTuple
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_ROOT = utilities.get_root_dir()
+"""Root dir of the worktree."""
+
+STATS = ('hp', 'armor', 'damage')
+"""Stats that are compared against the library, in column order."""
+
+_OUTLIER_Z = 2.0
+"""Default number of standard deviations from the expected value that makes a stat an outlier."""
+
+_MIN_GROUP_SIZE = 3
+"""Smallest number of other statblocks with a stat that a group or level needs for its mean and spread to be used."""
+
+_MIN_RELATIVE_SPREAD = 0.1
+"""Spreads are at least this fraction of the expected value, so near-identical groups don't flag tiny differences."""
+
+_CACHE_SUBDIR = 'statblocks'
+"""Name of the dir inside the worktree cache dir where tables are cached."""
+
+_TABLES_VERSION = 1
+"""Version of the cached tables; cached tables with any other version are recomputed."""
+
+
+class StatblockOutlier(NamedTuple):
+    """A stat of a statblock that is outside the expected range for its level and role."""
+    name: str
+    stat: str
+    value: float
+    expected: float
+    z_score: float
+
+    @property
+    def message(self) -> str:
+        """Suggestion for the stat, without the statblock name."""
+        direction = 'high' if self.z_score > 0 else 'low'
+        return f'{self.stat} {self.value:g} is {direction} ({self.z_score:+.1f} sd); expected about {self.expected:.0f}.'
+
+    def __str__(self) -> str:
+        return f'"{self.name}": {self.message}'
+
+
+def statblocks_path() -> str:
+    """Return the path to statblocks.json in this worktree."""
+    return os.path.join(_ROOT, 'library', 'json', 'statblocks.json')
+
+
+def _is_number(value) -> bool:
+    """Return True if value is an int or float (bools aren't numbers here)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _well_typed(statblocks: list) -> list:
+    """Return the statblocks whose stats, level and role have the types the columns need.
+
+    Malformed statblocks are left to the schema; each one left out is logged as a warning.
+    """
+    kept = []
+    for statblock in statblocks:
+        block_stats = statblock.get('stats', {}) if isinstance(statblock, dict) else None
+        if isinstance(block_stats, dict) and isinstance(block_stats.get('level', 0), int) \
+                and not isinstance(block_stats.get('level', 0), bool) and isinstance(block_stats.get('role', ''), str):
+            kept.append(statblock)
+        else:
+            name = statblock.get('name') if isinstance(statblock, dict) else None
+            LOGGER.warning('Skipping statblock %s, its stats, level or role has the wrong type.', name)
+    return kept
+
+
+def _columns(statblocks: list) -> tuple:
+    """Return (levels, roles, stats) arrays for well-typed statblocks (see _well_typed()); missing stats are NaN.
+
+    A stat that isn't a number is treated as missing and logged as a warning.
+    """
+    stats = numpy.full((len(statblocks), len(STATS)), numpy.nan)
+    levels = numpy.zeros(len(statblocks), dtype=numpy.int64)
+    roles = []
+    for row, statblock in enumerate(statblocks):
+        block_stats = statblock.get('stats', {})
+        levels[row] = block_stats.get('level', 0)
+        roles.append(talent_db.normalize_name(block_stats.get('role', '')))
+        for column, stat in enumerate(STATS):
+            if stat not in block_stats:
+                continue
+            if _is_number(block_stats[stat]):
+                stats[row, column] = block_stats[stat]
+            else:
+                LOGGER.warning('Ignoring %s of statblock %s, %r is not a number.', stat, statblock.get('name'), block_stats[stat])
+    return levels, numpy.array(roles, dtype=str), stats
+
+
+def compute_tables(statblocks: list) -> dict:
+    """Compute the per-group count, sum and sum of squares of every stat.
+
+    Args:
+        statblocks: List of statblock dicts; malformed ones are left out, see _well_typed().
+
+    Returns:
+        Dict of arrays: 'levels' and 'roles' (sorted unique values), then 'count', 'sum' and
+        'squares' per (level, role) group, with the group of level index i and role index j at
+        row i * len(roles) + j, and one column per stat in STATS.
+    """
+    levels, roles, stats = _columns(_well_typed(statblocks))
+    unique_levels, level_index = numpy.unique(levels, return_inverse=True)
+    unique_roles, role_index = numpy.unique(roles, return_inverse=True)
+    groups = level_index * len(unique_roles) + role_index
+    group_count = len(unique_levels) * len(unique_roles)
+
+    present = ~numpy.isnan(stats)
+    values = numpy.where(present, stats, 0.0)
+    tables = {
+        'levels': unique_levels,
+        'roles': unique_roles,
+        'count': numpy.zeros((group_count, len(STATS))),
+        'sum': numpy.zeros((group_count, len(STATS))),
+        'squares': numpy.zeros((group_count, len(STATS)))
+    }
+    for column in range(len(STATS)):
+        tables['count'][:, column] = numpy.bincount(groups, weights=present[:, column], minlength=group_count)
+        tables['sum'][:, column] = numpy.bincount(groups, weights=values[:, column], minlength=group_count)
+        tables['squares'][:, column] = numpy.bincount(groups, weights=values[:, column] ** 2, minlength=group_count)
+    return tables
+
+
+def _cache_path(json_path: str) -> str:
+    """Return the path of the cached tables for json_path."""
+    path_hash = hashlib.sha1(os.path.abspath(json_path).encode('UTF-8')).hexdigest()
+    return os.path.join(utilities.get_cache_dir(), _CACHE_SUBDIR, path_hash + '.npz')
+
+
+def load_tables(json_path: str, statblocks: list) -> dict:
+    """Return the tables for the library at json_path, recomputing them only if the file changed.
+
+    Args:
+        json_path: Path to the statblock library.
+        statblocks: Parsed contents of json_path.
+
+    Returns:
+        Tables, see compute_tables().
+    """
+    library_hash = utilities.hash_file(json_path)
+    cache_path = _cache_path(json_path)
+    try:
+        with numpy.load(cache_path) as cached:
+            if int(cached['version']) == _TABLES_VERSION and str(cached['library_hash']) == library_hash:
+                LOGGER.debug('-- Loaded statblock tables for %s from cache', json_path)
+                return {key: cached[key] for key in ('levels', 'roles', 'count', 'sum', 'squares')}
+    except (OSError, KeyError, ValueError):
+        pass  # Missing, stale or corrupt cache file
+
+    LOGGER.debug('-- Computing statblock tables for %s', json_path)
+    tables = compute_tables(statblocks)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp.npz'
+    numpy.savez(tmp_path, version=_TABLES_VERSION, library_hash=library_hash, **tables)
+    os.replace(tmp_path, cache_path)
+    return tables
+
+
+class StatblockLibrary:
+    """Every statblock in a library, in columns, with the expected-value tables of the library.
+
+    Attributes:
+        statblocks: List of statblock dicts, without the malformed ones (see _well_typed()).
+        names: Statblock names, in row order.
+        stats: Float array of shape (statblocks, len(STATS)); NaN where a stat is missing.
+        tables: Tables, see compute_tables().
+    """
+
+    def __init__(self, statblocks: list, tables: dict=None):
+        """Arrange statblocks in columns.
+
+        Args:
+            statblocks: List of statblock dicts.
+            tables: Tables to score against, see compute_tables(); computed from statblocks if None.
+        """
+        self.statblocks = _well_typed(statblocks)
+        self.names = [statblock.get('name', '') for statblock in self.statblocks]
+        levels, roles, self.stats = _columns(self.statblocks)
+        self.tables = tables if tables is not None else compute_tables(self.statblocks)
+
+        # Group rows of each statblock; tables are sorted, so searchsorted finds every index at once
+        level_index = numpy.searchsorted(self.tables['levels'], levels)
+        role_index = numpy.searchsorted(self.tables['roles'], roles)
+        self._groups = level_index * len(self.tables['roles']) + role_index
+
+    @classmethod
+    def from_file(cls, json_path: str=None) -> 'StatblockLibrary':
+        """Load a library from a statblocks JSON file, using cached tables if the file is unchanged."""
+        json_path = json_path if json_path is not None else statblocks_path()
+        statblocks = jsonc_loader.load(json_path)
+        return cls(statblocks, load_tables(json_path, statblocks))
+
+    def _level_totals(self, key: str) -> numpy.ndarray:
+        """Return the tables[key] totals per level, one row per statblock."""
+        per_level = self.tables[key].reshape(len(self.tables['levels']), len(self.tables['roles']), len(STATS)).sum(axis=1)
+        return per_level[self._groups // len(self.tables['roles'])]
+
+    def expected(self) -> tuple:
+        """Return the expected value and spread of every stat of every statblock.
+
+        Each statblock is left out of its own totals. The (level, role) group is used if it
+        has at least _MIN_GROUP_SIZE other statblocks with the stat, else the level if it does.
+
+        Returns:
+            (means, spreads): Float arrays shaped like self.stats; NaN where there are too few peers.
+        """
+        present = ~numpy.isnan(self.stats)
+        own_value = numpy.where(present, self.stats, 0.0)
+        tiers = [
+            {key: self.tables[key][self._groups] for key in ('count', 'sum', 'squares')},
+            {key: self._level_totals(key) for key in ('count', 'sum', 'squares')}
+        ]
+
+        means = numpy.full(self.stats.shape, numpy.nan)
+        spreads = numpy.full(self.stats.shape, numpy.nan)
+        chosen = numpy.zeros(self.stats.shape, dtype=bool)
+        for tier in tiers:
+            count = tier['count'] - present
+            use = ~chosen & (count >= _MIN_GROUP_SIZE)
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                mean = (tier['sum'] - own_value) / count
+                variance = (tier['squares'] - own_value ** 2) / count - mean ** 2
+            means[use] = mean[use]
+            spreads[use] = numpy.sqrt(numpy.maximum(variance, 0.0))[use]
+            chosen |= use
+        spreads = numpy.maximum(spreads, numpy.maximum(_MIN_RELATIVE_SPREAD * numpy.abs(means), 1.0))
+        return means, spreads
+
+    def z_scores(self) -> numpy.ndarray:
+        """Return how many spreads each stat is from its expected value; NaN where it can't be scored."""
+        means, spreads = self.expected()
+        return (self.stats - means) / spreads
+
+    def outliers(self, threshold: float=_OUTLIER_Z) -> list:
+        """Return a StatblockOutlier for every stat more than threshold spreads from its expected value."""
+        means, spreads = self.expected()
+        z_scores = (self.stats - means) / spreads
+        with numpy.errstate(invalid='ignore'):
+            rows, columns = numpy.nonzero(numpy.abs(z_scores) > threshold)
+        return [StatblockOutlier(self.names[row], STATS[column], float(self.stats[row, column]),
+                                 float(means[row, column]), float(z_scores[row, column]))
+                for row, column in zip(rows, columns)]
+
+
+def _process_args(argv: list) -> argparse.Namespace:
+    """Parse and process arguments; convert to argparse.Namespace object.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        args: Parsed args with args as properties on the object.
+    """
+    parser = argparse.ArgumentParser(os.path.basename(__file__), description='Suggest fixes for NPC statblocks with unusual HP, armor or damage.')
+    parser.add_argument(
+        '-i',
+        '--input_file',
+        help='Statblocks JSON file to check (default=statblocks.json in the library).',
+        dest='json_path',
+        default=statblocks_path()
+    )
+    parser.add_argument(
+        '-z',
+        '--z_score',
+        help=f'Number of standard deviations from the expected value that counts as unusual (default={_OUTLIER_Z}).',
+        dest='threshold',
+        type=float,
+        default=_OUTLIER_Z
+    )
+    args = utilities.parser_setup(parser, argv, LOGGER)
+    if not os.path.isfile(args.json_path):
+        raise FileNotFoundError(f'Input file {args.json_path} does not exist!')
+    return args
+
+
+def main(argv: list) -> list:
+    """Process args and print a suggestion for every unusual stat.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        List of StatblockOutlier.
+    """
+    args = _process_args(argv)
+    start = time.perf_counter()
+    library = StatblockLibrary.from_file(args.json_path)
+    outliers = library.outliers(args.threshold)
+    seconds = time.perf_counter() - start
+    for outlier in outliers:
+        print(outlier)
+    print(f'Checked {len(library.names)} statblock(s) in {seconds * 1000:.1f} ms; {len(outliers)} suggestion(s).')
+    return outliers
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,459 @@
+"""Script to generate synthetic library files of any size from the schemas under <ROOT>/library/schemas/.
+
+Objects are built by walking a schema: every required property is filled in, optional ones are
+included at random, and $refs (including ones into other schemas in the same dir, see
+schema_registry), minimums, minItems, minProperties and uniqueItems are respected,
+so every object is valid against the schema it came from. Collections with a known schema get
+realistic values on top of that:
+    talents     levels skewed towards low levels, a few ancestry prerequisites, and other_talents
+                graphs that only point at lower-or-equal-level talents generated earlier (so the
+                graph is acyclic), with popular talents attracting more dependents
+    statblocks  HP, armor and damage that scale with level and vary by role, with a few outliers
+
+Files are written as JSONC, with line and block comments between objects and the odd '//' inside
+a string, and objects are streamed to disk, so collections of a million objects don't have to fit
+in memory.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+import logging
+import argparse
+import referencing
+import referencing.exceptions
+import referencing.jsonschema
+import utilities
+import schema_registry
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_ROOT = utilities.get_root_dir()
+"""Root dir of the worktree."""
+
+_SCHEMA_DIR = os.path.join(_ROOT, 'library', 'schemas')
+"""Path to schema directory in the worktree."""
+
+_SCHEMA_SUFFIX = '_schema.json'
+"""Suffix of every schema file name under _SCHEMA_DIR."""
+
+_OPTIONAL_CHANCE = 0.5
+"""Chance that an optional property without a collection-specific chance is included."""
+
+_MAX_EXTRA_ITEMS = 2
+"""Most items an array gets beyond its minItems, if it has no maxItems."""
+
+_WORDS = ('iron', 'swift', 'stone', 'shadow', 'ember', 'frost', 'storm', 'hollow', 'silver', 'wild', 'grim',
+          'bright', 'deep', 'blood', 'rune', 'oath', 'ward', 'strike', 'stance', 'step', 'sight', 'grip',
+          'guard', 'fury', 'veil', 'song', 'mark', 'path', 'blade', 'shield', 'arrow', 'hand')
+"""Words that names and descriptions are made of."""
+
+_NUMERALS = ('I', 'II', 'III', 'IV', 'V')
+"""Rank suffixes of talent names."""
+
+_ANCESTRIES = ('Human', 'Dwarf', 'Elf', 'Orc', 'Halfling', 'Gnome')
+"""Ancestries that talents may require."""
+
+_ROLES = {'brute': 1.5, 'skirmisher': 0.8, 'controller': 1.0, 'artillery': 0.9, 'minion': 0.3}
+"""Statblock roles and their HP and damage multipliers."""
+
+
+class SyntheticDataError(Exception):
+    """Exception class for schemas that can't be generated from."""
+
+
+def collection_name(schema_path: str) -> str:
+    """Return the name of the collection a schema describes, e.g. talent_schema.json -> talents."""
+    stem = os.path.basename(schema_path)
+    stem = stem[:-len(_SCHEMA_SUFFIX)] if stem.endswith(_SCHEMA_SUFFIX) else os.path.splitext(stem)[0]
+    return stem if stem.endswith('s') else stem + 's'
+
+
+class ObjectGenerator:
+    """Generates objects that are valid against a schema.
+
+    Subclasses make values realistic for a collection: field() can return a value for any
+    property path, and OPTIONAL_CHANCES sets how often each optional property is included.
+    """
+
+    OPTIONAL_CHANCES = {}
+    """Dict mapping property path (tuple of property names) to the chance the property is included, if optional."""
+
+    def __init__(self, schema: dict, seed: int=0, registry: referencing.Registry=None):
+        """Prepare to generate objects.
+
+        Args:
+            schema: Parsed schema.
+            seed: Seed for the random generator, so the same seed gives the same objects.
+            registry: Registry of the schemas that $refs in schema may point into, e.g.
+                schema_registry.SchemaRegistry.registry; defaults to one with none, so only
+                local '#/...' $refs resolve.
+        """
+        self.schema = schema
+        self.rng = random.Random(seed)
+        self.index = 0
+        registry = registry if registry is not None else referencing.Registry()
+        self._resolver = registry.resolver_with_root(referencing.Resource.from_contents(
+            schema, default_specification=referencing.jsonschema.DRAFT202012))
+
+    def generate(self, count: int):
+        """Yield count new objects, continuing the numbering of earlier calls."""
+        for _ in range(count):
+            self.begin()
+            yield self.value(self.schema, ())
+            self.index += 1
+
+    def begin(self) -> None:
+        """Choose the per-object state that field() draws on; called before each object."""
+
+    def field(self, path: tuple, node: dict):
+        """Return a realistic value for the property at path, NotImplemented to generate one from node, or OMIT to leave it out."""
+        return NotImplemented
+
+    def _resolve(self, node: dict) -> dict:
+        """Follow $refs until node is a plain schema, moving self._resolver into the schema each one lands in."""
+        while '$ref' in node:
+            try:
+                resolved = self._resolver.lookup(node['$ref'])
+            except referencing.exceptions.Unresolvable as excpt:
+                raise SyntheticDataError(f'Unable to resolve "{node["$ref"]}": {excpt}') from excpt
+            node = resolved.contents
+            self._resolver = resolved.resolver
+        return node
+
+    def value(self, node: dict, path: tuple):
+        """Return a value valid against node, for the property at path."""
+        resolver = self._resolver
+        try:
+            return self._value(self._resolve(node), path)
+        finally:
+            self._resolver = resolver  # Relative $refs after this one resolve against the schema they are in
+
+    def _value(self, node: dict, path: tuple):
+        value = self.field(path, node)
+        if value is not NotImplemented:
+            return value
+        if 'const' in node:
+            return node['const']
+        if 'enum' in node:
+            return self.rng.choice(node['enum'])
+        value_type = node.get('type', 'object')
+        if isinstance(value_type, list):
+            value_type = next((option for option in value_type if option != 'null'), 'null')
+        if value_type == 'object':
+            return self._object(node, path)
+        if value_type == 'array':
+            return self._array(node, path)
+        if value_type == 'string':
+            return self._string(node, path)
+        if value_type in ('integer', 'number'):
+            return self._number(node, value_type == 'integer')
+        if value_type == 'boolean':
+            return self.rng.random() < 0.5
+        if value_type == 'null':
+            return None
+        raise SyntheticDataError(f'Unsupported type "{value_type}" at {"/".join(path) or "the root"}!')
+
+    def _object(self, node: dict, path: tuple) -> dict:
+        properties = node.get('properties', {})
+        required = set(node.get('required', ()))
+        keys = [key for key in properties
+                if key in required or self.rng.random() < self.OPTIONAL_CHANCES.get(path + (key,), _OPTIONAL_CHANCE)]
+        missing = [key for key in properties if key not in keys]
+        while len(keys) < node.get('minProperties', 0) and missing:
+            keys.append(missing.pop(self.rng.randrange(len(missing))))
+        my_obj = {}
+        for key in keys:
+            value = self.value(properties[key], path + (key,))
+            if value is not OMIT or key in required:
+                my_obj[key] = value
+        return my_obj
+
+    def _array(self, node: dict, path: tuple) -> list:
+        min_items = node.get('minItems', 0)
+        length = self.rng.randint(min_items, node.get('maxItems', min_items + _MAX_EXTRA_ITEMS))
+        items = node.get('items', {})
+        values = []
+        seen = set()
+        for attempt in range(length * 4):
+            if len(values) == length:
+                break
+            item = self.value(items, path + (str(attempt),))
+            key = json.dumps(item, sort_keys=True)
+            if node.get('uniqueItems') and key in seen:
+                continue
+            seen.add(key)
+            values.append(item)
+        if len(values) < min_items:
+            raise SyntheticDataError(f'Unable to generate {min_items} unique items at {"/".join(path)}!')
+        return values
+
+    def _string(self, node: dict, path: tuple) -> str:
+        key = next((part for part in reversed(path) if not part.isdigit()), '')
+        if key == 'name':
+            text = '_'.join(word.capitalize() for word in self.rng.sample(_WORDS, 2)) + f'_{self.index}'
+        elif key == 'description':
+            text = self.description()
+        else:
+            text = self.rng.choice(_WORDS)
+        min_length = node.get('minLength', 0)
+        if len(text) < min_length:
+            text += 'x' * (min_length - len(text))
+        return text[:node['maxLength']] if 'maxLength' in node else text
+
+    def _number(self, node: dict, integer: bool):
+        low = node.get('minimum', node['exclusiveMinimum'] + 1 if 'exclusiveMinimum' in node else 0)
+        high = node.get('maximum', node['exclusiveMaximum'] - 1 if 'exclusiveMaximum' in node else low + 10)
+        return self.rng.randint(low, high) if integer else round(self.rng.uniform(low, high), 1)
+
+    def description(self) -> str:
+        """Return a markdown description of one to four sentences, sometimes with a URL in it."""
+        sentences = []
+        for _ in range(self.rng.randint(1, 4)):
+            words = self.rng.sample(_WORDS, 5)
+            sentences.append(f'{words[0].capitalize()} {words[1]} {words[2]} for **{self.rng.randint(1, 12)}** {words[3]} {words[4]}.')
+        if self.rng.random() < 0.05:
+            sentences.append('See https://example.com/rules // errata.')
+        return ' '.join(sentences)
+
+
+class TalentGenerator(ObjectGenerator):
+    """Generates talents with realistic levels and acyclic other_talents graphs."""
+
+    OPTIONAL_CHANCES = {
+        ('prerequisites', 'attributes'): 0.5,
+        ('prerequisites', 'ancestry'): 0.1,
+        ('prerequisites', 'other_talents'): 0.35
+    }
+
+    _LEVEL_WEIGHTS = tuple(11 - level for level in range(1, 11))
+    """Relative number of talents at each of levels 1 to 10; low-level talents are the most common."""
+
+    def __init__(self, schema: dict, seed: int=0, registry: referencing.Registry=None):
+        super().__init__(schema, seed, registry)
+        self._level = 1
+        self._name = ''
+        # Names of the talents generated so far, by level; a talent appears once more every time
+        # another talent requires it, so popular talents attract more dependents
+        self._by_level = {}
+
+    def begin(self) -> None:
+        self._level = self.rng.choices(range(1, 11), weights=self._LEVEL_WEIGHTS)[0]
+        words = self.rng.sample(_WORDS, 2)
+        rank = _NUMERALS[min(self._level - 1, len(_NUMERALS) - 1) if self.rng.random() < 0.3 else 0]
+        self._name = f'{words[0].capitalize()}_{words[1].capitalize()}_{rank}_{self.index}'
+
+    def field(self, path: tuple, node: dict):
+        if path == ('name',):
+            return self._name
+        if path == ('prerequisites', 'level'):
+            return self._level
+        if path == ('prerequisites', 'ancestry'):
+            return self.rng.choice(_ANCESTRIES)
+        if path == ('prerequisites', 'other_talents'):
+            return self._other_talents(node.get('minItems', 1))
+        return NotImplemented
+
+    def generate(self, count: int):
+        for talent in super().generate(count):
+            self._by_level.setdefault(self._level, []).append(self._name)
+            yield talent
+
+    def _other_talents(self, min_items: int):
+        """Return one to three earlier talents of this level or lower, or OMIT if there aren't enough."""
+        levels = [level for level in self._by_level if level <= self._level]
+        picks = {}
+        for _ in range(self.rng.choice((1, 1, 1, 2, 2, 3)) if levels else 0):
+            level = self.rng.choice(levels)
+            pool = self._by_level[level]
+            picks[pool[self.rng.randrange(len(pool))]] = level
+        if len(picks) < max(min_items, 1):
+            return OMIT
+        for name, level in picks.items():
+            self._by_level[level].append(name)  # Required talents become more likely to be required again
+        return sorted(picks)
+
+
+class StatblockGenerator(ObjectGenerator):
+    """Generates statblocks whose HP, armor and damage scale with level and role, with about 1 in 50 given an extreme HP."""
+
+    OPTIONAL_CHANCES = {
+        ('stats', 'damage'): 0.9,
+        ('stats', 'size'): 0.3,
+        ('stats', 'xp'): 0.3,
+        ('stats', 'speed'): 0.3,
+        ('stats', 'senses'): 0.2,
+        ('stats', 'languages'): 0.2,
+        ('attributes',): 0.7,
+        ('traits',): 0.3,
+        ('major_actions',): 0.5,
+        ('minor_actions',): 0.2,
+        ('reactions',): 0.1,
+        ('items',): 0.1
+    }
+
+    def __init__(self, schema: dict, seed: int=0, registry: referencing.Registry=None):
+        super().__init__(schema, seed, registry)
+        self._level = 0
+        self._role = ''
+
+    def begin(self) -> None:
+        self._level = self.rng.randint(0, 10)
+        self._role = self.rng.choice(list(_ROLES))
+
+    def field(self, path: tuple, node: dict):
+        scale = (self._level + 1) * _ROLES[self._role]
+        if path == ('stats', 'level'):
+            return self._level
+        if path == ('stats', 'role'):
+            return self._role
+        if path == ('stats', 'hp'):
+            hp = max(1, round(self.rng.gauss(10 * scale, 3 * (self._level + 1))))
+            return hp * 4 if self.rng.random() < 0.02 else hp
+        if path == ('stats', 'armor'):
+            return max(0, round(self.rng.gauss(2 + self._level / 2, 1)))
+        if path == ('stats', 'damage'):
+            return max(0.0, round(self.rng.gauss(3 * scale, self._level + 1), 1))
+        return NotImplemented
+
+
+OMIT = object()
+"""Returned by ObjectGenerator.field() to leave an optional property out of the object."""
+
+_GENERATORS = {'talents': TalentGenerator, 'statblocks': StatblockGenerator}
+"""Dict mapping collection name to its ObjectGenerator subclass; other collections use ObjectGenerator."""
+
+
+def create_generator(schema_path: str, seed: int=0) -> ObjectGenerator:
+    """Return the generator for the collection the schema at schema_path describes, with $refs resolved against the other schemas in its dir."""
+    registry = schema_registry.get_registry(os.path.dirname(os.path.abspath(schema_path)))
+    schema_name = os.path.basename(schema_path)
+    if schema_name not in registry.schemas:
+        raise SyntheticDataError(f'There is no schema {schema_name} in {registry.schema_dir}!')
+    return _GENERATORS.get(collection_name(schema_path), ObjectGenerator)(registry.schemas[schema_name], seed, registry.registry)
+
+
+def write_collection(json_path: str, objects, seed: int=0) -> int:
+    """Stream objects to json_path as a JSONC array, with comments between them.
+
+    Args:
+        json_path: Path of the file to write; replaced atomically.
+        objects: Iterable of objects.
+        seed: Seed for where comments go.
+
+    Returns:
+        Number of objects written.
+    """
+    rng = random.Random(seed)
+    tmp_path = f'{json_path}.{os.getpid()}.tmp'
+    count = 0
+    with open(tmp_path, 'w', encoding='UTF-8', buffering=1 << 16) as json_fp:
+        json_fp.write(f'// Synthetic data generated by {os.path.basename(__file__)}\n[\n')
+        for my_obj in objects:
+            if count:
+                json_fp.write(',\n')
+            roll = rng.random()
+            if roll < 0.1:
+                json_fp.write(f'    /* Object {count},\n       generated */\n')
+            elif roll < 0.4:
+                json_fp.write(f'    // Object {count}\n')
+            json_fp.write('    ')
+            json_fp.write(json.dumps(my_obj))
+            count += 1
+        json_fp.write('\n]\n')
+    os.replace(tmp_path, json_path)
+    return count
+
+
+def generate_objects(schema_path: str, count: int, seed: int=0) -> list:
+    """Return a list of count synthetic objects for the schema at schema_path."""
+    return list(create_generator(schema_path, seed).generate(count))
+
+
+def generate_file(schema_path: str, json_path: str, count: int, seed: int=0) -> int:
+    """Write count synthetic objects for the schema at schema_path to json_path and return count."""
+    return write_collection(json_path, create_generator(schema_path, seed).generate(count), seed)
+
+
+def _process_args(argv: list) -> argparse.Namespace:
+    """Parse and process arguments; convert to argparse.Namespace object.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        args: Parsed args with args as properties on the object.
+    """
+    parser = argparse.ArgumentParser(os.path.basename(__file__),
+                                     description='Generate synthetic library files that are valid against the library schemas.')
+    parser.add_argument(
+        '-n',
+        '--count',
+        help='Number of objects to generate per collection (default=10000).',
+        dest='count',
+        type=int,
+        default=10000
+    )
+    parser.add_argument(
+        '-s',
+        '--schema_file',
+        help=f'Schema to generate a collection for. May be given more than once (default=every schema under {_SCHEMA_DIR}).',
+        dest='schema_paths',
+        action='append',
+        default=None
+    )
+    parser.add_argument(
+        '-o',
+        '--output_dir',
+        help='Directory to write <collection>.json files to (default=synthetic/ in the worktree cache dir).',
+        dest='output_dir',
+        default=None
+    )
+    parser.add_argument(
+        '--seed',
+        help='Seed for the random generator (default=0).',
+        dest='seed',
+        type=int,
+        default=0
+    )
+    args = utilities.parser_setup(parser, argv, LOGGER)
+
+    if args.count < 0:
+        raise SyntheticDataError(f'Count must not be negative, got {args.count}!')
+    if args.schema_paths is None:
+        args.schema_paths = sorted(glob.glob(os.path.join(_SCHEMA_DIR, '*' + _SCHEMA_SUFFIX)))
+    for schema_path in args.schema_paths:
+        if not os.path.isfile(schema_path):
+            raise FileNotFoundError(f'Schema file {schema_path} does not exist!')
+    if args.output_dir is None:
+        args.output_dir = os.path.join(utilities.get_cache_dir(_ROOT), 'synthetic')
+    return args
+
+
+def main(argv: list) -> list:
+    """Process args and generate a synthetic file per schema.
+
+    Args:
+        argv: List of input arguments.
+
+    Returns:
+        List of the paths of the generated files.
+    """
+    args = _process_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    json_paths = []
+    for schema_path in args.schema_paths:
+        json_path = os.path.join(args.output_dir, collection_name(schema_path) + '.json')
+        start = time.perf_counter()
+        count = generate_file(schema_path, json_path, args.count, args.seed)
+        print(f'{json_path}: {count} object(s) in {time.perf_counter() - start:.2f} s')
+        json_paths.append(json_path)
+    return json_paths
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,180 @@
+"""Indexed in-memory database of the talents in <ROOT>/library/json/talents.json."""
+
+import os
+import re
+import bisect
+import logging
+import utilities
+import jsonc_loader
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+ATTRIBUTES = ('str', 'dex', 'bod', 'int', 'cha', 'mnd')
+"""Attribute keys, as defined by attributes_def in talent_schema.json."""
+
+_NAME_SEPARATOR_RE = re.compile(r'[^0-9a-z]+')
+"""Matches every run of characters that isn't a lowercase letter or digit."""
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a talent, ancestry or ability name for lookups.
+
+    Case is ignored and spaces, underscores and punctuation are equivalent, so 'Swift I',
+    'swift_i' and 'SWIFT-I' all normalize to 'swift_i'.
+    """
+    return _NAME_SEPARATOR_RE.sub('_', name.lower()).strip('_')
+
+
+def talent_level(talent: dict) -> int:
+    """Return the level prerequisite of a talent, or 0 if it doesn't have one."""
+    return talent.get('prerequisites', {}).get('level', 0)
+
+
+def object_level(my_obj: dict) -> int:
+    """Return the level of any library object: a talent's level prerequisite, a statblock's level, or a top-level 'level'."""
+    for level in (my_obj.get('prerequisites', {}).get('level'), my_obj.get('stats', {}).get('level'), my_obj.get('level')):
+        if isinstance(level, int):
+            return level
+    return 0
+
+
+def talents_path() -> str:
+    """Return the path to talents.json in this worktree."""
+    return os.path.join(utilities.get_root_dir(), 'library', 'json', 'talents.json')
+
+
+class TalentDB:
+    """Talents loaded once and indexed for O(1) point lookups and sorted range queries.
+
+    Indexes:
+        - by normalized name (see normalize_name())
+        - by level, with each level's talents sorted by name
+        - by normalized ancestry prerequisite
+        - by the threshold of each attribute prerequisite
+    """
+
+    def __init__(self, talents: list):
+        """Build every index for talents.
+
+        Args:
+            talents: List of talent dicts, as found in talents.json.
+        """
+        self.talents = list(talents)
+        self.duplicate_names = []
+        self._by_name = {}
+        by_level = {}
+        self._by_ancestry = {}
+        attribute_pairs = {attribute: [] for attribute in ATTRIBUTES}
+
+        for index, talent in enumerate(self.talents):
+            name_key = normalize_name(talent.get('name', ''))
+            if name_key in self._by_name:
+                self.duplicate_names.append(talent.get('name', ''))
+            else:
+                self._by_name[name_key] = index
+            by_level.setdefault(talent_level(talent), []).append(index)
+
+            prerequisites = talent.get('prerequisites', {})
+            ancestry = prerequisites.get('ancestry')
+            ancestry_key = normalize_name(ancestry) if ancestry is not None else None
+            self._by_ancestry.setdefault(ancestry_key, []).append(index)
+            for attribute, threshold in prerequisites.get('attributes', {}).items():
+                if attribute in attribute_pairs:
+                    attribute_pairs[attribute].append((threshold, index))
+
+        # Each level is sorted by name once, so every consumer gets them in display order
+        self._by_level = {level: sorted(indexes, key=lambda index: self.talents[index].get('name', ''))
+                          for level, indexes in by_level.items()}
+        self._levels = sorted(self._by_level)
+
+        # Parallel sorted lists per attribute: thresholds for bisect, and the talent index for each
+        self._attribute_thresholds = {}
+        self._attribute_indexes = {}
+        for attribute, pairs in attribute_pairs.items():
+            pairs.sort()
+            self._attribute_thresholds[attribute] = [threshold for threshold, _ in pairs]
+            self._attribute_indexes[attribute] = [index for _, index in pairs]
+
+    @classmethod
+    def from_file(cls, json_path: str=None) -> 'TalentDB':
+        """Load a TalentDB from a talents JSON file; defaults to talents.json in this worktree."""
+        return cls(jsonc_loader.load(json_path if json_path is not None else talents_path()))
+
+    def __len__(self) -> int:
+        return len(self.talents)
+
+    def __iter__(self):
+        return iter(self.talents)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_name(name) in self._by_name
+
+    def _select(self, indexes) -> list:
+        """Return the talents at indexes."""
+        return [self.talents[index] for index in indexes]
+
+    def index_of(self, name: str) -> int:
+        """Return the position of the talent called name in self.talents, or None if there isn't one."""
+        return self._by_name.get(normalize_name(name))
+
+    def get(self, name: str) -> dict:
+        """Return the talent called name (see normalize_name()), or None if there isn't one."""
+        index = self._by_name.get(normalize_name(name))
+        return self.talents[index] if index is not None else None
+
+    def levels(self) -> list:
+        """Return the sorted list of every level used by a talent."""
+        return list(self._levels)
+
+    def by_level(self, level: int) -> list:
+        """Return the talents with the given level prerequisite, sorted by name."""
+        return self._select(self._by_level.get(level, []))
+
+    def by_level_range(self, min_level: int, max_level: int) -> list:
+        """Return the talents with a level prerequisite in [min_level, max_level], sorted by level then name."""
+        start = bisect.bisect_left(self._levels, min_level)
+        stop = bisect.bisect_right(self._levels, max_level)
+        return [talent for level in self._levels[start:stop] for talent in self.by_level(level)]
+
+    def by_ancestry(self, ancestry: str) -> list:
+        """Return the talents that require ancestry; pass None for talents with no ancestry prerequisite."""
+        return self._select(self._by_ancestry.get(normalize_name(ancestry) if ancestry is not None else None, []))
+
+    def ancestries(self) -> list:
+        """Return the sorted list of every normalized ancestry used as a prerequisite."""
+        return sorted(ancestry for ancestry in self._by_ancestry if ancestry is not None)
+
+    def requiring(self, attribute: str, min_value: int=None, max_value: int=None) -> list:
+        """Return the talents with a prerequisite on attribute whose threshold is in [min_value, max_value].
+
+        Args:
+            attribute: One of ATTRIBUTES.
+            min_value: Lowest threshold to include; unbounded if None.
+            max_value: Highest threshold to include; unbounded if None.
+
+        Returns:
+            Matching talents, sorted by threshold.
+        """
+        thresholds = self._attribute_thresholds[attribute]
+        start = 0 if min_value is None else bisect.bisect_left(thresholds, min_value)
+        stop = len(thresholds) if max_value is None else bisect.bisect_right(thresholds, max_value)
+        return self._select(self._attribute_indexes[attribute][start:stop])
+
+    def attribute_eligible(self, attributes: dict) -> list:
+        """Return the talents whose attribute prerequisites are all met by attributes.
+
+        Only the talents whose threshold is above a score are visited, via the sorted indexes.
+
+        Args:
+            attributes: Dict mapping attribute to score; missing attributes count as 0.
+
+        Returns:
+            Eligible talents, in catalog order.
+        """
+        ineligible = set()
+        for attribute in ATTRIBUTES:
+            thresholds = self._attribute_thresholds[attribute]
+            start = bisect.bisect_right(thresholds, attributes.get(attribute, 0))
+            ineligible.update(self._attribute_indexes[attribute][start:])
+        return [talent for index, talent in enumerate(self.talents) if index not in ineligible]
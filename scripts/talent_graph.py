@@ -0,0 +1,156 @@
+"""Prerequisite graph of the talent catalog, built from each talent's other_talents prerequisites."""
+
+import os
+import logging
+import talent_db
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+
+class PrerequisiteCycleError(Exception):
+    """Exception class for talents whose prerequisites depend on each other."""
+
+
+def iter_bits(mask: int):
+    """Yield the index of every set bit in mask, lowest first."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+class PrerequisiteGraph:
+    """Dependency graph of a TalentDB with its transitive closure precomputed.
+
+    Talent i is bit i of every mask, where i is the talent's position in TalentDB.talents.
+    The full set of prerequisites and of unlocked talents is precomputed for every talent as
+    an integer bitset, so "everything needed to take X" and "everything unlocked by Y" are a
+    single lookup, and set operations across talents are bitwise operations.
+
+    Attributes:
+        talents: The TalentDB the graph was built from.
+        direct_prerequisites: Per talent, mask of the talents named in its other_talents.
+        direct_dependents: Per talent, list of the indexes of talents that name it in their other_talents.
+        unresolved: Dict mapping talent name to the other_talents entries that don't name a known talent.
+        cycles: List of cycles, each a list of talent names; empty if the graph is acyclic.
+        topological_order: Talent indexes ordered so each talent comes after all of its prerequisites.
+            Talents on a cycle are left out.
+    """
+
+    def __init__(self, talents: talent_db.TalentDB):
+        """Resolve every other_talents reference and precompute the closure.
+
+        Args:
+            talents: Talent catalog to build the graph for.
+        """
+        self.talents = talents
+        count = len(talents)
+        self.direct_prerequisites = [0] * count
+        self.unresolved = {}
+        self.direct_dependents = dependents = [[] for _ in range(count)]
+        for index, talent in enumerate(talents.talents):
+            for reference in talent.get('prerequisites', {}).get('other_talents', []):
+                prerequisite = talents.index_of(reference)
+                if prerequisite is None:
+                    self.unresolved.setdefault(talent.get('name', ''), []).append(reference)
+                elif not self.direct_prerequisites[index] >> prerequisite & 1:  # Same talent spelled two ways
+                    self.direct_prerequisites[index] |= 1 << prerequisite
+                    dependents[prerequisite].append(index)
+
+        self.topological_order = self._topological_sort(dependents)
+        self.cycles = self._find_cycles(set(self.topological_order))
+        if self.cycles:
+            LOGGER.warning('Talent prerequisites contain %d cycle(s): %s', len(self.cycles), self.cycles)
+
+        # Closure in topological order: a talent needs its direct prerequisites and everything they need
+        self._all_prerequisites = [0] * count
+        for index in self.topological_order:
+            mask = self.direct_prerequisites[index]
+            closure = mask
+            for prerequisite in iter_bits(mask):
+                closure |= self._all_prerequisites[prerequisite]
+            self._all_prerequisites[index] = closure
+
+        # Same again in reverse order: a talent unlocks its dependents and everything they unlock
+        self._all_unlocked = [0] * count
+        for index in reversed(self.topological_order):
+            closure = 0
+            for dependent in dependents[index]:
+                closure |= (1 << dependent) | self._all_unlocked[dependent]
+            self._all_unlocked[index] = closure
+
+    def _topological_sort(self, dependents: list) -> list:
+        """Order talents with Kahn's algorithm; talents on or behind a cycle never reach in-degree 0."""
+        in_degree = [mask.bit_count() for mask in self.direct_prerequisites]
+        order = [index for index, degree in enumerate(in_degree) if degree == 0]
+        for index in order:  # order grows while it is iterated
+            for dependent in dependents[index]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    order.append(dependent)
+        return order
+
+    def _find_cycles(self, ordered: set) -> list:
+        """Return one list of talent names per prerequisite cycle among the talents missing from ordered."""
+        cycles = []
+        visited = set()
+        for start in range(len(self.direct_prerequisites)):
+            if start in ordered or start in visited:
+                continue
+            # Every talent missing from ordered has a prerequisite that is also missing, so following
+            # those must reach a talent seen before; if it was seen on this walk, that closes a new cycle
+            path = []
+            position = {}
+            index = start
+            while index not in visited:
+                visited.add(index)
+                position[index] = len(path)
+                path.append(index)
+                index = next(bit for bit in iter_bits(self.direct_prerequisites[index]) if bit not in ordered)
+            if index in position:
+                cycles.append([self.talents.talents[member].get('name', '') for member in path[position[index]:]])
+        return cycles
+
+    def _index(self, name: str) -> int:
+        """Return the index of the talent called name; raise KeyError if there isn't one."""
+        index = self.talents.index_of(name)
+        if index is None:
+            raise KeyError(f'Unknown talent "{name}"!')
+        return index
+
+    def names(self, mask: int) -> list:
+        """Return the names of the talents in mask, in catalog order."""
+        return [self.talents.talents[index].get('name', '') for index in iter_bits(mask)]
+
+    def mask_of(self, names) -> int:
+        """Return the mask of the talents called names."""
+        mask = 0
+        for name in names:
+            mask |= 1 << self._index(name)
+        return mask
+
+    def prerequisite_mask(self, name: str) -> int:
+        """Return the mask of every talent needed, directly or not, to take the talent called name."""
+        return self._all_prerequisites[self._index(name)]
+
+    def unlocked_mask(self, name: str) -> int:
+        """Return the mask of every talent that needs, directly or not, the talent called name."""
+        return self._all_unlocked[self._index(name)]
+
+    def prerequisites(self, name: str) -> list:
+        """Return the names of every talent needed to take the talent called name."""
+        return self.names(self.prerequisite_mask(name))
+
+    def unlocked_by(self, name: str) -> list:
+        """Return the names of every talent that the talent called name is needed for."""
+        return self.names(self.unlocked_mask(name))
+
+    def missing_prerequisites(self, name: str, owned_mask: int) -> int:
+        """Return the mask of talents still needed to take the talent called name, given the owned talents."""
+        return self._all_prerequisites[self._index(name)] & ~owned_mask
+
+    def check_acyclic(self) -> None:
+        """Raise PrerequisiteCycleError if any talents depend on each other."""
+        if self.cycles:
+            raise PrerequisiteCycleError(f'Talent prerequisites contain cycles: {self.cycles}')
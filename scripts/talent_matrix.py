@@ -0,0 +1,111 @@
+"""Columnar NumPy view of the talent catalog for batch eligibility queries."""
+
+import os
+import logging
+import numpy
+import talent_db
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+NO_ANCESTRY = -1
+"""Ancestry code of talents without an ancestry prerequisite, and of characters without an ancestry."""
+
+_UNKNOWN_ANCESTRY = -2
+"""Ancestry code of characters whose ancestry no talent requires; matches no talent's code."""
+
+_NO_THRESHOLD = numpy.iinfo(numpy.int16).min
+"""Threshold stored for attributes a talent has no prerequisite on, so every score meets it."""
+
+
+class TalentMatrix:
+    """Talent prerequisites compiled into arrays, one row per talent in TalentDB order.
+
+    Attributes:
+        names: Talent names, in row order.
+        thresholds: int16 array of shape (talents, 6); column i holds the prerequisite on
+            talent_db.ATTRIBUTES[i], or the int16 minimum if there isn't one.
+        levels: int16 array of level prerequisites.
+        ancestry_codes: int32 array of ancestry prerequisites as indexes into ancestries,
+            or NO_ANCESTRY.
+        ancestries: Normalized ancestry names; the position of each is its code.
+    """
+
+    def __init__(self, talents: talent_db.TalentDB):
+        """Compile talents into arrays.
+
+        Args:
+            talents: Talent catalog to compile.
+        """
+        count = len(talents)
+        self.names = [talent.get('name', '') for talent in talents]
+        self.thresholds = numpy.full((count, len(talent_db.ATTRIBUTES)), _NO_THRESHOLD, dtype=numpy.int16)
+        self.levels = numpy.zeros(count, dtype=numpy.int16)
+        self.ancestry_codes = numpy.full(count, NO_ANCESTRY, dtype=numpy.int32)
+        self.ancestries = talents.ancestries()
+        self._ancestry_index = {ancestry: code for code, ancestry in enumerate(self.ancestries)}
+
+        columns = {attribute: column for column, attribute in enumerate(talent_db.ATTRIBUTES)}
+        for row, talent in enumerate(talents):
+            prerequisites = talent.get('prerequisites', {})
+            self.levels[row] = talent_db.talent_level(talent)
+            ancestry = prerequisites.get('ancestry')
+            if ancestry is not None:
+                self.ancestry_codes[row] = self._ancestry_index[talent_db.normalize_name(ancestry)]
+            for attribute, threshold in prerequisites.get('attributes', {}).items():
+                if attribute in columns:
+                    self.thresholds[row, columns[attribute]] = threshold
+        LOGGER.debug('Compiled %d talents into a %s threshold matrix', count, self.thresholds.shape)
+
+    @classmethod
+    def from_file(cls, json_path: str=None) -> 'TalentMatrix':
+        """Compile a TalentMatrix from a talents JSON file; defaults to talents.json in this worktree."""
+        return cls(talent_db.TalentDB.from_file(json_path))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def ancestry_code(self, ancestry: str) -> int:
+        """Return the code of ancestry; NO_ANCESTRY for None, and a code matching no talent if no talent requires it."""
+        if ancestry is None:
+            return NO_ANCESTRY
+        return self._ancestry_index.get(talent_db.normalize_name(ancestry), _UNKNOWN_ANCESTRY)
+
+    @staticmethod
+    def attribute_vectors(characters: list) -> numpy.ndarray:
+        """Convert a list of dicts mapping attribute to score into an array of shape (characters, 6).
+
+        Missing attributes count as 0.
+        """
+        return numpy.array([[character.get(attribute, 0) for attribute in talent_db.ATTRIBUTES] for character in characters],
+                           dtype=numpy.int16).reshape(len(characters), len(talent_db.ATTRIBUTES))
+
+    def eligible(self, attributes, levels=None, ancestries=None) -> numpy.ndarray:
+        """Check every talent against a batch of characters at once.
+
+        Args:
+            attributes: Array-like of shape (characters, 6) of scores in talent_db.ATTRIBUTES order,
+                see attribute_vectors().
+            levels: Optional array-like of character levels; levels are ignored if None.
+            ancestries: Optional array-like of ancestry codes (see ancestry_code()); ancestry
+                prerequisites are ignored if None.
+
+        Returns:
+            Bool array of shape (characters, talents); True where the character meets every
+            attribute, level and ancestry prerequisite of the talent. Talent prerequisites
+            (other_talents) are not checked, see talent_graph for those.
+        """
+        attributes = numpy.asarray(attributes)
+        if attributes.ndim != 2 or attributes.shape[1] != len(talent_db.ATTRIBUTES):
+            raise ValueError(f'Expected attributes of shape (characters, {len(talent_db.ATTRIBUTES)}), got {attributes.shape}!')
+
+        # One attribute at a time keeps the temporaries at (characters, talents) instead of 6 times that
+        result = attributes[:, 0, None] >= self.thresholds[:, 0]
+        for column in range(1, attributes.shape[1]):
+            result &= attributes[:, column, None] >= self.thresholds[:, column]
+        if levels is not None:
+            result &= numpy.asarray(levels)[:, None] >= self.levels
+        if ancestries is not None:
+            codes = numpy.asarray(ancestries)[:, None]
+            result &= (self.ancestry_codes == NO_ANCESTRY) | (self.ancestry_codes == codes)
+        return result
@@ -0,0 +1,83 @@
+"""Unittests for binary_db.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import binary_db
+
+_COLLECTIONS = {
+    'talents': [
+        {'name': 'Swift_I', 'prerequisites': {'level': 1, 'attributes': {'dex': 2}}},
+        {'name': 'Archer', 'prerequisites': {'level': 2}},
+        {'name': 'Pugilist', 'prerequisites': {'level': 1}},
+        {'name': 'Épée Master', 'prerequisites': {'level': 12}}
+    ],
+    'statblocks': [
+        {'name': 'Ogre', 'stats': {'level': 3, 'role': 'brute', 'hp': 45, 'armor': 2}}
+    ],
+    'character_sheets': []
+}
+"""Small library for testing."""
+
+
+@mock.patch('binary_db.LOGGER', mock.Mock(auto_spec=True))
+class TestBinaryDatabase(unittest.TestCase):
+    """Test cases for write_database() and BinaryDatabase."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, 'library.hgdb')
+        binary_db.write_database(_COLLECTIONS, self.db_path)
+        self.database = binary_db.BinaryDatabase(self.db_path)
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self.database.close()
+        self._tmp_dir.cleanup()
+
+    def test_collections(self) -> None:
+        """Test collection names and sizes."""
+        self.assertEqual(self.database.collections(), ['character_sheets', 'statblocks', 'talents'])
+        self.assertEqual(self.database.count('talents'), 4)
+        self.assertEqual(self.database.count('character_sheets'), 0)
+        with self.assertRaises(KeyError):
+            self.database.count('spells')
+
+    def test_get(self) -> None:
+        """Test name lookups, which ignore case and separators like TalentDB."""
+        self.assertEqual(self.database.get('talents', 'swift i'), _COLLECTIONS['talents'][0])
+        self.assertEqual(self.database.get('talents', 'épée_master'), _COLLECTIONS['talents'][3])
+        self.assertEqual(self.database.get('statblocks', 'OGRE'), _COLLECTIONS['statblocks'][0])
+        self.assertIsNone(self.database.get('talents', 'Ogre'))
+        self.assertIsNone(self.database.get('character_sheets', 'Anyone'))
+        self.assertEqual(self.database.find('talents', 'Archer'), self.database.record('talents', 1))
+
+    def test_levels(self) -> None:
+        """Test level slices, sorted by name, without decoding bodies."""
+        self.assertEqual(self.database.levels('talents'), [1, 2, 12])
+        self.assertEqual([record.name for record in self.database.by_level('talents', 1)], ['Pugilist', 'Swift_I'])
+        self.assertEqual(self.database.by_level('talents', 5), [])
+        record = self.database.by_level('statblocks', 3)[0]
+        self.assertEqual((record.name, record.level), ('Ogre', 3))
+        self.assertEqual(self.database.body(record), _COLLECTIONS['statblocks'][0])
+
+    def test_long_collection_name(self) -> None:
+        """Test that collection names aren't limited in length by the section directory."""
+        long_name = 'homebrew_' * 8 + 'talents'
+        long_path = os.path.join(self._tmp_dir.name, 'long.hgdb')
+        binary_db.write_database({long_name: _COLLECTIONS['talents']}, long_path)
+        with binary_db.BinaryDatabase(long_path) as database:
+            self.assertEqual(database.collections(), [long_name])
+            self.assertEqual(database.levels(long_name), [1, 2, 12])
+            self.assertEqual(database.get(long_name, 'archer'), _COLLECTIONS['talents'][1])
+
+    def test_bad_file(self) -> None:
+        """Test that files that aren't databases are rejected."""
+        bad_path = os.path.join(self._tmp_dir.name, 'bad.hgdb')
+        for contents in (b'', b'HGDB\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', b'{"not": "a database"}'):
+            with open(bad_path, 'wb') as db_fp:
+                db_fp.write(contents)
+            with self.assertRaises(binary_db.BinaryDatabaseError):
+                binary_db.BinaryDatabase(bad_path)
@@ -0,0 +1,118 @@
+"""Unittests for character_generator.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import random
+import unittest
+from unittest import mock
+import talent_db
+import talent_graph
+import character_generator
+
+_TALENTS = [
+    {'name': 'Swift_I', 'prerequisites': {'level': 1}},
+    {'name': 'Swift_II', 'prerequisites': {'level': 2, 'other_talents': ['Swift_I']}},
+    {'name': 'Swift_III', 'prerequisites': {'level': 3, 'other_talents': ['Swift_II']}},
+    {'name': 'Pugilist', 'prerequisites': {'level': 1, 'attributes': {'str': 2}}},
+    {'name': 'Stone Skin', 'prerequisites': {'level': 1, 'ancestry': 'Dwarf'}},
+    {'name': 'Archer', 'prerequisites': {'level': 1, 'other_talents': ['advanced_weapon_training_bows']}},
+    {'name': 'Sturdy', 'prerequisites': {'level': 1, 'attributes': {'bod': -1}}}
+]
+"""Small talent catalog for testing."""
+
+
+@mock.patch('talent_graph.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('character_generator.LOGGER', mock.Mock(auto_spec=True))
+class TestTalentPicker(unittest.TestCase):
+    """Test cases for TalentPicker."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self.talents = talent_db.TalentDB(_TALENTS)
+        self.picker = character_generator.TalentPicker(self.talents)
+
+    def _names(self, mask: int) -> list:
+        """Return the names of the talents in mask."""
+        return self.picker.graph.names(mask)
+
+    def test_masks(self) -> None:
+        """Test the precomputed level, ancestry and attribute masks."""
+        self.assertEqual(self._names(self.picker.level_mask(0)), [])
+        self.assertNotIn('Swift_III', self._names(self.picker.level_mask(2)))
+        self.assertIn('Swift_III', self._names(self.picker.level_mask(12)))
+        self.assertNotIn('Stone Skin', self._names(self.picker.ancestry_mask(None)))
+        self.assertIn('Stone Skin', self._names(self.picker.ancestry_mask('dwarf')))
+        self.assertEqual(self._names(self.picker.attribute_mask({'str': 1, 'bod': -2})),
+                         ['Swift_I', 'Swift_II', 'Swift_III', 'Stone Skin', 'Archer'])
+        self.assertIn('Pugilist', self._names(self.picker.attribute_mask({'str': 2})))
+
+    def test_duplicate_names(self) -> None:
+        """Test that a talent that shares its name with an earlier one still gets its level and ancestry bits."""
+        talents = talent_db.TalentDB(_TALENTS + [{'name': 'Pugilist', 'prerequisites': {'level': 3, 'ancestry': 'Dwarf'}}])
+        picker = character_generator.TalentPicker(talents)
+        duplicate_bit = 1 << len(_TALENTS)
+        self.assertFalse(picker.level_mask(2) & duplicate_bit)
+        self.assertTrue(picker.level_mask(3) & duplicate_bit)
+        self.assertTrue(picker.ancestry_mask('dwarf') & duplicate_bit)
+        self.assertFalse(picker.ancestry_mask(None) & duplicate_bit)
+
+    def test_unlocked(self) -> None:
+        """Test that talents unlock once their other_talents are owned, and never if one is unknown."""
+        self.assertEqual(self._names(self.picker.unlocked_mask(0)), ['Swift_I', 'Pugilist', 'Stone Skin', 'Sturdy'])
+        owned = self.picker.graph.mask_of(['Swift_I', 'Swift_II'])
+        self.assertIn('Swift_III', self._names(self.picker.unlocked_mask(owned)))
+
+    def test_unresolvable(self) -> None:
+        """Test that talents with an unknown prerequisite are masked by index, and talents behind a cycle never unlock."""
+        talents = talent_db.TalentDB(_TALENTS + [
+            {'name': 'Swift_I', 'prerequisites': {'level': 1, 'other_talents': ['Not_A_Talent']}},
+            {'name': 'Loop_A', 'prerequisites': {'level': 1, 'other_talents': ['Loop_B']}},
+            {'name': 'Loop_B', 'prerequisites': {'level': 1, 'other_talents': ['Loop_A']}},
+            {'name': 'After_Loop', 'prerequisites': {'level': 1, 'other_talents': ['Loop_A']}}
+        ])
+        picker = character_generator.TalentPicker(talents)
+        count = len(_TALENTS)
+        self.assertEqual(list(talent_graph.iter_bits(picker._unresolvable)), [5, count, count + 1, count + 2, count + 3])
+        self.assertTrue(picker.unlocked_mask(0) & 1)
+        owned = picker.graph.mask_of(['Loop_A', 'Loop_B'])
+        self.assertFalse(picker.unlocked_mask(owned) >> (count + 3) & 1)
+
+    def test_level_up(self) -> None:
+        """Test that every picked talent had its prerequisites met when it was picked."""
+        for seed in range(50):
+            character = self.picker.new_character('Test', 5, random.Random(seed), ancestry='Dwarf' if seed % 2 else None)
+            self.assertEqual(character['level'], 5)
+            self.assertEqual(len(character['talents']), len(set(character['talents'])))
+            self.assertNotIn('Archer', character['talents'])
+            for position, name in enumerate(character['talents']):
+                talent = self.talents.get(name)
+                # Attributes only go up, so the final scores meet anything the earlier ones did
+                for attribute, threshold in talent['prerequisites'].get('attributes', {}).items():
+                    self.assertGreaterEqual(character['attributes'][attribute], threshold)
+                for other_talent in talent['prerequisites'].get('other_talents', []):
+                    self.assertIn(other_talent, character['talents'][:position])
+                if 'ancestry' in talent['prerequisites']:
+                    self.assertEqual(character['ancestry'], 'Dwarf')
+
+    def test_existing_character(self) -> None:
+        """Test that levelling up an existing character keeps its talents and builds on them."""
+        character = {'name': 'Old', 'level': 2, 'ancestry': None, 'attributes': {attribute: 0 for attribute in talent_db.ATTRIBUTES},
+                     'talents': ['Swift_I', 'Swift_II', 'Homebrew']}
+        self.picker.level_up(character, 3, random.Random(0))
+        self.assertEqual(character['level'], 3)
+        self.assertEqual(character['talents'][:3], ['Swift_I', 'Swift_II', 'Homebrew'])
+        self.assertEqual(len(character['talents']), 4)
+
+
+@mock.patch('talent_graph.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('character_generator.LOGGER', mock.Mock(auto_spec=True))
+class TestGenerateCharacters(unittest.TestCase):
+    """Test cases for generate_characters()."""
+
+    def test_reproducible(self) -> None:
+        """Test that output depends on the seed only, not on the number of processes."""
+        with mock.patch('character_generator._CHUNK_SIZE', 4):
+            serial = character_generator.generate_characters(_TALENTS, 10, 3, seed=7, ancestries=('Dwarf', 'Human'), jobs=1)
+            parallel = character_generator.generate_characters(_TALENTS, 10, 3, seed=7, ancestries=('Dwarf', 'Human'), jobs=2)
+        self.assertEqual(serial, parallel)
+        self.assertEqual([character['name'] for character in serial], [f'Character_{index}' for index in range(10)])
+        other_seed = character_generator.generate_characters(_TALENTS, 10, 3, seed=8, ancestries=('Dwarf', 'Human'), jobs=1)
+        self.assertNotEqual(serial, other_seed)
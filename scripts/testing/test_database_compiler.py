@@ -0,0 +1,248 @@
+"""Unittests for database_compiler.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import binary_db
+import database_compiler
+
+
+@mock.patch('database_compiler.LOGGER', mock.Mock(auto_spec=True))
+class TestCompileTalents(unittest.TestCase):
+    """Test cases for the talents_list.md view of _render_talent_views()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.md_path = os.path.join(self._tmp_dir.name, 'talents_list.md')
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    def _compile(self, talents: list) -> str:
+        """Compile talents and return the generated markdown."""
+        database_compiler._render_talent_views(talents, [self.md_path], mock.Mock())
+        with open(self.md_path, 'r') as md_fp:
+            return md_fp.read()
+
+    def test_sorted_by_level(self) -> None:
+        """Test that talents are grouped by level and sorted alphabetically within a level."""
+        md_string = self._compile([
+            {'name': 'Swift_I', 'prerequisites': {'level': 1}},
+            {'name': 'Archer', 'prerequisites': {'level': 2}},
+            {'name': 'Pugilist', 'prerequisites': {'level': 1}}
+        ])
+        self.assertIn('### Level 1 Talents\nPugilist  \nSwift I\n\n### Level 2 Talents\nArcher\n\n', md_string)
+        self.assertIn('### Level 10 Talents\n\n\n', md_string)
+
+    def test_levels_above_ten(self) -> None:
+        """Test that levels above the standard range get a section only when used."""
+        md_string = self._compile([{'name': 'Epic', 'prerequisites': {'level': 12}}])
+        self.assertTrue(md_string.endswith('### Level 10 Talents\n\n\n### Level 12 Talents\nEpic\n\n'))
+        self.assertNotIn('Level 11', md_string)
+
+
+@mock.patch('talent_graph.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('database_compiler.LOGGER', mock.Mock(auto_spec=True))
+class TestTalentViews(unittest.TestCase):
+    """Test cases for _render_talent_views() and the registered talent views."""
+
+    _TALENTS = [
+        {'name': 'Swift_I', 'description': 'Faster.', 'prerequisites': {'level': 1, 'attributes': {'dex': 2}}},
+        {'name': 'Swift_II', 'description': 'Even faster.', 'prerequisites': {'level': 2, 'attributes': {'dex': 3}, 'other_talents': ['Swift_I']}},
+        {'name': 'Elf_Sight', 'description': 'See far.', 'prerequisites': {'level': 1, 'ancestry': 'Elf', 'attributes': {'dex': 2}}},
+        {'name': 'Blur', 'description': 'Hard to hit.', 'prerequisites': {'level': 3, 'other_talents': ['Swift_II', 'Elf_Sight']}},
+        {'name': 'Archer', 'description': 'Shoot.', 'prerequisites': {'level': 2, 'other_talents': ['Missing']}}
+    ]
+    """Talents with every kind of prerequisite."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    def _render(self) -> dict:
+        """Render every view of _TALENTS and return a dict mapping view name to its markdown."""
+        md_paths = [os.path.join(self._tmp_dir.name, view_name) for view_name in database_compiler._TALENT_VIEWS]
+        timings = database_compiler._render_talent_views(self._TALENTS, md_paths, mock.Mock())
+        self.assertEqual(set(timings), set(md_paths))
+        views = {}
+        for md_path in md_paths:
+            with open(md_path, 'r') as md_fp:
+                views[os.path.basename(md_path)] = md_fp.read()
+        return views
+
+    def test_registered(self) -> None:
+        """Test that every view is a build target of its own with the shared batch handler."""
+        view_targets = [target for target in database_compiler._HANDLERS if target.handler is database_compiler._render_talent_views]
+        self.assertEqual(sorted(os.path.basename(target.output) for target in view_targets), sorted(database_compiler._TALENT_VIEWS))
+        self.assertEqual(len(database_compiler._group_targets(view_targets)), 1)
+
+    def test_shared_pass(self) -> None:
+        """Test that the talents are indexed and their graph built once for every view."""
+        with mock.patch('talent_db.TalentDB', wraps=database_compiler.talent_db.TalentDB) as db_mock, \
+                mock.patch('talent_graph.PrerequisiteGraph', wraps=database_compiler.talent_graph.PrerequisiteGraph) as graph_mock:
+            self._render()
+        db_mock.assert_called_once()
+        graph_mock.assert_called_once()
+
+    def test_by_attribute(self) -> None:
+        """Test that talents are grouped by attribute and sorted by score, then name."""
+        self.assertIn('### DEX Talents\nElf Sight (2)  \nSwift I (2)  \nSwift II (3)\n\n', self._render()['talents_by_attribute.md'])
+
+    def test_by_ancestry(self) -> None:
+        """Test that talents with an ancestry prerequisite are grouped under it."""
+        self.assertIn('### Elf Talents\nElf Sight (level 1)\n', self._render()['talents_by_ancestry.md'])
+
+    def test_prerequisite_trees(self) -> None:
+        """Test that talents are nested under their prerequisites, each listed in full only once."""
+        trees = self._render()['talent_prerequisite_trees.md']
+        self.assertIn('- Elf Sight\n  - Blur\n- Swift I\n  - Swift II\n    - Blur (see above)\n', trees)
+        self.assertIn('### Unknown Prerequisites\nArcher: Missing\n', trees)
+
+    def test_cards(self) -> None:
+        """Test that cards are alphabetical with every prerequisite and the description."""
+        cards = self._render()['talent_cards.md']
+        self.assertLess(cards.index('### Archer'), cards.index('### Blur'))
+        self.assertIn('### Swift II\n**Level:** 2  \n**Attributes:** DEX 3  \n**Talents:** Swift I\n\nEven faster.\n', cards)
+
+
+@mock.patch('binary_db.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('database_compiler.LOGGER', mock.Mock(auto_spec=True))
+class TestCompileBinaryDatabase(unittest.TestCase):
+    """Test cases for _compile_binary_database()."""
+
+    def test_collections(self) -> None:
+        """Test that every library file becomes a collection named after the file."""
+        talents = [{'name': 'Swift_I', 'prerequisites': {'level': 1}}]
+        statblocks = [{'name': 'Ogre', 'stats': {'level': 3, 'role': 'brute', 'hp': 45, 'armor': 2}}]
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch('database_compiler._library_files', mock.Mock(return_value=('statblocks.json', 'talents.json'))):
+            db_path = os.path.join(tmp_dir, 'library.hgdb')
+            database_compiler._compile_binary_database(statblocks, talents, db_path, mock.Mock())
+            with binary_db.BinaryDatabase(db_path) as database:
+                self.assertEqual(database.collections(), ['statblocks', 'talents'])
+                self.assertEqual(database.get('talents', 'swift_i'), talents[0])
+                self.assertEqual(database.get('statblocks', 'ogre'), statblocks[0])
+
+
+@mock.patch('builtins.print', mock.Mock(auto_spec=True))
+@mock.patch('database_compiler.LOGGER', mock.Mock(auto_spec=True))
+class TestGenerateMarkdown(unittest.TestCase):
+    """Test cases for _generate_markdown() and its build graph."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        tmp_path = self._tmp_dir.name
+        self.input_path = os.path.join(tmp_path, 'talents.json')
+        self.schema_path = os.path.join(tmp_path, 'talent_schema.json')
+        for path in (self.input_path, self.schema_path):
+            with open(path, 'w') as json_fp:
+                json_fp.write('[]')
+        self.handler = mock.Mock(auto_spec=True, side_effect=self._build)
+        self.target = database_compiler.build_graph.BuildTarget(
+            os.path.join(tmp_path, 'out', 'list.md'), (self.input_path,), (self.schema_path,), self.handler)
+        self._patches = [
+            mock.patch('database_compiler._ROOT', tmp_path),
+            mock.patch('database_compiler._HANDLERS', [self.target]),
+            mock.patch('utilities.get_cache_dir', mock.Mock(return_value=tmp_path))
+        ]
+        for patch in self._patches:
+            patch.start()
+        self.args = mock.Mock(auto_spec=True)
+        self.args.input_files = [self.input_path]
+        self.args.force = False
+        self.args.dry_run = False
+        self.args.jobs = 1
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        for patch in self._patches:
+            patch.stop()
+        self._tmp_dir.cleanup()
+
+    @staticmethod
+    def _build(input_data: list, output_path: str, args) -> None:
+        """Stand-in handler that writes the output file."""
+        with open(output_path, 'w') as out_fp:
+            out_fp.write('built')
+
+    def test_only_stale_targets_rebuilt(self) -> None:
+        """Test that a target is rebuilt only when it is missing or a dependency changes."""
+        database_compiler._generate_markdown(self.args)
+        self.assertEqual(self.handler.call_count, 1)
+        mtime = os.stat(self.target.output).st_mtime_ns
+
+        database_compiler._generate_markdown(self.args)
+        self.assertEqual(self.handler.call_count, 1)
+        self.assertEqual(os.stat(self.target.output).st_mtime_ns, mtime)
+
+        with open(self.schema_path, 'w') as json_fp:
+            json_fp.write('{}')
+        database_compiler._generate_markdown(self.args)
+        self.assertEqual(self.handler.call_count, 2)
+
+    def test_dry_run(self) -> None:
+        """Test that a dry run explains why a target is stale without building it."""
+        self.args.dry_run = True
+        database_compiler._generate_markdown(self.args)
+        self.handler.assert_not_called()
+        print.assert_called_once_with('Would rebuild out/list.md because it has never been built')
+
+    def test_inputs_parsed_once(self) -> None:
+        """Test that an input shared by several handlers is parsed once and every handler is timed."""
+        second_target = self.target._replace(output=os.path.join(self._tmp_dir.name, 'out', 'other.md'))
+        with mock.patch('database_compiler._HANDLERS', [self.target, second_target]), \
+                mock.patch('jsonc_loader.load', wraps=database_compiler.jsonc_loader.load) as load_mock:
+            timings = database_compiler._generate_markdown(self.args)
+        load_mock.assert_called_once_with(self.input_path)
+        self.assertEqual(self.handler.call_count, 2)
+        self.assertEqual(set(timings), {self.target.output, second_target.output})
+
+    def test_batch_handler(self) -> None:
+        """Test that every stale target of a batch handler is built by one call."""
+        def build_batch(input_data: list, output_paths: list, args) -> dict:
+            for output_path in output_paths:
+                self._build(input_data, output_path, args)
+            return {output_path: 0.0 for output_path in output_paths}
+
+        batch_handler = mock.Mock(auto_spec=True, side_effect=build_batch)
+        targets = [self.target._replace(output=os.path.join(self._tmp_dir.name, 'out', name), handler=batch_handler)
+                   for name in ('a.md', 'b.md')]
+        with mock.patch('database_compiler._HANDLERS', targets + [self.target]), \
+                mock.patch('database_compiler._BATCH_HANDLERS', {batch_handler}):
+            timings = database_compiler._generate_markdown(self.args)
+        batch_handler.assert_called_once_with([], [target.output for target in targets], self.args)
+        self.handler.assert_called_once()
+        self.assertEqual(set(timings), {target.output for target in targets} | {self.target.output})
+
+    def test_affected_inputs(self) -> None:
+        """Test that a saved input affects itself and a saved schema affects the inputs of its targets."""
+        self.assertEqual(database_compiler._affected_inputs([self.input_path]), [self.input_path])
+        self.assertEqual(database_compiler._affected_inputs([self.schema_path]), [self.input_path])
+        self.assertEqual(database_compiler._affected_inputs([os.path.join(self._tmp_dir.name, 'other.json')]), [])
+        os.remove(self.input_path)
+        self.assertEqual(database_compiler._affected_inputs([self.input_path]), [])
+
+    def test_library_inputs(self) -> None:
+        """Test that inputs given as a function are resolved on each build, so added and removed files are picked up."""
+        json_dir = os.path.join(self._tmp_dir.name, 'json')
+        json_paths = [os.path.join(json_dir, name) for name in ('a.json', 'b.json')]
+        os.mkdir(json_dir)
+        with open(json_paths[0], 'w') as json_fp:
+            json_fp.write('[]')
+        library_target = self.target._replace(inputs=database_compiler._library_files)
+        with mock.patch('database_compiler._HANDLERS', [library_target]), mock.patch('database_compiler._JSON_DIR', json_dir):
+            self.assertEqual(database_compiler._supported_files(), json_paths[:1])
+            with open(json_paths[1], 'w') as json_fp:
+                json_fp.write('[]')
+            self.assertEqual(database_compiler._supported_files(), json_paths)
+            self.assertEqual(database_compiler._affected_inputs(json_paths[1:]), json_paths[1:])
+            os.remove(json_paths[1])
+            self.assertEqual(database_compiler._affected_inputs(json_paths[1:]), json_paths[:1])
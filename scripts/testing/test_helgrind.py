@@ -0,0 +1,45 @@
+"""Unittests for helgrind.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import sys
+import unittest
+import subprocess
+from unittest import mock
+import helgrind
+
+_HEAVY_MODULES = ('jsonschema', 'jsmin', 'numpy', 'sqlite3', 'utilities', 'json_validator')
+"""Modules that --help must not import."""
+
+
+class TestMain(unittest.TestCase):
+    """Test cases for main()."""
+
+    @mock.patch('importlib.import_module')
+    def test_dispatch(self, import_mock: mock.Mock) -> None:
+        """Test that a command imports its script and passes it the rest of the arguments."""
+        result = helgrind.main(['validate', '-a', '-j', '2'])
+        import_mock.assert_called_once_with('json_validator')
+        import_mock.return_value.main.assert_called_once_with(['-a', '-j', '2'])
+        self.assertIs(result, import_mock.return_value.main.return_value)
+
+    @mock.patch('sys.stderr', mock.Mock(auto_spec=True))
+    def test_unknown_command(self) -> None:
+        """Test that an unknown command is an argument error."""
+        with self.assertRaises(SystemExit):
+            helgrind.main(['nope'])
+
+    def test_commands_exist(self) -> None:
+        """Test that every command names a script with a main()."""
+        scripts_dir = os.path.dirname(os.path.abspath(helgrind.__file__))
+        for name, command in helgrind.COMMANDS.items():
+            with open(os.path.join(scripts_dir, command.module + '.py'), 'r') as py_fp:
+                self.assertIn('\ndef main(', py_fp.read(), name)
+
+    def test_help_is_lazy(self) -> None:
+        """Test that --help imports none of the script modules or their dependencies."""
+        check = ('import sys, helgrind\n'
+                 'try:\n    helgrind.main(["--help"])\nexcept SystemExit:\n    pass\n'
+                 f'print([name for name in {_HEAVY_MODULES!r} if name in sys.modules])\n')
+        output = subprocess.check_output([sys.executable, '-c', check], cwd=os.path.dirname(os.path.abspath(helgrind.__file__)),
+                                         encoding='UTF-8')
+        self.assertEqual(output.strip().splitlines()[-1], '[]')
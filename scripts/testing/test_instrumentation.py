@@ -0,0 +1,97 @@
+"""Unittests for instrumentation.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import json
+import argparse
+import tempfile
+import unittest
+from unittest import mock
+import utilities
+import instrumentation
+
+
+class TestSpanRecorder(unittest.TestCase):
+    """Test cases for SpanRecorder."""
+
+    def test_nested_spans(self) -> None:
+        """Test that spans are aggregated per nested path, in the order they were first opened."""
+        recorder = instrumentation.SpanRecorder()
+        for _ in range(2):
+            with recorder.span('load'):
+                with recorder.span('parse'):
+                    pass
+        with recorder.span('parse'):
+            pass
+        self.assertEqual(list(recorder.spans), [('load',), ('load', 'parse'), ('parse',)])
+        self.assertEqual([count for count, _ in recorder.spans.values()], [2, 2, 1])
+        self.assertEqual(list(recorder.metrics()['spans']), ['load', 'load/parse', 'parse'])
+        tree = recorder.format_tree().splitlines()
+        self.assertTrue(tree[2].lstrip().startswith('parse') and tree[2].startswith('    '))
+
+    def test_span_raises(self) -> None:
+        """Test that a span that raises is still recorded and closed."""
+        recorder = instrumentation.SpanRecorder()
+        with self.assertRaises(ValueError), recorder.span('parse'):
+            raise ValueError('bad')
+        with recorder.span('write'):
+            pass
+        self.assertEqual(list(recorder.spans), [('parse',), ('write',)])
+
+    def test_disabled(self) -> None:
+        """Test that span() records nothing without a recorder."""
+        with mock.patch('instrumentation._RECORDER', None):
+            with instrumentation.span('load'):
+                pass
+            self.assertIsNone(instrumentation._RECORDER)
+
+
+@mock.patch('builtins.print', mock.Mock(auto_spec=True))
+@mock.patch('instrumentation.LOGGER', mock.Mock(auto_spec=True))
+class TestStart(unittest.TestCase):
+    """Test cases for start() and the options parser_setup() adds."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._patches = [mock.patch('instrumentation._RECORDER', None), mock.patch('atexit.register')]
+        self.register_mock = [patch.start() for patch in self._patches][1]
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        for patch in self._patches:
+            patch.stop()
+        self._tmp_dir.cleanup()
+
+    def test_metrics_json(self) -> None:
+        """Test that spans are recorded once started and the metrics are written at exit."""
+        metrics_path = os.path.join(self._tmp_dir.name, 'out', 'metrics.json')
+        instrumentation.start('json_validator', metrics_path=metrics_path)
+        with instrumentation.span('validate'):
+            pass
+        finish = self.register_mock.call_args.args[0]
+        finish()
+        self.assertIsNone(instrumentation._RECORDER)
+        with open(metrics_path, 'r') as metrics_fp:
+            metrics = json.load(metrics_fp)
+        self.assertEqual(metrics['script'], 'json_validator')
+        self.assertEqual(metrics['spans']['validate']['count'], 1)
+        self.assertGreater(metrics['peak_rss_kib'], 0)
+
+    def test_started_once(self) -> None:
+        """Test that only the first start() in a process has an effect."""
+        instrumentation.start('a', timings=True)
+        recorder = instrumentation._RECORDER
+        instrumentation.start('b', timings=True)
+        self.assertIs(instrumentation._RECORDER, recorder)
+        self.register_mock.assert_called_once()
+
+    def test_parser_setup(self) -> None:
+        """Test that parser_setup() only starts instrumentation when asked to, and defaults the profile path."""
+        with mock.patch('instrumentation.start') as start_mock, \
+                mock.patch('utilities.get_cache_dir', mock.Mock(return_value=self._tmp_dir.name)):
+            args = utilities.parser_setup(argparse.ArgumentParser('tool.py'), [])
+            self.assertFalse(args.timings)
+            start_mock.assert_not_called()
+
+            utilities.parser_setup(argparse.ArgumentParser('tool.py'), ['--timings', '--metrics-json', 'm.json', '--profile'])
+            start_mock.assert_called_once_with('tool', True, 'm.json', os.path.join(self._tmp_dir.name, 'profiles', 'tool.prof'))
@@ -0,0 +1,276 @@
+"""Unittests for json_validator.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+import utilities
+import json_validator
+import library_watcher
+import schema_registry
+
+_SCHEMA_PATH = os.path.join(utilities.get_root_dir(), 'library', 'schemas', 'talent_schema.json')
+"""Path to the talent schema in this worktree."""
+
+_VALID_TALENT = {'name': 'Valid', 'description': 'A valid talent.', 'prerequisites': {'level': 1}}
+"""Talent that is valid against talent_schema.json."""
+
+
+@mock.patch('json_validator.LOGGER', mock.Mock(auto_spec=True))
+class TestGetValidator(unittest.TestCase):
+    """Test cases for _get_validator()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        schema_registry.clear()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        schema_registry.clear()
+
+    def test_validator_is_cached(self) -> None:
+        """Test that the same validator instance is reused for an unchanged schema."""
+        first = json_validator._get_validator(_SCHEMA_PATH)
+        second = json_validator._get_validator(_SCHEMA_PATH)
+        self.assertIs(first, second)
+        self.assertEqual(len(schema_registry._REGISTRIES), 1)
+
+    def test_draft_class(self) -> None:
+        """Test that the validator class matches the schema's declared draft."""
+        validator = json_validator._get_validator(_SCHEMA_PATH)
+        self.assertIsInstance(validator, json_validator.jsonschema.Draft202012Validator)
+
+
+@mock.patch('json_validator.LOGGER', mock.Mock(auto_spec=True))
+class TestValidateJsonFile(unittest.TestCase):
+    """Test cases for _validate_json_file()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self._tmp_dir.name, 'talents.json')
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    def _write(self, json_list: list) -> None:
+        """Write json_list to self.json_path."""
+        with open(self.json_path, 'w') as json_fp:
+            json_fp.write('// Comment\n' + json.dumps(json_list))
+
+    def test_valid_file(self) -> None:
+        """Test for a file where every object is valid."""
+        self._write([_VALID_TALENT, _VALID_TALENT])
+        self.assertTrue(json_validator._validate_json_file(self.json_path, _SCHEMA_PATH))
+
+    def test_all_errors_reported(self) -> None:
+        """Test that every invalid object is checked, not just the first."""
+        self._write([{'name': 'Missing'}, _VALID_TALENT, ['not', 'an', 'object']])
+        with mock.patch('json_validator._object_errors', wraps=json_validator._object_errors) as errors_mock:
+            self.assertFalse(json_validator._validate_json_file(self.json_path, _SCHEMA_PATH))
+        self.assertEqual(errors_mock.call_count, 3)
+
+
+class TestFindSchema(unittest.TestCase):
+    """Test cases for _find_schema()."""
+
+    def test_plural_convention(self) -> None:
+        """Test that a plural file name maps to its singular schema."""
+        self.assertEqual(json_validator._find_schema('some/dir/talents.json'), _SCHEMA_PATH)
+
+    def test_no_schema(self) -> None:
+        """Test that a file without a schema maps to None."""
+        self.assertIsNone(json_validator._find_schema('some/dir/no_such_things.json'))
+
+    @mock.patch.dict('json_validator._SCHEMA_REGISTRY', {'feats.json': 'talent_schema.json'})
+    def test_registry(self) -> None:
+        """Test that the registry overrides the naming convention."""
+        self.assertEqual(json_validator._find_schema('feats.json'), _SCHEMA_PATH)
+
+
+@mock.patch('json_validator.LOGGER', mock.Mock(auto_spec=True))
+class TestValidateAll(unittest.TestCase):
+    """Test cases for _validate_all()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_paths = []
+        for file_name, json_list in [('talents.json', [_VALID_TALENT]),
+                                     ('feats.json', [{'name': 'Invalid'}]),
+                                     ('unknowns.json', [{}])]:
+            json_path = os.path.join(self._tmp_dir.name, file_name)
+            with open(json_path, 'w') as json_fp:
+                json.dump(json_list, json_fp)
+            self.json_paths.append(json_path)
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    @mock.patch.dict('json_validator._SCHEMA_REGISTRY', {'feats.json': 'talent_schema.json'})
+    def test_validate_all(self) -> None:
+        """Test the combined report for valid, invalid and unvalidated files on a process pool."""
+        report = json_validator._validate_all(self.json_paths, jobs=2)
+        self.assertEqual([result.json_path for result in report.results], self.json_paths)
+        self.assertEqual([result.valid for result in report.results], [True, False, None])
+        self.assertEqual(report.unvalidated, [self.json_paths[2]])
+        self.assertFalse(report.valid)
+        self.assertGreaterEqual(report.wall_seconds, 0)
+
+    def test_unparsable_file(self) -> None:
+        """Test that a file that can't be parsed is reported as invalid without stopping the other files."""
+        broken_path = os.path.join(self._tmp_dir.name, 'broken_talents.json')
+        with open(broken_path, 'w') as json_fp:
+            json_fp.write('[{"name": "Broken",')
+        json_paths = [self.json_paths[0], broken_path]
+        with mock.patch.dict('json_validator._SCHEMA_REGISTRY', {'broken_talents.json': 'talent_schema.json'}), \
+                mock.patch('json_validator.LOGGER', mock.Mock(auto_spec=True)):
+            for jobs in (1, 2):
+                report = json_validator._validate_all(json_paths, jobs=jobs)
+                self.assertEqual([result.valid for result in report.results], [True, False], jobs)
+
+
+@mock.patch('json_validator.LOGGER', mock.Mock(auto_spec=True))
+class TestIncrementalValidation(unittest.TestCase):
+    """Test cases for validating with a validation_manifest.ValidationManifest."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self._tmp_dir.name, 'talents.json')
+        self.manifest = json_validator.validation_manifest.ValidationManifest(os.path.join(self._tmp_dir.name, 'manifest.json'))
+        self.talents = [dict(_VALID_TALENT, name=f'Talent_{index}') for index in range(3)]
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    def _run(self) -> tuple:
+        """Write self.talents, validate with the manifest; return (report, number of objects validated)."""
+        with open(self.json_path, 'w') as json_fp:
+            json.dump(self.talents, json_fp)
+        with mock.patch('json_validator._object_errors', wraps=json_validator._object_errors) as errors_mock:
+            report = json_validator._validate_all([self.json_path], jobs=1, manifest=self.manifest)
+        return report, errors_mock.call_count
+
+    @mock.patch.dict('json_validator._SCHEMA_REGISTRY', {'talents.json': 'talent_schema.json'})
+    def test_only_changed_objects(self) -> None:
+        """Test that unchanged files are skipped and only changed objects are re-validated."""
+        report, validated = self._run()
+        self.assertTrue(report.valid)
+        self.assertEqual(validated, 3)
+
+        report, validated = self._run()
+        self.assertTrue(report.valid)
+        self.assertEqual(validated, 0)
+
+        self.talents[1] = dict(self.talents[1], description='Changed.')
+        report, validated = self._run()
+        self.assertTrue(report.valid)
+        self.assertEqual(validated, 1)
+
+    @mock.patch.dict('json_validator._SCHEMA_REGISTRY', {'talents.json': 'talent_schema.json'})
+    def test_invalid_objects_rechecked(self) -> None:
+        """Test that an invalid file is re-validated on every run so its errors are reported."""
+        self.talents.append({'name': 'Invalid'})
+        report, validated = self._run()
+        self.assertFalse(report.valid)
+        self.assertEqual(validated, 4)
+
+        report, validated = self._run()
+        self.assertFalse(report.valid)
+        self.assertEqual(validated, 1)
+
+
+@mock.patch('builtins.print', mock.Mock(auto_spec=True))
+@mock.patch('sanity_checks.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('json_validator.LOGGER', mock.Mock(auto_spec=True))
+class TestRevalidate(unittest.TestCase):
+    """Test cases for _revalidate(), which --watch runs on every save."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_dir = os.path.join(self._tmp_dir.name, 'json')
+        os.mkdir(self.json_dir)
+        self.json_path = os.path.join(self.json_dir, 'talents.json')
+        self._patches = [
+            mock.patch('json_validator._JSON_DIR', self.json_dir),
+            mock.patch('utilities.get_cache_dir', mock.Mock(return_value=self._tmp_dir.name))
+        ]
+        for patch in self._patches:
+            patch.start()
+        self.file_cache = library_watcher.FileCache()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        for patch in self._patches:
+            patch.stop()
+        self._tmp_dir.cleanup()
+
+    def _write(self, text: str) -> None:
+        """Write text to self.json_path."""
+        with open(self.json_path, 'w') as json_fp:
+            json_fp.write(text)
+
+    def test_changed_file(self) -> None:
+        """Test that a saved file is validated and sanity checked from a single parse."""
+        self._write(json.dumps([_VALID_TALENT, dict(_VALID_TALENT, name='Epic', prerequisites={'level': 12})]))
+        with mock.patch('jsonc_loader.load', wraps=json_validator.jsonc_loader.load) as load_mock:
+            report = json_validator._revalidate([self.json_path], self.file_cache)
+        load_mock.assert_called_once_with(self.json_path)
+        self.assertEqual([(result.json_path, result.valid) for result in report.results], [(self.json_path, True)])
+        self.assertEqual([warning.object_name for warning in report.sanity_warnings], ['Epic'])
+
+    def test_changed_schema(self) -> None:
+        """Test that a saved schema re-validates every file that uses it."""
+        self._write(json.dumps([{'name': 'Invalid'}]))
+        report = json_validator._revalidate([_SCHEMA_PATH], self.file_cache, no_sanity=True)
+        self.assertEqual([(result.json_path, result.valid) for result in report.results], [(self.json_path, False)])
+
+    def test_unparsable_and_removed(self) -> None:
+        """Test that a half-written file is reported as invalid and a removed file is skipped."""
+        self._write('[{"name": ')
+        report = json_validator._revalidate([self.json_path], self.file_cache)
+        self.assertFalse(report.valid)
+
+        os.remove(self.json_path)
+        self.assertEqual(json_validator._revalidate([self.json_path], self.file_cache).results, [])
+
+
+@mock.patch('builtins.print', mock.Mock(auto_spec=True))
+@mock.patch('talent_graph.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('sanity_checks.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('json_validator.LOGGER', mock.Mock(auto_spec=True))
+class TestMain(unittest.TestCase):
+    """Test cases for main()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self._tmp_dir.name, 'talents.json')
+        self._patches = [
+            mock.patch('json_validator._JSON_DIR', self._tmp_dir.name),
+            mock.patch('utilities.get_cache_dir', mock.Mock(return_value=self._tmp_dir.name))
+        ]
+        for patch in self._patches:
+            patch.start()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        for patch in self._patches:
+            patch.stop()
+        self._tmp_dir.cleanup()
+
+    def test_schema_invalid_objects(self) -> None:
+        """Test that objects which fail the schema are reported, not passed on to the sanity checks to crash them."""
+        with open(self.json_path, 'w') as json_fp:
+            json.dump([dict(_VALID_TALENT, name=5), dict(_VALID_TALENT, name='High', prerequisites={'level': 'high'}),
+                       dict(_VALID_TALENT, name='Epic', prerequisites={'level': 12})], json_fp)
+        for argv in (['--all', '-n', '-j', '1'], ['-i', self.json_path, '-n']):
+            report = json_validator.main(argv)
+            self.assertFalse(report.valid, argv)
+            self.assertEqual([warning.object_name for warning in report.sanity_warnings], ['Epic'], argv)
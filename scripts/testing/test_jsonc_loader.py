@@ -0,0 +1,179 @@
+"""Unittests for jsonc_loader.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+import jsonc_loader
+
+_JSONC_TEXT = '''[
+    // Line comment with a "quote"
+    {"name": "http://not.a/comment", "value": -12.5e3}, /* block
+    comment */ "/* not a comment */",
+    [1, 2, {"nested": [true, false, null]}] // Trailing comment
+]
+'''
+"""JSONC text exercising comments, comment-like strings and nested values."""
+
+_EXPECTED = [
+    {'name': 'http://not.a/comment', 'value': -12.5e3},
+    '/* not a comment */',
+    [1, 2, {'nested': [True, False, None]}]
+]
+"""Parsed value of _JSONC_TEXT."""
+
+
+class TestIterArray(unittest.TestCase):
+    """Test cases for iter_array()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self._tmp_dir.name, 'test.json')
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    def _write(self, text: str) -> None:
+        """Write text to self.json_path."""
+        with open(self.json_path, 'w') as json_fp:
+            json_fp.write(text)
+
+    def test_chunk_sizes(self) -> None:
+        """Test that the result doesn't depend on where the file is split into chunks."""
+        self._write(_JSONC_TEXT)
+        for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+            self.assertEqual(list(jsonc_loader.iter_array(self.json_path, chunk_size)), _EXPECTED)
+
+    def test_empty_array(self) -> None:
+        """Test for an empty array surrounded by comments."""
+        self._write('// Nothing here\n[ /* nothing */ ]\n')
+        self.assertEqual(list(jsonc_loader.iter_array(self.json_path)), [])
+
+    def test_lazy(self) -> None:
+        """Test that the first item is available before the rest of the file is parsed."""
+        self._write('[{"first": 1},\n' + 'this is not JSON\n' * 100 + ']')
+        items = jsonc_loader.iter_array(self.json_path, chunk_size=16)
+        self.assertEqual(next(items), {'first': 1})
+        with self.assertRaises(jsonc_loader.JsoncError):
+            next(items)
+
+    def test_malformed(self) -> None:
+        """Test that malformed files raise JsoncError."""
+        for bad_text in ('{}', '[1 2]', '[1,', '[1] 2', '[1 /* unclosed'):
+            self._write(bad_text)
+            with self.assertRaises(jsonc_loader.JsoncError, msg=bad_text):
+                list(jsonc_loader.iter_array(self.json_path))
+
+
+class TestLoad(unittest.TestCase):
+    """Test cases for load() and its parsed-file cache."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self._tmp_dir.name, 'test.json')
+        self._get_cache_dir = mock.patch('utilities.get_cache_dir', mock.Mock(return_value=self._tmp_dir.name))
+        self._get_cache_dir.start()
+        self._write(_JSONC_TEXT)
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._get_cache_dir.stop()
+        self._tmp_dir.cleanup()
+
+    def _write(self, text: str, mtime_ns: int=None) -> None:
+        """Write text to self.json_path, optionally setting its mtime."""
+        with open(self.json_path, 'w') as json_fp:
+            json_fp.write(text)
+        if mtime_ns is not None:
+            os.utime(self.json_path, ns=(mtime_ns, mtime_ns))
+
+    def _load(self) -> tuple:
+        """Load self.json_path; return (value, number of times it was parsed)."""
+        with mock.patch('jsonc_loader.loads', wraps=jsonc_loader.loads) as loads_mock:
+            value = jsonc_loader.load(self.json_path)
+        return value, loads_mock.call_count
+
+    def test_cache(self) -> None:
+        """Test that a file is only parsed again when its content changes."""
+        self.assertEqual(self._load(), (_EXPECTED, 1))
+        self.assertEqual(self._load(), (_EXPECTED, 0))
+
+        # Same content with a new mtime is served from the cache
+        self._write(_JSONC_TEXT, mtime_ns=10**9)
+        self.assertEqual(self._load(), (_EXPECTED, 0))
+
+        self._write('[1, 2] // Changed')
+        self.assertEqual(self._load(), ([1, 2], 1))
+
+    def test_corrupt_cache(self) -> None:
+        """Test that a corrupt cache file is ignored and replaced."""
+        self._load()
+        with open(jsonc_loader._cache_path(self.json_path), 'wb') as cache_fp:
+            cache_fp.write(b'not a pickle')
+        self.assertEqual(self._load(), (_EXPECTED, 1))
+        self.assertEqual(self._load(), (_EXPECTED, 0))
+
+    def test_prune_cache(self) -> None:
+        """Test that cache entries of deleted files are pruned once a new entry is written."""
+        self._load()
+        old_cache_path = jsonc_loader._cache_path(self.json_path)
+        os.remove(self.json_path)
+        self.json_path = os.path.join(self._tmp_dir.name, 'other.json')
+        self._write(_JSONC_TEXT)
+        self._load()
+        self.assertFalse(os.path.exists(old_cache_path))
+        self.assertTrue(os.path.exists(jsonc_loader._cache_path(self.json_path)))
+        self.assertEqual(jsonc_loader.prune_cache(), 0)
+
+    def test_strip_comments(self) -> None:
+        """Test that the whole-text tokenizer matches the streaming parser."""
+        self.assertEqual(jsonc_loader.loads(_JSONC_TEXT), _EXPECTED)
+        self.assertEqual(jsonc_loader.loads('// Only a line comment\n{"a": "//"}'), {'a': '//'})
+        with self.assertRaises(jsonc_loader.JsoncError):
+            jsonc_loader.strip_comments('[1] /* unclosed')
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'Peak RSS is read from /proc/self/status.')
+class TestPeakMemory(unittest.TestCase):
+    """Test that streaming a large file uses much less memory than parsing it whole."""
+
+    _MEASURE_SCRIPT = '''
+import sys, json, jsonc_loader
+if sys.argv[2] == 'stream':
+    for _ in jsonc_loader.iter_array(sys.argv[1]):
+        pass
+else:
+    with open(sys.argv[1], 'r') as json_fp:
+        json_list = json.loads(jsonc_loader._strip_chunk(json_fp.read()))
+with open('/proc/self/status', 'r') as status_fp:
+    print(next(line.split()[1] for line in status_fp if line.startswith('VmHWM:')))
+'''
+    """Script run in a fresh interpreter to load a file and print its peak RSS (KiB).
+    NOTE: VmHWM is used rather than ru_maxrss, which Linux carries over from the parent across exec."""
+
+    def _peak_rss(self, json_path: str, mode: str) -> int:
+        """Return the peak RSS of a fresh interpreter loading json_path in mode 'stream' or 'whole'."""
+        output = subprocess.check_output([sys.executable, '-c', self._MEASURE_SCRIPT, json_path, mode],
+                                         cwd=os.path.dirname(jsonc_loader.__file__), encoding='UTF-8')
+        return int(output.strip())
+
+    def test_streaming_peak_rss(self) -> None:
+        """Test peak RSS of streaming vs. whole-file parsing for a ~10 MB file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, 'talents.json')
+            talent = {'name': 'Talent', 'description': 'Description. ' * 10, 'prerequisites': {'level': 1}}
+            with open(json_path, 'w') as json_fp:
+                json_fp.write('[\n')
+                for index in range(50000):
+                    json_fp.write(f'// Talent {index}\n{json.dumps(talent)},\n')
+                json_fp.write('{}')
+                json_fp.write('\n]\n')
+            stream_rss = self._peak_rss(json_path, 'stream')
+            whole_rss = self._peak_rss(json_path, 'whole')
+        self.assertLess(stream_rss * 2, whole_rss)
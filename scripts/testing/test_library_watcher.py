@@ -0,0 +1,108 @@
+"""Unittests for library_watcher.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+import library_watcher
+
+
+@mock.patch('library_watcher.LOGGER', mock.Mock(auto_spec=True))
+class TestWatchers(unittest.TestCase):
+    """Test cases for InotifyWatcher and PollingWatcher."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.watch_dir = self._tmp_dir.name
+        self.json_path = self._write('talents.json', [])
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    def _write(self, file_name: str, value) -> str:
+        """Write value as JSON to file_name under the watched dir and return its path."""
+        json_path = os.path.join(self.watch_dir, file_name)
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        with open(json_path, 'w') as json_fp:
+            json.dump(value, json_fp)
+        return json_path
+
+    def _check_watcher(self, watcher) -> None:
+        """Check that watcher reports saved, new and removed JSON files and ignores everything else."""
+        try:
+            self.assertEqual(watcher.wait(0.05), set())
+            self._write('talents.json', [{'name': 'Swift'}])
+            self.assertEqual(watcher.wait(1.0), {self.json_path})
+
+            with open(os.path.join(self.watch_dir, 'talents.json.swp'), 'w') as swap_fp:
+                swap_fp.write('swap')
+            new_path = self._write(os.path.join('extra', 'abilities.json'), [])
+            self.assertEqual(watcher.wait(1.0) | watcher.wait(0.1), {new_path})
+
+            os.remove(self.json_path)
+            self.assertEqual(watcher.wait(1.0), {self.json_path})
+        finally:
+            watcher.close()
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only available on Linux')
+    def test_inotify(self) -> None:
+        """Test the inotify watcher."""
+        self._check_watcher(library_watcher.InotifyWatcher([self.watch_dir]))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only available on Linux')
+    def test_inotify_errors(self) -> None:
+        """Test that a new dir that can't be watched doesn't stop the watcher, and a queue overflow rescans everything."""
+        watcher = library_watcher.InotifyWatcher([self.watch_dir])
+        try:
+            with mock.patch.object(watcher, '_add_watch', side_effect=library_watcher.WatcherError('limit reached')):
+                self._write(os.path.join('extra', 'abilities.json'), [])
+                watcher.wait(1.0)
+                watcher.wait(0.1)
+            overflow = library_watcher._EVENT.pack(-1, library_watcher._IN_Q_OVERFLOW, 0, 0)
+            with mock.patch('os.read', mock.Mock(return_value=overflow)):
+                self.assertEqual(watcher._read_events(), {self.json_path, os.path.join(self.watch_dir, 'extra', 'abilities.json')})
+        finally:
+            watcher.close()
+
+    def test_polling(self) -> None:
+        """Test the polling watcher."""
+        self._check_watcher(library_watcher.PollingWatcher([self.watch_dir], interval=0.005))
+
+    def test_fallback(self) -> None:
+        """Test that create_watcher() polls if inotify can't be set up."""
+        with mock.patch('library_watcher.InotifyWatcher', side_effect=library_watcher.WatcherError('unavailable')):
+            watcher = library_watcher.create_watcher([self.watch_dir])
+        self.assertIsInstance(watcher, library_watcher.PollingWatcher)
+
+    def test_watch_batches(self) -> None:
+        """Test that watch() passes each batch of changes to the callback, sorted."""
+        watcher = mock.Mock(auto_spec=True)
+        watcher.wait.side_effect = [{'b.json'}, {'a.json'}, set(), {'c.json'}, set()]
+        on_change = mock.Mock(auto_spec=True)
+        with mock.patch('library_watcher.create_watcher', mock.Mock(return_value=watcher)):
+            library_watcher.watch([self.watch_dir], on_change, max_batches=2)
+        self.assertEqual(on_change.call_args_list, [mock.call(['a.json', 'b.json']), mock.call(['c.json'])])
+        watcher.close.assert_called_once()
+
+
+class TestFileCache(unittest.TestCase):
+    """Test cases for FileCache."""
+
+    def test_reparse_on_change(self) -> None:
+        """Test that a file is only parsed again once it changes."""
+        with tempfile.TemporaryDirectory() as tmp_path, \
+                mock.patch('utilities.get_cache_dir', mock.Mock(return_value=tmp_path)):
+            json_path = os.path.join(tmp_path, 'talents.json')
+            with open(json_path, 'w') as json_fp:
+                json.dump([1], json_fp)
+            file_cache = library_watcher.FileCache()
+            first = file_cache.load(json_path)
+            self.assertIs(file_cache.load(json_path), first)
+
+            with open(json_path, 'w') as json_fp:
+                json.dump([1, 2], json_fp)
+            self.assertEqual(file_cache.load(json_path), [1, 2])
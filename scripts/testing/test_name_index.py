@@ -0,0 +1,40 @@
+"""Unittests for name_index.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import unittest
+import name_index
+
+_NAMES = ['Swift_I', 'Swift_II', 'Pugilist', 'Archer', 'Advanced Weapon Training (Bows)', 'Advanced Weapon Training (Axes)']
+"""Names for testing."""
+
+
+class TestNameIndex(unittest.TestCase):
+    """Test cases for NameIndex."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self.index = name_index.NameIndex(_NAMES + ['swift i'])
+
+    def test_trigrams(self) -> None:
+        """Test that words are padded separately."""
+        self.assertEqual(name_index.trigrams('Swift_I'), {'  s', ' sw', 'swi', 'wif', 'ift', 'ft ', '  i', ' i '})
+        self.assertEqual(name_index.trigrams('SWIFT-i'), name_index.trigrams('Swift_I'))
+
+    def test_resolve(self) -> None:
+        """Test exact lookups that ignore case and separators."""
+        self.assertEqual(len(self.index), len(_NAMES))
+        self.assertEqual(self.index.resolve('swift i'), 'Swift_I')
+        self.assertEqual(self.index.resolve('advanced_weapon_training_bows'), 'Advanced Weapon Training (Bows)')
+        self.assertIn('PUGILIST', self.index)
+        self.assertIsNone(self.index.resolve('Pugilst'))
+
+    def test_suggest(self) -> None:
+        """Test that typos get the closest names, most similar first."""
+        suggestions = self.index.suggest('Pugilst')
+        self.assertEqual(suggestions[0].name, 'Pugilist')
+        self.assertGreater(suggestions[0].similarity, 0.5)
+        names = [suggestion.name for suggestion in self.index.suggest('advanced_weapon_training_bow', limit=2)]
+        self.assertEqual(names, ['Advanced Weapon Training (Bows)', 'Advanced Weapon Training (Axes)'])
+        self.assertEqual(self.index.suggest('Zzyzx'), [])
+        self.assertEqual(self.index.best_match('swift_iii'), 'Swift_II')
+        self.assertEqual(self.index.best_match('Archer'), 'Archer')
+        self.assertIsNone(self.index.best_match('Zzyzx'))
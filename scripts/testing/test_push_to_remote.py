@@ -64,6 +64,7 @@ class TestMain(unittest.TestCase):
         """Test for main() with clean worktree."""
         push_to_remote.main(self.args)
         utilities.run_command.assert_called_once()
+        run_test.main.assert_called_once_with(['-t', 'all', '--affected', 'origin/some_branch'])
 
 
     def test_with_branch_name_main(self) -> None:
@@ -0,0 +1,23 @@
+"""Unittests for query_database.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import unittest
+from unittest import mock
+import query_database
+
+
+@mock.patch('query_database.LOGGER', mock.Mock(auto_spec=True))
+class TestProcessArgs(unittest.TestCase):
+    """Test cases for _process_args()."""
+
+    def test_eligible(self) -> None:
+        """Test that -e scores are parsed into a dict."""
+        args = query_database._process_args(['damage', '-e', 'str=2', '-e', 'dex=-1'])
+        self.assertEqual(args.text, 'damage')
+        self.assertEqual(args.eligible, {'str': 2, 'dex': -1})
+        self.assertIsNone(query_database._process_args([]).eligible)
+
+    def test_bad_scores(self) -> None:
+        """Test that malformed scores are rejected."""
+        for score in ('foo=1', 'str', 'str=high'):
+            with self.assertRaises(query_database.QueryError):
+                query_database._process_args(['-e', score])
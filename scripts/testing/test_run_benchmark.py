@@ -0,0 +1,44 @@
+"""Unittests for run_benchmark.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import tempfile
+import unittest
+import run_benchmark
+
+
+class TestBaselines(unittest.TestCase):
+    """Test cases for saving baselines and finding regressions."""
+
+    def test_metric_direction(self) -> None:
+        """Test that the direction of a metric is read from its name."""
+        self.assertEqual(run_benchmark._metric_direction('validate_secs'), -1)
+        self.assertEqual(run_benchmark._metric_direction('1000_talents_usecs_per_talent'), -1)
+        self.assertEqual(run_benchmark._metric_direction('db_mb'), -1)
+        self.assertEqual(run_benchmark._metric_direction('validate_objs_per_sec'), 1)
+        self.assertEqual(run_benchmark._metric_direction('characters_per_sec_2_jobs'), 1)
+        self.assertEqual(run_benchmark._metric_direction('warm_cache_speedup'), 1)
+        self.assertEqual(run_benchmark._metric_direction('outliers'), 0)
+
+    def test_find_regressions(self) -> None:
+        """Test that only metrics worse than the threshold in their own direction are regressions."""
+        baseline = {'bench.a': {'load_secs': 1.0, 'objs_per_sec': 100.0, 'outliers': 3, 'speedup': 2.0}}
+        results = {
+            'bench.a': {'load_secs': 1.3, 'objs_per_sec': 85.0, 'outliers': 30, 'speedup': 4.0},
+            'bench.new': {'load_secs': 9.0}
+        }
+        self.assertEqual(run_benchmark._find_regressions(results, baseline, 0.2), [('bench.a', 'load_secs', 1.0, 1.3)])
+        self.assertEqual(run_benchmark._find_regressions(results, baseline, 0.1),
+                         [('bench.a', 'load_secs', 1.0, 1.3), ('bench.a', 'objs_per_sec', 100.0, 85.0)])
+
+    def test_save_baseline(self) -> None:
+        """Test that saving a baseline keeps the baselines of other counts and benchmarks."""
+        with tempfile.TemporaryDirectory() as tmp_path:
+            baseline_path = os.path.join(tmp_path, 'baselines.json')
+            self.assertEqual(run_benchmark._load_baselines(baseline_path), {})
+            run_benchmark._save_baseline(baseline_path, 10, {'bench.a': {'x_secs': 1.0}})
+            run_benchmark._save_baseline(baseline_path, 10, {'bench.b': {'x_secs': 2.0}})
+            run_benchmark._save_baseline(baseline_path, 20, {'bench.a': {'x_secs': 3.0}})
+            self.assertEqual(run_benchmark._load_baselines(baseline_path), {
+                '10': {'bench.a': {'x_secs': 1.0}, 'bench.b': {'x_secs': 2.0}},
+                '20': {'bench.a': {'x_secs': 3.0}}
+            })
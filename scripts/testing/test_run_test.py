@@ -0,0 +1,109 @@
+"""Unittests for run_test.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import run_test
+
+
+class TestAffectedTests(unittest.TestCase):
+    """Test cases for _import_graph() and _affected_tests()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        scripts_dir = self._tmp_dir.name
+        os.mkdir(os.path.join(scripts_dir, 'testing'))
+        sources = {
+            'utilities.py': 'import os\n',
+            'talent_db.py': 'import utilities\n',
+            'talent_graph.py': 'import talent_db\n',
+            'setup.py': 'from utilities import get_root_dir\n',
+            os.path.join('testing', 'test_talent_graph.py'): 'import unittest\nimport talent_graph\n',
+            os.path.join('testing', 'test_setup.py'): 'def test():\n    import setup\n'
+        }
+        for file_name, source in sources.items():
+            with open(os.path.join(scripts_dir, file_name), 'w') as py_fp:
+                py_fp.write(source)
+        self.graph = run_test._import_graph(scripts_dir)
+        self.test_modules = ['test_setup', 'test_talent_graph']
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._tmp_dir.cleanup()
+
+    def test_import_graph(self) -> None:
+        """Test that only imports of modules under scripts/ are kept, wherever the import is."""
+        self.assertEqual(self.graph['utilities'], set())
+        self.assertEqual(self.graph['setup'], {'utilities'})
+        self.assertEqual(self.graph['test_setup'], {'setup'})
+        self.assertEqual(self.graph['test_talent_graph'], {'talent_graph'})
+
+    def test_affected(self) -> None:
+        """Test that a change affects every test that imports it directly or indirectly."""
+        self.assertEqual(run_test._affected_tests(['scripts/talent_db.py'], self.test_modules, self.graph), ['test_talent_graph'])
+        self.assertEqual(run_test._affected_tests(['scripts/utilities.py'], self.test_modules, self.graph), self.test_modules)
+        self.assertEqual(run_test._affected_tests(['scripts/testing/test_setup.py'], self.test_modules, self.graph), ['test_setup'])
+        self.assertEqual(run_test._affected_tests(['README.md', 'library/json/talents.json'], self.test_modules, self.graph), [])
+        self.assertEqual(run_test._affected_tests(['library/schemas/talent_schema.json'], self.test_modules, self.graph), self.test_modules)
+
+    def test_deleted_module(self) -> None:
+        """Test that deleting a module affects every test, since its importers can't be found any more."""
+        os.remove(os.path.join(self._tmp_dir.name, 'talent_db.py'))
+        graph = run_test._import_graph(self._tmp_dir.name)
+        self.assertEqual(run_test._affected_tests(['scripts/talent_db.py'], self.test_modules, graph), self.test_modules)
+
+
+class TestSchedule(unittest.TestCase):
+    """Test cases for _schedule()."""
+
+    def test_slowest_first(self) -> None:
+        """Test that modules are ordered by their total recorded time, unknown modules first."""
+        timings = {'test_a.TestA.test_one': 0.5, 'test_a.TestA.test_two': 0.5, 'test_b.TestB.test_one': 2.0}
+        self.assertEqual(run_test._schedule(['test_a', 'test_b', 'test_new'], timings), ['test_new', 'test_b', 'test_a'])
+
+
+@mock.patch('run_test.LOGGER', mock.Mock(auto_spec=True))
+class TestRunTests(unittest.TestCase):
+    """Test cases for _run_module() and _run_tests()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.test_dir = os.path.join(self._tmp_dir.name, 'testing')
+        os.mkdir(self.test_dir)
+        with open(os.path.join(self.test_dir, 'test_sample.py'), 'w') as py_fp:
+            py_fp.write('import unittest\n\n'
+                        'class TestSample(unittest.TestCase):\n'
+                        '    def test_pass(self):\n        pass\n\n'
+                        '    def test_fail(self):\n        self.fail("Broken")\n')
+        self._get_cache_dir = mock.patch('utilities.get_cache_dir', mock.Mock(return_value=self._tmp_dir.name))
+        self._get_cache_dir.start()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._get_cache_dir.stop()
+        # Discovery imports the sample module from the temp dir; forget it so the next test gets a fresh one
+        sys.modules.pop('test_sample', None)
+        if self.test_dir in sys.path:
+            sys.path.remove(self.test_dir)
+        self._tmp_dir.cleanup()
+
+    def test_run_module(self) -> None:
+        """Test that a module's results are reduced to picklable ids and every test is timed."""
+        result = run_test._run_module('test_sample', self.test_dir)
+        self.assertEqual(result.tests_run, 2)
+        self.assertEqual([test_id for test_id, _ in result.failures], ['test_sample.TestSample.test_fail'])
+        self.assertEqual(set(result.durations), {'test_sample.TestSample.test_fail', 'test_sample.TestSample.test_pass'})
+
+    def test_timings_recorded(self) -> None:
+        """Test that a run replaces the recorded times of the modules it ran and keeps the others."""
+        run_test._save_timings({'test_sample.TestSample.test_removed': 1.0, 'test_other.TestOther.test_one': 1.0})
+        module_result = run_test._run_module('test_sample', self.test_dir)
+        with mock.patch('run_test._run_module', mock.Mock(auto_spec=True, return_value=module_result)):
+            report = run_test._run_tests(['test_sample'], jobs=1)
+        self.assertEqual(len(report.failures), 1)
+        self.assertEqual(set(run_test._load_timings()), {'test_other.TestOther.test_one', 'test_sample.TestSample.test_fail',
+                                                         'test_sample.TestSample.test_pass'})
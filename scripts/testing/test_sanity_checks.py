@@ -0,0 +1,132 @@
+"""Unittests for sanity_checks.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+import sanity_checks
+
+
+@mock.patch('talent_graph.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('statblocks.LOGGER', mock.Mock(auto_spec=True))
+@mock.patch('sanity_checks.LOGGER', mock.Mock(auto_spec=True))
+class TestRunChecks(unittest.TestCase):
+    """Test cases for LibraryContext and run_checks()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_dir = os.path.join(self._tmp_dir.name, 'json')
+        os.mkdir(self.json_dir)
+        self._get_cache_dir = mock.patch('utilities.get_cache_dir', mock.Mock(return_value=self._tmp_dir.name))
+        self._get_cache_dir.start()
+        self._write('ancestries', [{'name': 'Dwarf'}])
+        self._write('talents', [
+            {'name': 'Swift_I', 'prerequisites': {'level': 1}},
+            {'name': 'Swift_II', 'prerequisites': {'level': 2, 'other_talents': ['Swift_I']}},
+            {'name': 'Stone Skin', 'prerequisites': {'level': 1, 'ancestry': 'dwarf', 'attributes': {'bod': 2}}}
+        ])
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._get_cache_dir.stop()
+        self._tmp_dir.cleanup()
+
+    def _write(self, collection: str, json_list: list) -> str:
+        """Write json_list to <collection>.json in the temp library and return its path."""
+        json_path = os.path.join(self.json_dir, collection + '.json')
+        with open(json_path, 'w') as json_fp:
+            json.dump(json_list, json_fp)
+        return json_path
+
+    def _messages(self, json_paths: list=None) -> list:
+        """Load the temp library, run every check and return (object name, message) pairs."""
+        context = sanity_checks.LibraryContext(self.json_dir)
+        return [(warning.object_name, warning.message) for warning in sanity_checks.run_checks(context, json_paths)]
+
+    def test_clean_library(self) -> None:
+        """Test that a consistent library has no warnings."""
+        self.assertEqual(self._messages(), [])
+
+    def test_talent_checks(self) -> None:
+        """Test the level, ancestry and talent reference checks."""
+        self._write('talents', [
+            {'name': 'Zero', 'prerequisites': {'level': 0}},
+            {'name': 'Epic', 'prerequisites': {'level': 12}},
+            {'name': 'Elf Eyes', 'prerequisites': {'level': 1, 'ancestry': 'Elf'}},
+            {'name': 'Orphan', 'prerequisites': {'level': 1, 'other_talents': ['Missing']}},
+            {'name': 'Loop', 'prerequisites': {'level': 1, 'other_talents': ['Loop']}},
+            {'name': 'zero', 'prerequisites': {'level': 1}}
+        ])
+        messages = self._messages()
+        self.assertIn(('Zero', 'Level prerequisite is 0; talents should be level 1 or higher.'), messages)
+        self.assertIn(('Epic', 'Level prerequisite is 12, above the standard maximum of 10.'), messages)
+        self.assertIn(('Elf Eyes', 'Ancestry prerequisite "Elf" is not a known ancestry.'), messages)
+        self.assertIn(('Orphan', 'Talent prerequisite "Missing" is not a known talent.'), messages)
+        self.assertIn(('Loop', 'Talent prerequisites form a cycle, so this talent can never be taken.'), messages)
+        self.assertIn(('zero', 'Another talent has the same name.'), messages)
+        self.assertEqual(len(messages), 6)
+
+    def test_suggestions(self) -> None:
+        """Test that unknown names come with the closest known name."""
+        self._write('talents', [
+            {'name': 'Swift_I', 'prerequisites': {'level': 1}},
+            {'name': 'Swift_II', 'prerequisites': {'level': 2, 'other_talents': ['swift_1']}},
+            {'name': 'Stone Skin', 'prerequisites': {'level': 1, 'ancestry': 'Dwarves'}}
+        ])
+        self.assertEqual(self._messages(), [
+            ('Swift_II', 'Talent prerequisite "swift_1" is not a known talent. Did you mean "Swift_I"?'),
+            ('Stone Skin', 'Ancestry prerequisite "Dwarves" is not a known ancestry. Did you mean "Dwarf"?')
+        ])
+
+    def test_character_sheets(self) -> None:
+        """Test that talents on character sheets must exist and have their prerequisites met."""
+        self._write('character_sheets', [
+            {'name': 'Valid', 'level': 2, 'ancestry': 'Dwarf', 'attributes': {'bod': {'score': 2}},
+             'talents': ['Swift_I', 'Swift_II', 'Stone_Skin']},
+            {'name': 'Invalid', 'level': 1, 'ancestry': 'Human', 'attributes': {'bod': 1},
+             'talents': ['Swift_II', 'Stone Skin', 'Flight']}
+        ])
+        self.assertEqual(self._messages(), [
+            ('Invalid', 'Talent "Swift_II" requires level 2.'),
+            ('Invalid', 'Talent "Swift_II" requires talent(s) [\'Swift_I\'].'),
+            ('Invalid', 'Talent "Stone Skin" requires the dwarf ancestry.'),
+            ('Invalid', 'Talent "Stone Skin" requires bod 2.'),
+            ('Invalid', 'Talent "Flight" is not a known talent.')
+        ])
+
+    def test_statblocks(self) -> None:
+        """Test that statblocks with unusual stats for their level and role get a warning."""
+        statblock_list = [{'name': f'Rat_{index}', 'stats': {'level': 1, 'role': 'minion', 'hp': 5, 'armor': 1}} for index in range(4)]
+        statblock_list.append({'name': 'Giant', 'stats': {'level': 1, 'role': 'minion', 'hp': 50, 'armor': 1}})
+        self._write('statblocks', statblock_list)
+        messages = self._messages()
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0][0], 'Giant')
+        self.assertTrue(messages[0][1].startswith('hp 50 is high'))
+
+    def test_json_paths(self) -> None:
+        """Test that only objects from the requested files are reported on."""
+        talents_path = self._write('talents', [{'name': 'Zero', 'prerequisites': {'level': 0}}])
+        ancestries_path = os.path.join(self.json_dir, 'ancestries.json')
+        self.assertEqual(self._messages([ancestries_path]), [])
+        self.assertEqual(len(self._messages([talents_path])), 1)
+
+    def test_bad_files(self) -> None:
+        """Test that unparseable and non-list files are skipped with a warning instead of aborting the run."""
+        with open(os.path.join(self.json_dir, 'broken.json'), 'w') as json_fp:
+            json_fp.write('[{"name": "Half"')
+        self._write('settings', {'name': 'Not a list'})
+        with mock.patch('sanity_checks.LOGGER') as logger_mock:
+            context = sanity_checks.LibraryContext(self.json_dir)
+        self.assertEqual(sorted(context.collections), ['ancestries', 'talents'])
+        self.assertEqual(logger_mock.warning.call_count, 2)
+        self.assertEqual(sanity_checks.run_checks(context), [])
+
+    def test_register_check(self) -> None:
+        """Test that registered checks run once per object of their collection."""
+        check = mock.Mock(return_value=['Problem'])
+        with mock.patch.dict(sanity_checks._CHECKS, {'ancestries': [check]}):
+            self.assertIn(('Dwarf', 'Problem'), self._messages())
+        check.assert_called_once()
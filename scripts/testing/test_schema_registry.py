@@ -0,0 +1,113 @@
+"""Unittests for schema_registry.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+import jsonschema
+import utilities
+import schema_registry
+
+_ATTRIBUTE_SCHEMA = {
+    '$schema': 'https://json-schema.org/draft/2020-12/schema',
+    '$defs': {'score_def': {'type': 'integer', 'minimum': -3}},
+    'type': 'object',
+    'additionalProperties': {'$ref': '#/$defs/score_def'}
+}
+"""Schema with no cross-file $refs."""
+
+_SHEET_SCHEMA = {
+    '$schema': 'https://json-schema.org/draft/2020-12/schema',
+    'type': 'object',
+    'properties': {
+        'attributes': {'$ref': 'attribute_schema.json'},
+        'talents': {'type': 'array', 'items': {'$ref': 'talent_schema.json#/$defs/name_def'}}
+    }
+}
+"""Schema that refers to both other schemas."""
+
+_TALENT_SCHEMA = {
+    '$schema': 'https://json-schema.org/draft/2020-12/schema',
+    '$defs': {'name_def': {'type': 'string', 'minLength': 1}},
+    'type': 'object',
+    'properties': {'name': {'$ref': '#/$defs/name_def'}, 'attributes': {'$ref': 'attribute_schema.json'}}
+}
+"""Schema that refers to attribute_schema.json."""
+
+
+@mock.patch('schema_registry.LOGGER', mock.Mock(auto_spec=True))
+class TestSchemaRegistry(unittest.TestCase):
+    """Test cases for SchemaRegistry and get_validator()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.schema_dir = self._tmp_dir.name
+        self._write('attribute_schema.json', _ATTRIBUTE_SCHEMA)
+        self._write('sheet_schema.json', _SHEET_SCHEMA)
+        self._write('talent_schema.json', _TALENT_SCHEMA)
+        schema_registry.clear()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        schema_registry.clear()
+        self._tmp_dir.cleanup()
+
+    def _write(self, name: str, schema: dict) -> str:
+        """Write schema to name under the schema dir and return its path."""
+        schema_path = os.path.join(self.schema_dir, name)
+        with open(schema_path, 'w') as schema_fp:
+            json.dump(schema, schema_fp)
+        return schema_path
+
+    def test_cross_file_refs(self) -> None:
+        """Test that $refs to other schema files resolve, including a fragment inside another file."""
+        validator = schema_registry.get_validator(os.path.join(self.schema_dir, 'sheet_schema.json'))
+        self.assertTrue(validator.is_valid({'attributes': {'str': 2}, 'talents': ['Swift']}))
+        self.assertFalse(validator.is_valid({'attributes': {'str': -9}}))
+        self.assertFalse(validator.is_valid({'talents': ['']}))
+
+    def test_cached(self) -> None:
+        """Test that schemas are parsed once per dir and each validator is compiled once."""
+        sheet_path = os.path.join(self.schema_dir, 'sheet_schema.json')
+        with mock.patch('jsonc_loader.loads', wraps=schema_registry.jsonc_loader.loads) as loads_mock:
+            first = schema_registry.get_validator(sheet_path)
+            schema_registry.get_validator(os.path.join(self.schema_dir, 'talent_schema.json'))
+            self.assertIs(schema_registry.get_validator(sheet_path), first)
+        self.assertEqual(loads_mock.call_count, 3)
+
+    def test_schema_change(self) -> None:
+        """Test that changing any schema in the dir rebuilds the registry, with the new definitions."""
+        sheet_path = os.path.join(self.schema_dir, 'sheet_schema.json')
+        first = schema_registry.get_validator(sheet_path)
+        old_hash = schema_registry.schema_hash(sheet_path)
+        self._write('attribute_schema.json', dict(_ATTRIBUTE_SCHEMA, **{'$defs': {'score_def': {'type': 'integer', 'minimum': -10}}}))
+        second = schema_registry.get_validator(sheet_path)
+        self.assertIsNot(second, first)
+        self.assertTrue(second.is_valid({'attributes': {'str': -9}}))
+        self.assertNotEqual(schema_registry.schema_hash(sheet_path), old_hash)
+
+    def test_dependencies(self) -> None:
+        """Test the schemas each schema depends on and is depended on by."""
+        registry = schema_registry.get_registry(self.schema_dir)
+        self.assertEqual(registry.dependencies('sheet_schema.json'), {'sheet_schema.json', 'talent_schema.json', 'attribute_schema.json'})
+        self.assertEqual(registry.dependents('attribute_schema.json'), {'sheet_schema.json', 'talent_schema.json', 'attribute_schema.json'})
+        self.assertEqual(registry.dependents('sheet_schema.json'), {'sheet_schema.json'})
+
+    def test_hash_without_refs(self) -> None:
+        """Test that the hash of a schema without cross-file $refs is the hash of its file."""
+        attribute_path = os.path.join(self.schema_dir, 'attribute_schema.json')
+        self.assertEqual(schema_registry.schema_hash(attribute_path), utilities.hash_file(attribute_path))
+
+    def test_dangling_ref(self) -> None:
+        """Test that a $ref to a missing schema fails when the validator is compiled."""
+        broken_path = self._write('broken_schema.json', {'properties': {'x': {'$ref': 'missing_schema.json'}}})
+        with self.assertRaises(schema_registry.SchemaRegistryError):
+            schema_registry.get_validator(broken_path)
+
+    def test_invalid_schema(self) -> None:
+        """Test that a schema that breaks its metaschema is a SchemaError."""
+        invalid_path = self._write('invalid_schema.json', {'type': 'nonsense'})
+        with self.assertRaises(jsonschema.exceptions.SchemaError):
+            schema_registry.get_validator(invalid_path)
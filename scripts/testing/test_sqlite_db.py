@@ -0,0 +1,86 @@
+"""Unittests for sqlite_db.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+import sqlite_db
+
+_COLLECTIONS = {
+    'talents': [
+        {'name': 'Swift_I', 'description': 'Your **speed** increases by 5 feet.',
+         'prerequisites': {'level': 1, 'attributes': {'dex': 2}}},
+        {'name': 'Archer', 'description': 'The target takes an extra **2** damage.',
+         'prerequisites': {'level': 2, 'other_talents': ['Swift_I']}},
+        {'name': 'Pugilist', 'description': 'The base damage for your unarmed strikes is **1d6 + Str**.',
+         'prerequisites': {'level': 1, 'attributes': {'str': 2}}},
+        {'name': 'Stone Skin', 'description': 'Your skin turns to stone.',
+         'prerequisites': {'level': 4, 'ancestry': 'Dwarf', 'attributes': {'bod': 3, 'str': 1}}}
+    ],
+    'statblocks': [
+        {'name': 'Ogre', 'description': 'Big, angry, and hungry for damage.', 'stats': {'level': 3, 'role': 'brute', 'hp': 45, 'armor': 2}}
+    ]
+}
+"""Small library for testing."""
+
+
+@mock.patch('sqlite_db.LOGGER', mock.Mock(auto_spec=True))
+class TestSqliteDatabase(unittest.TestCase):
+    """Test cases for write_database(), connect() and search()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, 'library.sqlite')
+        sqlite_db.write_database(_COLLECTIONS, self.db_path)
+        self.connection = sqlite_db.connect(self.db_path)
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self.connection.close()
+        self._tmp_dir.cleanup()
+
+    def _names(self, **kwargs) -> list:
+        """Run a search and return the names of the results."""
+        return [result.name for result in sqlite_db.search(self.connection, **kwargs)]
+
+    def test_text_search(self) -> None:
+        """Test full-text search over names and markdown descriptions."""
+        self.assertEqual(self._names(text='unarmed'), ['Pugilist'])
+        self.assertEqual(self._names(text='**2** damage'), ['Archer'])
+        self.assertEqual(self._names(text='stone skin'), ['Stone Skin'])
+        self.assertEqual(sorted(self._names(text='damage')), ['Archer', 'Ogre', 'Pugilist'])
+        self.assertEqual(self._names(text='damage', collection='statblocks'), ['Ogre'])
+        result = sqlite_db.search(self.connection, text='speed')[0]
+        self.assertEqual(result.snippet, 'Your **[speed]** increases by 5 feet.')
+
+    def test_filters(self) -> None:
+        """Test level and prerequisite filters."""
+        self.assertEqual(self._names(collection='talents', level=1), ['Pugilist', 'Swift_I'])
+        self.assertEqual(self._names(max_level=3), ['Ogre', 'Pugilist', 'Swift_I', 'Archer'])
+        self.assertEqual(self._names(ancestry='DWARF'), ['Stone Skin'])
+        self.assertEqual(self._names(requires=('str',)), ['Pugilist', 'Stone Skin'])
+        self.assertEqual(self._names(requires=('str', 'bod')), ['Stone Skin'])
+        self.assertEqual(self._names(eligible={'str': 2}), ['Pugilist', 'Archer'])
+        self.assertEqual(self._names(eligible={'str': 1, 'bod': 3, 'dex': 2}), ['Swift_I', 'Archer', 'Stone Skin'])
+        self.assertEqual(self._names(text='damage', eligible={}), ['Archer'])
+        self.assertEqual(len(self._names(limit=2)), 2)
+
+    def test_prerequisite_tables(self) -> None:
+        """Test the per-talent prerequisite tables."""
+        rows = self.connection.execute('SELECT prerequisite FROM talent_prerequisites').fetchall()
+        self.assertEqual(rows, [('Swift_I',)])
+        count = self.connection.execute('SELECT COUNT(*) FROM talent_attributes').fetchone()[0]
+        self.assertEqual(count, 4)
+
+    def test_connect(self) -> None:
+        """Test that missing and outdated databases are rejected, and that connections are read-only."""
+        with self.assertRaises(sqlite_db.SqliteDatabaseError):
+            sqlite_db.connect(os.path.join(self._tmp_dir.name, 'missing.sqlite'))
+        with self.assertRaises(sqlite3.OperationalError):
+            self.connection.execute('DELETE FROM objects')
+        old_path = os.path.join(self._tmp_dir.name, 'old.sqlite')
+        sqlite3.connect(old_path).close()
+        with self.assertRaises(sqlite_db.SqliteDatabaseError):
+            sqlite_db.connect(old_path)
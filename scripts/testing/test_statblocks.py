@@ -0,0 +1,119 @@
+"""Unittests for statblocks.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+import numpy
+import statblocks
+
+
+def _statblock(name: str, level: int, role: str, hp: int, armor: int=2, damage: float=None) -> dict:
+    """Return a minimal statblock."""
+    stats = {'level': level, 'role': role, 'hp': hp, 'armor': armor}
+    if damage is not None:
+        stats['damage'] = damage
+    return {'name': name, 'stats': stats}
+
+
+_STATBLOCKS = [
+    _statblock('Rat', 1, 'Skirmisher', 10, damage=3),
+    _statblock('Bandit', 1, 'skirmisher', 11, damage=4),
+    _statblock('Goblin', 1, 'skirmisher', 9, damage=3),
+    _statblock('Wolf', 1, 'skirmisher', 10, damage=4),
+    _statblock('Tank', 1, 'skirmisher', 40, armor=9),
+    _statblock('Thug', 1, 'brute', 14, damage=5),
+    _statblock('Ogre', 3, 'brute', 45, damage=12)
+]
+"""Small statblock library for testing."""
+
+
+@mock.patch('statblocks.LOGGER', mock.Mock(auto_spec=True))
+class TestStatblockLibrary(unittest.TestCase):
+    """Test cases for StatblockLibrary and its tables."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self.library = statblocks.StatblockLibrary(_STATBLOCKS)
+
+    def test_tables(self) -> None:
+        """Test the per-(level, role) totals."""
+        tables = self.library.tables
+        self.assertEqual(tables['levels'].tolist(), [1, 3])
+        self.assertEqual(tables['roles'].tolist(), ['brute', 'skirmisher'])
+        skirmishers = 1
+        self.assertEqual(tables['count'][skirmishers].tolist(), [5, 5, 4])
+        self.assertEqual(tables['sum'][skirmishers].tolist(), [80, 17, 14])
+        self.assertEqual(tables['squares'][skirmishers, 0], 100 + 121 + 81 + 100 + 1600)
+
+    def test_outliers(self) -> None:
+        """Test that outliers are scored against the rest of their group, leaving themselves out."""
+        outliers = {(outlier.name, outlier.stat): outlier for outlier in self.library.outliers()}
+        self.assertEqual(sorted(outliers), [('Tank', 'armor'), ('Tank', 'hp')])
+        self.assertEqual(outliers[('Tank', 'hp')].expected, 10.0)
+        self.assertGreater(outliers[('Tank', 'hp')].z_score, 2.0)
+        self.assertIn('"Tank": hp 40 is high', str(outliers[('Tank', 'hp')]))
+
+    def test_fallbacks(self) -> None:
+        """Test the level fallback for small groups, and that lone levels and missing stats aren't scored."""
+        means, _ = self.library.expected()
+        thug, ogre, tank = 5, 6, 4
+        self.assertEqual(means[thug, 0], 80 / 5)  # Only brute at level 1, so compared with the whole level
+        self.assertTrue(numpy.isnan(means[ogre]).all())
+        self.assertTrue(numpy.isnan(self.library.z_scores()[tank, 2]))
+
+    def test_non_numeric_stat(self) -> None:
+        """Test that a stat that isn't a number is left out instead of breaking the tables."""
+        bad = _statblock('Scarecrow', 1, 'skirmisher', 'ten', damage=3)
+        library = statblocks.StatblockLibrary(_STATBLOCKS + [bad])
+        self.assertTrue(numpy.isnan(library.stats[-1, 0]))
+        self.assertEqual(library.stats[-1, 1], 2)
+        self.assertEqual(library.tables['count'][1].tolist(), [5, 6, 5])
+        self.assertEqual(sorted((outlier.name, outlier.stat) for outlier in library.outliers()), [('Tank', 'armor'), ('Tank', 'hp')])
+
+    def test_non_string_role(self) -> None:
+        """Test that a statblock with a role that isn't a string is skipped instead of breaking the tables."""
+        bad = _statblock('Golem', 1, 3, 500)
+        library = statblocks.StatblockLibrary(_STATBLOCKS + [bad])
+        self.assertEqual(library.names, [statblock['name'] for statblock in _STATBLOCKS])
+        self.assertEqual(library.tables['roles'].tolist(), ['brute', 'skirmisher'])
+        self.assertEqual(library.tables['count'][1].tolist(), [5, 5, 4])
+        self.assertNotIn('Golem', [outlier.name for outlier in library.outliers()])
+
+
+@mock.patch('statblocks.LOGGER', mock.Mock(auto_spec=True))
+class TestLoadTables(unittest.TestCase):
+    """Test cases for load_tables()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self._tmp_dir.name, 'statblocks.json')
+        self._write(_STATBLOCKS)
+        self._get_cache_dir = mock.patch('utilities.get_cache_dir', mock.Mock(return_value=self._tmp_dir.name))
+        self._get_cache_dir.start()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._get_cache_dir.stop()
+        self._tmp_dir.cleanup()
+
+    def _write(self, statblock_list: list) -> None:
+        """Write statblock_list to the temp library."""
+        with open(self.json_path, 'w') as json_fp:
+            json.dump(statblock_list, json_fp)
+
+    def test_recompute_on_change(self) -> None:
+        """Test that tables are only recomputed when the library changes."""
+        with mock.patch('statblocks.compute_tables', wraps=statblocks.compute_tables) as compute:
+            first = statblocks.StatblockLibrary.from_file(self.json_path)
+            second = statblocks.StatblockLibrary.from_file(self.json_path)
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(second.tables['roles'].tolist(), first.tables['roles'].tolist())
+            self.assertEqual(second.tables['sum'].tolist(), first.tables['sum'].tolist())
+
+            self._write(_STATBLOCKS[:3])
+            third = statblocks.StatblockLibrary.from_file(self.json_path)
+            self.assertEqual(compute.call_count, 2)
+            self.assertEqual(third.tables['count'].sum(axis=0).tolist(), [3, 3, 3])
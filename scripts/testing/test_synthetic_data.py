@@ -0,0 +1,94 @@
+"""Unittests for synthetic_data.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+import jsonc_loader
+import schema_registry
+import synthetic_data
+
+_COUNT = 500
+"""Number of objects each test generates."""
+
+
+class TestGenerators(unittest.TestCase):
+    """Test cases for the object generators."""
+
+    def _generate(self, schema_name: str, seed: int=0) -> list:
+        """Return _COUNT objects generated from the schema schema_name."""
+        schema_path = os.path.join(synthetic_data._SCHEMA_DIR, schema_name)
+        return synthetic_data.generate_objects(schema_path, _COUNT, seed)
+
+    def test_valid(self) -> None:
+        """Test that every generated object is valid against its schema."""
+        for schema_name in ('talent_schema.json', 'statblock_schema.json'):
+            validator = schema_registry.get_validator(os.path.join(synthetic_data._SCHEMA_DIR, schema_name))
+            for my_obj in self._generate(schema_name):
+                self.assertEqual(list(validator.iter_errors(my_obj)), [], my_obj)
+
+    def test_other_talents(self) -> None:
+        """Test that other_talents only name earlier talents of the same or a lower level, so the graph is acyclic."""
+        levels = {}
+        with_others = 0
+        for talent in self._generate('talent_schema.json'):
+            prerequisites = talent['prerequisites']
+            for other_talent in prerequisites.get('other_talents', ()):
+                self.assertLessEqual(levels[other_talent], prerequisites['level'])
+            with_others += 'other_talents' in prerequisites
+            levels[talent['name']] = prerequisites['level']
+        self.assertGreater(with_others, _COUNT // 10)
+
+    def test_deterministic(self) -> None:
+        """Test that the same seed gives the same objects and another seed doesn't."""
+        self.assertEqual(self._generate('talent_schema.json', 3), self._generate('talent_schema.json', 3))
+        self.assertNotEqual(self._generate('talent_schema.json', 3), self._generate('talent_schema.json', 4))
+
+    def test_cross_file_refs(self) -> None:
+        """Test that $refs into other schemas in the dir resolve, and relative $refs inside those resolve against their own schema."""
+        schemas = {
+            'rank_schema.json': {'$defs': {'rank_def': {'$ref': '#/$defs/level_def'}, 'level_def': {'type': 'integer', 'minimum': 3, 'maximum': 5}}},
+            'hero_schema.json': {'type': 'object', 'required': ['rank'], 'properties': {'rank': {'$ref': 'rank_schema.json#/$defs/rank_def'}}},
+            'broken_schema.json': {'type': 'object', 'required': ['x'], 'properties': {'x': {'$ref': 'missing_schema.json'}}}
+        }
+        with tempfile.TemporaryDirectory() as tmp_path:
+            for schema_name, schema in schemas.items():
+                with open(os.path.join(tmp_path, schema_name), 'w') as schema_fp:
+                    json.dump(dict(schema, **{'$schema': 'https://json-schema.org/draft/2020-12/schema'}), schema_fp)
+            hero_path = os.path.join(tmp_path, 'hero_schema.json')
+            validator = schema_registry.get_validator(hero_path)
+            for hero in synthetic_data.generate_objects(hero_path, _COUNT):
+                self.assertEqual(list(validator.iter_errors(hero)), [], hero)
+            with self.assertRaises(synthetic_data.SyntheticDataError):
+                synthetic_data.generate_objects(os.path.join(tmp_path, 'broken_schema.json'), 1)
+        schema_registry.clear()
+
+    def test_collection_name(self) -> None:
+        """Test the collection names of schema files."""
+        self.assertEqual(synthetic_data.collection_name('/a/talent_schema.json'), 'talents')
+        self.assertEqual(synthetic_data.collection_name('/a/statblocks_schema.json'), 'statblocks')
+
+
+class TestMain(unittest.TestCase):
+    """Test cases for main()."""
+
+    @mock.patch('builtins.print', mock.Mock(auto_spec=True))
+    @mock.patch('synthetic_data.LOGGER', mock.Mock(auto_spec=True))
+    def test_main(self) -> None:
+        """Test that main() writes a JSONC file per schema that loads back with every object."""
+        with tempfile.TemporaryDirectory() as tmp_path:
+            json_paths = synthetic_data.main(['-n', str(_COUNT), '-o', tmp_path])
+            self.assertEqual(sorted(os.path.basename(json_path) for json_path in json_paths), ['statblocks.json', 'talents.json'])
+            for json_path in json_paths:
+                with open(json_path, 'r') as json_fp:
+                    text = json_fp.read()
+                self.assertIn('//', text)
+                self.assertIn('/*', text)
+                self.assertEqual(len(jsonc_loader.load(json_path, use_cache=False)), _COUNT)
+                self.assertEqual(sum(1 for _ in jsonc_loader.iter_array(json_path)), _COUNT)
+
+    def test_negative_count(self) -> None:
+        """Test that a negative count is an error."""
+        with self.assertRaises(synthetic_data.SyntheticDataError):
+            synthetic_data.main(['-n', '-1'])
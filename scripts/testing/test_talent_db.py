@@ -0,0 +1,60 @@
+"""Unittests for talent_db.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import unittest
+import talent_db
+
+_TALENTS = [
+    {'name': 'Swift_I', 'prerequisites': {'level': 1, 'attributes': {'dex': 2}}},
+    {'name': 'Archer', 'prerequisites': {'level': 2, 'other_talents': ['advanced_weapon_training_bows']}},
+    {'name': 'Pugilist', 'prerequisites': {'level': 1, 'attributes': {'str': 2}}},
+    {'name': 'Stone Skin', 'prerequisites': {'level': 4, 'ancestry': 'Dwarf', 'attributes': {'bod': 3, 'str': 1}}},
+    {'name': 'Epic', 'prerequisites': {'level': 12}}
+]
+"""Small talent catalog for testing."""
+
+
+class TestTalentDB(unittest.TestCase):
+    """Test cases for TalentDB."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self.talents = talent_db.TalentDB(_TALENTS)
+
+    @staticmethod
+    def _names(talents: list) -> list:
+        """Return the names of talents."""
+        return [talent['name'] for talent in talents]
+
+    def test_get(self) -> None:
+        """Test case- and separator-insensitive name lookups."""
+        self.assertIs(self.talents.get('swift i'), _TALENTS[0])
+        self.assertIs(self.talents.get('STONE_SKIN'), _TALENTS[3])
+        self.assertIn('archer', self.talents)
+        self.assertIsNone(self.talents.get('advanced_weapon_training_bows'))
+
+    def test_duplicate_names(self) -> None:
+        """Test that duplicate names keep the first talent and are recorded."""
+        talents = talent_db.TalentDB(_TALENTS + [{'name': 'swift i', 'prerequisites': {'level': 3}}])
+        self.assertIs(talents.get('Swift_I'), _TALENTS[0])
+        self.assertEqual(talents.duplicate_names, ['swift i'])
+
+    def test_levels(self) -> None:
+        """Test level lookups and range queries."""
+        self.assertEqual(self.talents.levels(), [1, 2, 4, 12])
+        self.assertEqual(self._names(self.talents.by_level(1)), ['Pugilist', 'Swift_I'])
+        self.assertEqual(self._names(self.talents.by_level_range(2, 10)), ['Archer', 'Stone Skin'])
+        self.assertEqual(self.talents.by_level(3), [])
+
+    def test_ancestry(self) -> None:
+        """Test ancestry lookups."""
+        self.assertEqual(self._names(self.talents.by_ancestry('dwarf')), ['Stone Skin'])
+        self.assertEqual(len(self.talents.by_ancestry(None)), 4)
+        self.assertEqual(self.talents.ancestries(), ['dwarf'])
+
+    def test_attributes(self) -> None:
+        """Test attribute threshold range queries and eligibility."""
+        self.assertEqual(self._names(self.talents.requiring('str')), ['Stone Skin', 'Pugilist'])
+        self.assertEqual(self._names(self.talents.requiring('str', min_value=2)), ['Pugilist'])
+        self.assertEqual(self.talents.requiring('cha'), [])
+        self.assertEqual(self._names(self.talents.attribute_eligible({'str': 2, 'dex': 1})),
+                         ['Archer', 'Pugilist', 'Epic'])
@@ -0,0 +1,54 @@
+"""Unittests for talent_graph.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import unittest
+from unittest import mock
+import talent_db
+import talent_graph
+
+
+def _talent(name: str, *other_talents: str) -> dict:
+    """Return a level 1 talent that requires other_talents."""
+    prerequisites = {'level': 1}
+    if other_talents:
+        prerequisites['other_talents'] = list(other_talents)
+    return {'name': name, 'prerequisites': prerequisites}
+
+
+@mock.patch('talent_graph.LOGGER', mock.Mock(auto_spec=True))
+class TestPrerequisiteGraph(unittest.TestCase):
+    """Test cases for PrerequisiteGraph."""
+
+    def test_closure(self) -> None:
+        """Test transitive prerequisites and unlocked talents of a diamond-shaped graph."""
+        graph = talent_graph.PrerequisiteGraph(talent_db.TalentDB([
+            _talent('Master', 'Left', 'Right'),
+            _talent('Left', 'root'),
+            _talent('Right', 'Root'),
+            _talent('Root'),
+            _talent('Loner', 'Not_A_Talent')
+        ]))
+        self.assertEqual(graph.prerequisites('Master'), ['Left', 'Right', 'Root'])
+        self.assertEqual(graph.unlocked_by('Root'), ['Master', 'Left', 'Right'])
+        self.assertEqual(graph.prerequisites('Root'), [])
+        self.assertEqual(graph.unresolved, {'Loner': ['Not_A_Talent']})
+        self.assertEqual(graph.cycles, [])
+        order = graph.topological_order
+        self.assertLess(order.index(3), order.index(1))
+        self.assertLess(order.index(1), order.index(0))
+
+        owned = graph.mask_of(['Root', 'Left'])
+        self.assertEqual(graph.missing_prerequisites('Master', owned), graph.mask_of(['Right']))
+
+    def test_cycles(self) -> None:
+        """Test that cycles are found and talents behind them are left out of the order."""
+        graph = talent_graph.PrerequisiteGraph(talent_db.TalentDB([
+            _talent('Behind', 'A'),
+            _talent('A', 'B'),
+            _talent('B', 'A'),
+            _talent('Self', 'Self'),
+            _talent('Free')
+        ]))
+        self.assertEqual(sorted(sorted(cycle) for cycle in graph.cycles), [['A', 'B'], ['Self']])
+        self.assertEqual(graph.topological_order, [4])
+        with self.assertRaises(talent_graph.PrerequisiteCycleError):
+            graph.check_acyclic()
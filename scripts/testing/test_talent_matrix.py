@@ -0,0 +1,60 @@
+"""Unittests for talent_matrix.py. Python unittests should not be run directly! Run them using run_test.py."""
+
+import unittest
+import talent_db
+import talent_matrix
+
+_TALENTS = [
+    {'name': 'Swift_I', 'prerequisites': {'level': 1, 'attributes': {'dex': 2}}},
+    {'name': 'Pugilist', 'prerequisites': {'level': 1, 'attributes': {'str': 2}}},
+    {'name': 'Stone Skin', 'prerequisites': {'level': 4, 'ancestry': 'Dwarf', 'attributes': {'bod': 3, 'str': 1}}},
+    {'name': 'Clumsy', 'prerequisites': {'level': 1, 'attributes': {'dex': -1}}}
+]
+"""Small talent catalog for testing."""
+
+
+class TestTalentMatrix(unittest.TestCase):
+    """Test cases for TalentMatrix."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self.talents = talent_db.TalentDB(_TALENTS)
+        self.matrix = talent_matrix.TalentMatrix(self.talents)
+        self.characters = [
+            {'str': 2, 'dex': 2, 'bod': 3},
+            {'str': 1, 'bod': 3},
+            {'dex': -2}
+        ]
+
+    def test_columns(self) -> None:
+        """Test the compiled threshold, level and ancestry columns."""
+        self.assertEqual(self.matrix.thresholds.shape, (4, 6))
+        self.assertEqual(self.matrix.thresholds[2, talent_db.ATTRIBUTES.index('bod')], 3)
+        self.assertEqual(self.matrix.levels.tolist(), [1, 1, 4, 1])
+        self.assertEqual(self.matrix.ancestries, ['dwarf'])
+        self.assertEqual(self.matrix.ancestry_codes.tolist(), [-1, -1, 0, -1])
+        self.assertEqual(self.matrix.ancestry_code('DWARF'), 0)
+        self.assertEqual(self.matrix.ancestry_code(None), talent_matrix.NO_ANCESTRY)
+        self.assertNotIn(self.matrix.ancestry_code('Elf'), self.matrix.ancestry_codes.tolist())
+
+    def test_attributes_only(self) -> None:
+        """Test that the vectorized check matches TalentDB.attribute_eligible() for every character."""
+        eligible = self.matrix.eligible(self.matrix.attribute_vectors(self.characters))
+        self.assertEqual(eligible.shape, (3, 4))
+        for character, row in zip(self.characters, eligible):
+            expected = [talent['name'] for talent in self.talents.attribute_eligible(character)]
+            self.assertEqual([name for name, ok in zip(self.matrix.names, row) if ok], expected)
+
+    def test_level_and_ancestry(self) -> None:
+        """Test level and ancestry prerequisites."""
+        attributes = self.matrix.attribute_vectors(self.characters[:1] * 3)
+        levels = [4, 3, 4]
+        ancestries = [self.matrix.ancestry_code(name) for name in ('Dwarf', 'Dwarf', 'Elf')]
+        eligible = self.matrix.eligible(attributes, levels, ancestries)
+        self.assertEqual(eligible[:, 2].tolist(), [True, False, False])
+        self.assertTrue(eligible[:, :2].all())
+
+    def test_bad_shape(self) -> None:
+        """Test that attribute arrays of the wrong shape are rejected."""
+        with self.assertRaises(ValueError):
+            self.matrix.eligible([[1, 2, 3]])
@@ -1,5 +1,7 @@
 """Unittests for utilities.py. Python unittests should not be run directly! Run them using run_test.py."""
 
+import os
+import tempfile
 import unittest
 import subprocess
 from unittest import mock
@@ -22,3 +24,104 @@ class TestRunCommand(unittest.TestCase):
         """Test for run_command()."""
         utilities.run_command('test')
         subprocess.check_call.assert_called_once()
+
+
+class TestGetRootDir(unittest.TestCase):
+    """Test cases for get_root_dir()."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self._tmp_dir.name)
+        open(os.path.join(self.root, '.root'), 'w').close()
+        self.entry_path = os.path.join(self.root, 'scripts', 'testing')
+        os.makedirs(self.entry_path)
+        self._root_dirs = mock.patch.dict('utilities._ROOT_DIRS', clear=True)
+        self._root_dirs.start()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        self._root_dirs.stop()
+        self._tmp_dir.cleanup()
+
+    @mock.patch('os.chdir', mock.Mock(auto_spec=True))
+    def test_entry_path(self) -> None:
+        """Test that the root is found from a nested dir without changing the working dir."""
+        self.assertEqual(utilities.get_root_dir(self.entry_path), self.root)
+        os.chdir.assert_not_called()
+
+    def test_memoized(self) -> None:
+        """Test that a start dir is only searched once."""
+        utilities.get_root_dir(self.entry_path)
+        with mock.patch('os.path.exists', mock.Mock(auto_spec=True)) as exists_mock:
+            self.assertEqual(utilities.get_root_dir(self.entry_path), self.root)
+        exists_mock.assert_not_called()
+
+    def test_not_found(self) -> None:
+        """Test the result when no .root file is within max_steps."""
+        with self.assertRaises(utilities.RootNotFoundException):
+            utilities.get_root_dir(self.entry_path, max_steps=2)
+        self.assertEqual(utilities.get_root_dir(self.entry_path, max_steps=2, except_on_fail=False), '')
+
+
+_STATUS_OUTPUT = '\0'.join([
+    '# branch.oid 0123456789abcdef0123456789abcdef01234567',
+    '# branch.head feature',
+    '1 .M N... 100644 100644 100644 aaaa bbbb scripts/modified file.py',
+    '1 M. N... 100644 100644 100644 aaaa bbbb scripts/staged.py',
+    '1 MM N... 100644 100644 100644 aaaa bbbb scripts/both.py',
+    '2 R. N... 100644 100644 100644 aaaa bbbb R100 scripts/new_name.py',
+    'scripts/old_name.py',
+    'u UU N... 100644 100644 100644 100644 aaaa bbbb cccc scripts/conflict.py',
+    '? scripts/untracked.py',
+    ''
+])
+"""Sample output of git status --porcelain=v2 -z --branch."""
+
+
+class TestWorktreeContext(unittest.TestCase):
+    """Test cases for WorktreeContext and the git helpers served from it."""
+
+    def setUp(self) -> None:
+        """Setup, gets run before each test. Use to configure test environment."""
+        self._patches = [
+            mock.patch.dict('utilities._WORKTREE_CONTEXTS', clear=True),
+            mock.patch('utilities.run_command_return_output', mock.Mock(auto_spec=True, return_value=_STATUS_OUTPUT)),
+            mock.patch('os.path.isfile', mock.Mock(auto_spec=True, side_effect=lambda path: 'both' not in path))
+        ]
+        for patch in self._patches:
+            patch.start()
+
+    def tearDown(self) -> None:
+        """Teardown, run after each test. Use to reset test environment."""
+        for patch in self._patches:
+            patch.stop()
+
+    def test_parse_status(self) -> None:
+        """Test that every kind of porcelain v2 entry lands in the right lists."""
+        status = utilities._parse_status(_STATUS_OUTPUT)
+        self.assertEqual(status.branch, 'feature')
+        self.assertEqual(status.modified, ('scripts/modified file.py', 'scripts/both.py', 'scripts/conflict.py'))
+        self.assertEqual(status.staged, ('scripts/staged.py', 'scripts/both.py', 'scripts/new_name.py', 'scripts/conflict.py'))
+        self.assertEqual(status.untracked, ('scripts/untracked.py',))
+        self.assertEqual(utilities._parse_status('# branch.head (detached)\0').branch, '')
+
+    def test_single_git_call(self) -> None:
+        """Test that every helper is served from one git status call, and deleted files are left out."""
+        self.assertEqual(utilities.get_current_branch('/root'), 'feature')
+        self.assertEqual(utilities.get_modified_files('/root'), ['scripts/modified file.py', 'scripts/conflict.py'])
+        self.assertEqual(utilities.get_staged_files('/root'), ['scripts/staged.py', 'scripts/new_name.py', 'scripts/conflict.py'])
+        self.assertEqual(utilities.get_untracked_files('/root'), ['scripts/untracked.py'])
+        utilities.run_command_return_output.assert_called_once()
+
+        utilities.get_worktree_context('/root').refresh()
+        utilities.get_current_branch('/root')
+        self.assertEqual(utilities.run_command_return_output.call_count, 2)
+
+    def test_changed_files(self) -> None:
+        """Test that changes since HEAD come from the snapshot, deleted files included, and other refs add a git diff."""
+        self.assertEqual(utilities.get_changed_files(root='/root'), [
+            'scripts/both.py', 'scripts/conflict.py', 'scripts/modified file.py', 'scripts/new_name.py', 'scripts/staged.py', 'scripts/untracked.py'])
+        utilities.run_command_return_output.return_value = 'scripts/pushed.py\0'
+        self.assertIn('scripts/pushed.py', utilities.get_changed_files('origin/feature', '/root'))
+        utilities.run_command_return_output.assert_called_with('git diff --name-only -z origin/feature --', cwd='/root')
@@ -2,16 +2,42 @@
 
 import os
 import sys
+import shlex
+import hashlib
 import logging
 import argparse
 import subprocess
+import instrumentation
+from typing import NamedTuple
+
+_CACHE_DIR_NAME = '.cache'
+"""Name of the cache directory at the root of the worktree (ignored by git)."""
+
+_HASH_BLOCK_SIZE = 1 << 20
+"""Number of bytes to read at a time when hashing a file."""
+
+_PROFILE_DIR_NAME = 'profiles'
+"""Name of the dir inside the cache dir that --profile dumps stats to by default."""
+
+_ROOT_MARKER = '.root'
+"""Name of the file that marks the root of the worktree."""
+
+_ROOT_DIRS = {}
+"""Dict mapping each dir get_root_dir() started from to the root it found, so each dir is only searched once."""
+
+_WORKTREE_CONTEXTS = {}
+"""Dict mapping worktree root to its WorktreeContext, see get_worktree_context()."""
+
 
 class RootNotFoundException(Exception):
     """Exception class for if unable to determine worktree root."""
 
 
 def parser_setup(parser: argparse.ArgumentParser, argv: list, logger: logging.Logger=None) -> argparse.Namespace:
-    """Create parser with basic functionality.
+    """Create parser with basic functionality: logging verbosity and the instrumentation options.
+
+    If --timings, --metrics_json or --profile is given, instrumentation starts right away and
+    reports when the process exits, see instrumentation.py.
 
     Args:
         parser: Argument parser to setup.
@@ -38,6 +64,7 @@ def parser_setup(parser: argparse.ArgumentParser, argv: list, logger: logging.Lo
         dest='debug',
         default=False
     )
+    instrumentation.add_arguments(parser)
 
     argv = parser.parse_args(argv)
 
@@ -45,6 +72,13 @@ def parser_setup(parser: argparse.ArgumentParser, argv: list, logger: logging.Lo
         _logger_config(logger, argv)
         logger.debug('args: %s', argv)
 
+    if argv.timings or argv.metrics_json is not None or argv.profile is not None:
+        script = os.path.splitext(parser.prog)[0]
+        profile_path = argv.profile
+        if profile_path == '':
+            profile_path = os.path.join(get_cache_dir(), _PROFILE_DIR_NAME, f'{script}.prof')
+        instrumentation.start(script, argv.timings, argv.metrics_json, profile_path)
+
     return argv
 
 
@@ -76,9 +110,16 @@ def logger_setup(logger_name: str, logger_level: int=logging.WARNING) -> logging
     return logger
 
 
+def _split_command(cmd_str: str):
+    """Split cmd_str into an argument list on POSIX, where subprocess can't run a plain command string."""
+    if os.name == 'nt':
+        return cmd_str
+    return shlex.split(cmd_str)
+
+
 def run_command(cmd_str: str, time_out=None, cwd=None) -> int:
     """Run cmd_str with optional timeout and working dir."""
-    return subprocess.check_call(cmd_str, timeout=time_out, cwd=cwd)
+    return subprocess.check_call(_split_command(cmd_str), timeout=time_out, cwd=cwd)
 
 
 def run_command_return_output(cmd_str: str, time_out=None, cwd=None) -> str:
@@ -86,52 +127,145 @@ def run_command_return_output(cmd_str: str, time_out=None, cwd=None) -> str:
 
     NOTE: Whitespace in the output is preserved and must be dealt with by the caller.
     """
-    return subprocess.check_output(cmd_str, timeout=time_out, cwd=cwd, encoding='UTF-8')
+    return subprocess.check_output(_split_command(cmd_str), timeout=time_out, cwd=cwd, encoding='UTF-8')
 
 
 def get_root_dir(entry_path: str=None, max_steps: int=10, except_on_fail: bool=True) -> str:
-    """Determine the root dir of the worktree.
+    """Determine the root dir of the worktree: the closest dir at or above entry_path with a .root file in it.
+
+    The search only looks at paths, it never changes the working dir of the process, and each
+    start dir is only searched once per process.
 
     Args:
-        entry_path: Path to start searching in (pending, this arg does nothing right now).
+        entry_path: Path to start searching in; defaults to the current working dir.
         max_steps: Maximum number of dirs to back up while searching.
         except_on_fail: If true, raise an exception if the root dir cannot be found.
 
     Returns:
-        root_dir: The root dir of the worktree on a success (or an empty string on a failure with except_on_fail=False)
+        root_dir: The absolute root dir of the worktree on a success (or an empty string on a failure with except_on_fail=False)
     """
-    if entry_path is not None:
-        # TODO allow for other entry_paths besides the current
-        return None
-
-    start_dir = os.getcwd()
-    root_dir = ''
-    for _ in range(max_steps):
-        if os.path.exists('.root'):
-            root_dir = os.getcwd()
-            break
-        os.chdir('../')
-    os.chdir(start_dir)
+    start_dir = os.path.abspath(entry_path if entry_path is not None else os.getcwd())
+    cache_key = (start_dir, max_steps)
+    root_dir = _ROOT_DIRS.get(cache_key)
+    if root_dir is None:
+        root_dir = ''
+        search_dir = start_dir
+        for _ in range(max_steps):
+            if os.path.exists(os.path.join(search_dir, _ROOT_MARKER)):
+                root_dir = search_dir
+                break
+            search_dir = os.path.dirname(search_dir)
+        if root_dir:
+            _ROOT_DIRS[cache_key] = root_dir
 
     if except_on_fail and not root_dir:
         raise RootNotFoundException(f'Unable to determine root of worktree! Start dir: {start_dir}')
 
-    return os.path.abspath(root_dir)  # Ensure root path is absolute path
+    return root_dir
+
+
+def get_cache_dir(root: str=None) -> str:
+    """Get the cache dir of the worktree, creating it if it doesn't exist.
 
+    Args:
+        root: Root of the worktree; defaults to current source tree root.
 
-def _run_git_ls_files_cmd(options: list=None, root: str=None) -> list:
-    """Run git ls-files with the specified options, return the output as a list."""
-    if options is not None:
-        option_str = ' '.join(options)
+    Returns:
+        Absolute path to <root>/.cache.
+    """
     if root is None:
         root = get_root_dir()
-    git_cmd = f'git ls-files {option_str}'
-    output = run_command_return_output(git_cmd, cwd=root)
-    output_files = []
-    output_lines = output.split()
-    if output_lines:
-        output_files = [out_file for out_file in output_lines if os.path.isfile(os.path.join(root, out_file))]
-    return output_files
+    cache_dir = os.path.join(root, _CACHE_DIR_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def hash_file(path: str) -> str:
+    """Return the SHA-1 hex digest of the contents of the file at path, reading it a block at a time."""
+    file_hash = hashlib.sha1()
+    with open(path, 'rb') as in_fp:
+        for block in iter(lambda: in_fp.read(_HASH_BLOCK_SIZE), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+class WorktreeStatus(NamedTuple):
+    """Snapshot of the git status of a worktree; paths are relative to the worktree root."""
+    branch: str  # Empty if HEAD is detached
+    modified: tuple  # Files whose worktree contents differ from the index, like git ls-files -m
+    untracked: tuple  # Files not tracked or ignored by git, like git ls-files -o --exclude-standard
+    staged: tuple  # Files whose index contents differ from HEAD, like git diff --cached --name-only
+
+
+def _parse_status(output: str) -> WorktreeStatus:
+    """Parse the output of git status --porcelain=v2 -z --branch.
+
+    NOTE: Unmerged files count as both modified and staged, the same as with the git commands
+    WorktreeStatus mirrors.
+    """
+    branch = ''
+    modified = []
+    untracked = []
+    staged = []
+    fields = iter(output.split('\0'))
+    for entry in fields:
+        if entry.startswith('# branch.head '):
+            head = entry[len('# branch.head '):]
+            branch = '' if head == '(detached)' else head
+        elif entry.startswith(('1 ', '2 ', 'u ')):
+            # Ordinary, renamed/copied and unmerged entries have 8, 9 and 10 fields before the path
+            kind, status = entry[0], entry[2:4]
+            path = entry.split(' ', {'1': 8, '2': 9, 'u': 10}[kind])[-1]
+            if kind == '2':
+                next(fields, None)  # Path the file was renamed or copied from
+            if kind == 'u' or status[1] != '.':
+                modified.append(path)
+            if kind == 'u' or status[0] != '.':
+                staged.append(path)
+        elif entry.startswith('? '):
+            untracked.append(entry[2:])
+    return WorktreeStatus(branch, tuple(modified), tuple(untracked), tuple(staged))
+
+
+class WorktreeContext:
+    """A worktree root and a snapshot of its git status, taken with a single git call the first time it is needed.
+
+    Use get_worktree_context() to share one context per worktree across every module.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._status = None
+
+    @property
+    def status(self) -> WorktreeStatus:
+        """Git status of the worktree, see WorktreeStatus."""
+        if self._status is None:
+            output = run_command_return_output('git status --porcelain=v2 -z --branch --untracked-files=all', cwd=self.root)
+            self._status = _parse_status(output)
+        return self._status
+
+    def refresh(self) -> None:
+        """Forget the status snapshot, so the next use takes a new one."""
+        self._status = None
+
+    def existing(self, paths: tuple) -> list:
+        """Return the paths in paths that are files in the worktree (i.e. weren't deleted)."""
+        return [path for path in paths if os.path.isfile(os.path.join(self.root, path))]
+
+
+def get_worktree_context(root: str=None) -> WorktreeContext:
+    """Return the WorktreeContext of the worktree at root, creating it on the first call.
+
+    Args:
+        root: Root of the worktree; defaults to current source tree root.
+    """
+    if root is None:
+        root = get_root_dir()
+    root = os.path.abspath(root)
+    if root not in _WORKTREE_CONTEXTS:
+        _WORKTREE_CONTEXTS[root] = WorktreeContext(root)
+    return _WORKTREE_CONTEXTS[root]
 
 
 def get_modified_files(root: str=None) -> list:
@@ -143,10 +277,8 @@ def get_modified_files(root: str=None) -> list:
     Returns:
         List of modified files, or an empty list if no modified files.
     """
-    if root is None:
-        root = get_root_dir()
-    modified_files_options = ['-m', root]
-    return _run_git_ls_files_cmd(modified_files_options, root=root)
+    context = get_worktree_context(root)
+    return context.existing(context.status.modified)
 
 
 def get_untracked_files(root: str=None) -> list:
@@ -158,10 +290,8 @@ def get_untracked_files(root: str=None) -> list:
     Returns:
         List of untracked files, or an empty list if no untracked files.
     """
-    if root is None:
-        root = get_root_dir()
-    untracked_files_options = ['-o', '--exclude-standard', root]
-    return _run_git_ls_files_cmd(untracked_files_options, root=root)
+    context = get_worktree_context(root)
+    return context.existing(context.status.untracked)
 
 
 def get_staged_files(root: str=None) -> list:
@@ -173,22 +303,37 @@ def get_staged_files(root: str=None) -> list:
     Returns:
         List of staged files, or an empty list if no staged files.
     """
-    if root is None:
-        root = get_root_dir()
-    diff_str = f'git diff --cached --name-only {root}'
-    output = run_command_return_output(diff_str, cwd=root)
-    output_files = []
-    output_lines = output.split()
-    if output_lines:
-        output_files = [out_file for out_file in output_lines if os.path.isfile(os.path.join(root, out_file))]
-    return output_files
+    context = get_worktree_context(root)
+    return context.existing(context.status.staged)
+
+
+def get_changed_files(ref: str='HEAD', root: str=None) -> list:
+    """Get the files that differ between the commit ref and the worktree, including untracked files.
+
+    Unlike the other helpers, deleted files are kept, since a deletion is a change too.
+
+    Args:
+        ref: Commit to compare against; with the default HEAD, this is the modified, staged and
+            untracked files of the status snapshot, without running git again.
+        root: Root of the worktree to get files for; defaults to current source tree root.
+
+    Returns:
+        Sorted list of changed files, relative to root.
+
+    Raises:
+        subprocess.CalledProcessError: Error if ref is not a commit git knows.
+    """
+    context = get_worktree_context(root)
+    changed = set(context.status.modified) | set(context.status.staged) | set(context.status.untracked)
+    if ref != 'HEAD':
+        output = run_command_return_output(f'git diff --name-only -z {ref} --', cwd=context.root)
+        changed.update(path for path in output.split('\0') if path)
+    return sorted(changed)
 
 
 def get_current_branch(root: str=None) -> str:
     """Return the name of the current git branch."""
-    if root is None:
-        root = get_root_dir()
-    return run_command_return_output(f'git branch --show-current {root}').strip()
+    return get_worktree_context(root).status.branch
 
 
 def git_push_to_remote(branch: str) -> None:
@@ -0,0 +1,74 @@
+"""Manifest of content hashes from previous validation runs, used to skip work that is already done."""
+
+import os
+import json
+import hashlib
+import logging
+import utilities
+
+LOGGER = logging.getLogger(os.path.basename(__file__))
+"""Logger for this module."""
+
+_MANIFEST_NAME = 'validation_manifest.json'
+"""File name of the manifest inside the worktree cache dir."""
+
+_MANIFEST_VERSION = 1
+"""Version of the manifest format; manifests with any other version are discarded."""
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex digest used for every hash in the manifest; matches utilities.hash_file()."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def hash_object(in_obj) -> str:
+    """Return the hash of a parsed JSON object; independent of key order and formatting."""
+    return hash_bytes(json.dumps(in_obj, sort_keys=True, separators=(',', ':')).encode('UTF-8'))
+
+
+class ValidationManifest:
+    """Hashes of every validated file, the schema it was validated with and its valid objects.
+
+    Each file entry is a dict with the keys:
+        file_hash: Hash of the file contents.
+        schema_hash: Hash of the schema the file was validated with, and of the schemas it refers to.
+        valid: Whether every object in the file was valid.
+        valid_objects: List of hashes of the objects that were valid.
+    """
+
+    def __init__(self, path: str=None):
+        """Load the manifest at path; defaults to the manifest in the worktree cache dir."""
+        if path is None:
+            path = os.path.join(utilities.get_cache_dir(), _MANIFEST_NAME)
+        self.path = path
+        self.files = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as manifest_fp:
+                    manifest = json.load(manifest_fp)
+            except (OSError, ValueError) as excpt:
+                LOGGER.warning('Ignoring unreadable validation manifest %s: %s', path, excpt)
+                return
+            if manifest.get('version') == _MANIFEST_VERSION:
+                self.files = manifest.get('files', {})
+
+    @staticmethod
+    def _key(json_path: str) -> str:
+        """Return the key for json_path in self.files."""
+        return os.path.abspath(json_path)
+
+    def entry(self, json_path: str) -> dict:
+        """Return a copy of the entry for json_path, or an empty dict if it has never been validated."""
+        return dict(self.files.get(self._key(json_path), {}))
+
+    def set_entry(self, json_path: str, entry: dict) -> None:
+        """Replace the entry for json_path."""
+        self.files[self._key(json_path)] = entry
+
+    def save(self) -> None:
+        """Write the manifest to self.path, dropping entries for files that no longer exist."""
+        self.files = {json_path: entry for json_path, entry in self.files.items() if os.path.isfile(json_path)}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as manifest_fp:
+            json.dump({'version': _MANIFEST_VERSION, 'files': self.files}, manifest_fp)
+        os.replace(tmp_path, self.path)